@@ -0,0 +1 @@
+"""基准测试：合成大规模数仓任务树，测量任务发现、CLI 启动、SQL 渲染、依赖解析与端到端调度的性能"""
@@ -0,0 +1,307 @@
+"""基准测试入口
+
+用法：
+    python -m benchmarks.run --tasks 5000 --repeat 3 --output bench.json
+    python -m benchmarks.run --tasks 5000 --baseline bench_v1.json --threshold 0.2
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import typer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+app = typer.Typer(help="数仓框架基准测试（合成任务树）", add_completion=False)
+
+
+def _summarize(runs: List[float], **extra: Any) -> Dict[str, Any]:
+    return {
+        "runs": [round(r, 6) for r in runs],
+        "min": round(min(runs), 6),
+        "median": round(statistics.median(runs), 6),
+        "max": round(max(runs), 6),
+        **extra,
+    }
+
+
+def _measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """执行 repeat 次并返回每次的耗时（秒），setup 不计入耗时"""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def _unlink(path: Path):
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10
+        )
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def bench_discovery(root: Path, repeat: int) -> Dict[str, Any]:
+    from core.task_loader import TaskLoader
+    from core.task_manifest import TaskManifest
+
+    loader = TaskLoader(root / "warehouse")
+    n_files = len(list(loader.iter_task_files("warehouse")))
+    manifest_path = root / ".bench" / "manifest.json"
+
+    results = {
+        "scan_files": _summarize(_measure(lambda: list(loader.iter_task_files("warehouse")), repeat), files=n_files),
+        "discover_tasks": _summarize(_measure(lambda: loader.discover_tasks("warehouse"), repeat), files=n_files),
+        "manifest_cold": _summarize(
+            _measure(
+                lambda: TaskManifest(loader, manifest_path).load("warehouse"),
+                repeat,
+                setup=lambda: _unlink(manifest_path),
+            ),
+            files=n_files,
+        ),
+        "manifest_warm": _summarize(
+            _measure(lambda: TaskManifest(loader, manifest_path).load("warehouse"), repeat), files=n_files
+        ),
+    }
+    for key in ("discover_tasks", "manifest_cold", "manifest_warm"):
+        results[key]["per_task_us"] = round(results[key]["median"] / max(n_files, 1) * 1e6, 2)
+    return results
+
+
+def bench_cli_startup(root: Path, repeat: int) -> Dict[str, Any]:
+    """在合成任务树目录下启动 main.py（列出 warehouse 命令 / 查看单个任务帮助）"""
+    # 配置模块读取当前目录下的 .env 文件
+    env_name = os.getenv("DWF_ENV", "prod")
+    for name in (".env", f".env.{env_name}"):
+        (root / name).touch()
+    cache_dir = root / ".bench_cli_cache"
+    env = dict(os.environ, DWF_CACHE_DIR=str(cache_dir))
+    main_py = str(REPO_ROOT / "main.py")
+
+    def run(*args: str):
+        subprocess.run([sys.executable, main_py, *args], cwd=root, env=env, check=True, capture_output=True)
+
+    first_task = sorted((root / "warehouse" / "ods").glob("*.py"))[0].stem
+    return {
+        "cli_list_cold": _summarize(
+            _measure(lambda: run("warehouse", "--help"), repeat, setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+        ),
+        "cli_list_warm": _summarize(_measure(lambda: run("warehouse", "--help"), repeat)),
+        "cli_task_help_warm": _summarize(_measure(lambda: run("warehouse", first_task, "--help"), repeat)),
+    }
+
+
+def bench_build_sql(root: Path, repeat: int, iterations: int) -> Dict[str, Any]:
+    from core.sql_builder import SQLBuilder
+    from core.task_loader import TaskLoader
+
+    tasks = TaskLoader(root / "warehouse").discover_tasks("warehouse")
+    templates = [info["object"]().get_sql_template() for info in tasks.values()]
+    params = {"start_date": "2024-01-01", "end_date": "2024-02-01", "region": "east", "min_amount": 100}
+
+    def render_all():
+        for _ in range(iterations):
+            for template in templates:
+                SQLBuilder.build_sql(template, params)
+
+    renders = len(templates) * iterations
+    cold = _measure(render_all, repeat, setup=SQLBuilder.compile.cache_clear)
+    # 只渲染缓存容量以内的模板，测量纯渲染（不含编译）的速度
+    hot_templates = templates[: SQLBuilder.compile.cache_info().maxsize or len(templates)]
+
+    def render_hot():
+        for _ in range(iterations):
+            for template in hot_templates:
+                SQLBuilder.build_sql(template, params)
+
+    render_hot()
+    hot = _measure(render_hot, repeat)
+    hot_renders = len(hot_templates) * iterations
+    return {
+        "build_sql_all_templates": _summarize(
+            cold, renders=renders, renders_per_sec=round(renders / statistics.median(cold), 1)
+        ),
+        "build_sql_cached_templates": _summarize(
+            hot, renders=hot_renders, renders_per_sec=round(hot_renders / statistics.median(hot), 1)
+        ),
+    }
+
+
+def bench_depends(root: Path, repeat: int) -> Dict[str, Any]:
+    from core.task_depends import TaskDepends
+    from core.task_loader import TaskLoader
+
+    loader = TaskLoader(root / "warehouse")
+    index_path = root / ".bench" / "depends_index.json"
+
+    def build():
+        depends = TaskDepends(task_loader=loader, index_path=index_path)
+        depends.build_graph()
+        depends.topological_order(depends.select("all"))
+        return depends
+
+    cold = _measure(build, repeat, setup=lambda: _unlink(index_path))
+    warm = _measure(build, repeat)
+    depends = build()
+    edges = sum(len(deps) for deps in depends.upstreams.values())
+    return {
+        "depends_cold": _summarize(cold, tasks=len(depends.entries), edges=edges),
+        "depends_warm": _summarize(warm, tasks=len(depends.entries), edges=edges),
+    }
+
+
+def bench_end_to_end(root: Path, repeat: int, workers: int) -> Dict[str, Any]:
+    from benchmarks import stand_in
+    from core.execute import DagRunner
+    from core.task_loader import TaskLoader
+
+    stand_in.install(pool_size=workers)
+    loader = TaskLoader(root / "warehouse")
+    params = {
+        "executor": stand_in.EXECUTOR_TYPE,
+        "start_date": "2024-01-01",
+        "end_date": "2024-02-01",
+        "dry_run": False,
+        "verbose": False,
+        # 每次都要真正执行，不能被运行台账跳过
+        "force": True,
+        "run_time": datetime.now().isoformat(),
+    }
+    runner = DagRunner(max_workers=workers, task_loader=loader)
+    statuses: Dict[str, int] = {}
+
+    def run():
+        # 任务执行时逐个输出提示，基准测试中丢弃
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            results = runner.run(dict(params))
+        statuses.clear()
+        for result in results.values():
+            statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+
+    runs = _measure(run, repeat)
+    n_tasks = sum(statuses.values())
+    return {
+        "run_all_stand_in": _summarize(
+            runs,
+            tasks=n_tasks,
+            workers=workers,
+            statuses=dict(statuses),
+            tasks_per_sec=round(n_tasks / statistics.median(runs), 1),
+        )
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """与基线比较中位数，返回变慢超过阈值的基准项"""
+    regressions = []
+    typer.echo(f"{'benchmark':<28}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, current in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("median"):
+            continue
+        ratio = current["median"] / base["median"]
+        flag = " ⚠️" if ratio > 1 + threshold else ""
+        typer.echo(f"{name:<28}{base['median']:>12.4f}{current['median']:>12.4f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+@app.command()
+def main(
+    tasks: int = typer.Option(5000, "--tasks", "-n", help="合成任务数（按 ods/dw/dim 5:3.5:1.5 分配）"),
+    repeat: int = typer.Option(3, "--repeat", "-r", help="每项基准的重复次数"),
+    workers: int = typer.Option(8, "--workers", "-w", help="端到端调度的并发数"),
+    sql_iterations: int = typer.Option(5, "--sql-iterations", help="SQL 渲染基准中每个模板的渲染次数"),
+    output: Path = typer.Option(Path("bench_results.json"), "--output", "-o", help="结果 JSON 文件"),
+    workdir: Optional[Path] = typer.Option(None, "--workdir", help="合成任务树目录（默认临时目录，结束后删除）"),
+    skip: Optional[str] = typer.Option(None, "--skip", help="跳过的基准组，逗号分隔: discovery,cli,sql,depends,e2e"),
+    baseline: Optional[Path] = typer.Option(None, "--baseline", help="基线结果 JSON，变慢超过阈值时退出码为 1"),
+    threshold: float = typer.Option(0.2, "--threshold", help="回归阈值（相对基线中位数的增幅）"),
+    seed: int = typer.Option(42, "--seed", help="合成任务树的随机种子"),
+):
+    """生成合成任务树并运行全部基准，结果写入 JSON"""
+    root = Path(workdir or tempfile.mkdtemp(prefix="dwf_bench_")).resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    # 索引、清单、台账、指标等缓存文件写到合成目录，不影响仓库自身的 .dwf_cache
+    os.environ["DWF_CACHE_DIR"] = str(root / ".dwf_cache")
+    skipped = {s.strip() for s in (skip or "").split(",") if s.strip()}
+
+    from benchmarks.synthetic import generate_warehouse
+
+    try:
+        shutil.rmtree(root / "warehouse", ignore_errors=True)
+        start = time.perf_counter()
+        tree = generate_warehouse(root, tasks, seed=seed)
+        typer.echo(f"🏗️  已生成 {tree['tasks']} 个任务 {tree['layers']}，耗时 {time.perf_counter() - start:.2f}s: {root}")
+
+        groups = [
+            ("discovery", lambda: bench_discovery(root, repeat)),
+            ("cli", lambda: bench_cli_startup(root, repeat)),
+            ("sql", lambda: bench_build_sql(root, repeat, sql_iterations)),
+            ("depends", lambda: bench_depends(root, repeat)),
+            ("e2e", lambda: bench_end_to_end(root, repeat, workers)),
+        ]
+        results: Dict[str, Any] = {}
+        for group, bench in groups:
+            if group in skipped:
+                continue
+            typer.echo(f"⏱️  {group} ...")
+            for name, result in bench().items():
+                results[name] = result
+                typer.echo(f"   {name:<28} median {result['median']:.4f}s")
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "params": {"tasks": tasks, "repeat": repeat, "workers": workers, "sql_iterations": sql_iterations, "seed": seed},
+        "tree": {k: v for k, v in tree.items() if k != "root"},
+        "results": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    typer.echo(f"💾 结果已保存到: {output}")
+
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), threshold)
+        if regressions:
+            typer.echo(f"❌ 以下基准变慢超过 {threshold:.0%}: {', '.join(regressions)}", err=True)
+            raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
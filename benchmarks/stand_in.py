@@ -0,0 +1,34 @@
+"""本地替身执行器：不连接数据库，只模拟结果，用于测量框架自身的调度开销"""
+
+from typing import Any, Dict, List, Optional
+
+from executor.base_executor import BaseExecutor
+from executor.executor_pool import ExecutorPool, register_pool
+
+EXECUTOR_TYPE = "bench"
+
+
+class NullExecutor(BaseExecutor):
+    """丢弃全部语句的执行器，查询返回固定的小结果集"""
+
+    def connect(self) -> bool:
+        return True
+
+    def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
+        return {"status": "success", "rows_affected": 0}
+
+    def execute_query(self, sql: str, params: Optional[Dict] = None) -> List[Dict]:
+        return [{"id": 1, "value": "x"}]
+
+    def close(self):
+        pass
+
+
+class NullExecutorPool(ExecutorPool):
+    def _connect(self) -> BaseExecutor:
+        return NullExecutor(self.executor_config)
+
+
+def install(pool_size: int = 16):
+    """注册替身执行器的连接池，任务参数中 executor=bench 时使用"""
+    register_pool(EXECUTOR_TYPE, NullExecutorPool(EXECUTOR_TYPE, {}, {"size": pool_size}))
@@ -0,0 +1,115 @@
+"""合成数仓任务树生成器
+
+按 ods/dw/dim 分层生成任务文件：ods 任务读取源表写入 ods 表，dw 任务关联若干 ods/dw 表，
+dim 任务汇总 dw 表；依赖关系由 SQL 血缘与部分任务显式声明的 depends() 组成。
+"""
+
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 各层任务数占比
+LAYER_SHARES = {"ods": 0.5, "dw": 0.35, "dim": 0.15}
+
+_TASK_TEMPLATE = '''from warehouse.base_task import BaseTask
+
+
+class Task(BaseTask):
+    """{description}"""
+
+    def __init__(self):
+        super().__init__()
+        self.description = "{description}"
+
+    def get_sql_template(self) -> str:
+        return """
+{sql}
+        """
+{depends}'''
+
+_DEPENDS_TEMPLATE = """
+    def depends(self):
+        return {names!r}
+"""
+
+
+def _ods_sql(name: str, rng: random.Random) -> str:
+    return f"""        INSERT OVERWRITE TABLE ods.{name}
+        SELECT
+            id,
+            user_id,
+            amount,
+            /* IF mask_phone */
+            mask(phone) AS phone,
+            /* ELSE */
+            phone,
+            /* ENDIF */
+            create_time
+        FROM source.src_{rng.randint(0, 499):03d}
+        WHERE create_time >= '${{start_date}}'
+          AND create_time < '${{end_date}}'
+          /* IF region */
+          AND region = '${{region}}'
+          /* ENDIF */"""
+
+
+def _join_sql(layer: str, name: str, sources: List[str]) -> str:
+    lines = [
+        f"        INSERT OVERWRITE TABLE {layer}.{name}",
+        "        SELECT",
+        "            t0.id,",
+        "            t0.user_id,",
+        "            SUM(t0.amount) AS amount,",
+        f"            COUNT(DISTINCT t{len(sources) - 1}.id) AS cnt",
+        f"        FROM {sources[0]} t0",
+    ]
+    for i, source in enumerate(sources[1:], start=1):
+        lines.append(f"        LEFT JOIN {source} t{i} ON t{i}.user_id = t0.user_id")
+    lines += [
+        "        WHERE t0.create_time >= '${start_date}'",
+        "          AND t0.create_time < '${end_date}'",
+        "          /* IF min_amount */",
+        "          AND t0.amount >= ${min_amount}",
+        "          /* ENDIF */",
+        "        GROUP BY t0.id, t0.user_id",
+    ]
+    return "\n".join(lines)
+
+
+def generate_warehouse(root: Path, n_tasks: int = 5000, seed: int = 42) -> Dict[str, Any]:
+    """在 root/warehouse 下生成 n_tasks 个任务文件
+
+    Returns:
+        生成结果 {root, tasks, layers: {layer: count}, declared_depends}
+    """
+    rng = random.Random(seed)
+    warehouse_dir = Path(root) / "warehouse"
+    counts = {layer: max(1, int(n_tasks * share)) for layer, share in LAYER_SHARES.items()}
+    counts["ods"] += n_tasks - sum(counts.values())
+
+    tables: Dict[str, List[str]] = {layer: [] for layer in LAYER_SHARES}
+    declared = 0
+    for layer in LAYER_SHARES:
+        layer_dir = warehouse_dir / layer
+        layer_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(counts[layer]):
+            name = f"{layer}_{i:05d}"
+            depends = ""
+            if layer == "ods":
+                sql = _ods_sql(name, rng)
+            else:
+                # dw 读取 ods 与之前生成的 dw 表，dim 读取 dw 表
+                pool = tables["ods"] + tables["dw"] if layer == "dw" else tables["dw"]
+                sources = rng.sample(pool, k=min(len(pool), rng.randint(1, 4)))
+                sql = _join_sql(layer, name, sources)
+                # 约 1/10 的任务额外显式声明一个同层上游
+                if tables[layer] and rng.random() < 0.1:
+                    depends = _DEPENDS_TEMPLATE.format(names=[rng.choice(tables[layer]).split(".")[1]])
+                    declared += 1
+            description = f"synthetic {layer} task {i}"
+            (layer_dir / f"{name}.py").write_text(
+                _TASK_TEMPLATE.format(description=description, sql=sql, depends=depends), encoding="utf-8"
+            )
+            tables[layer].append(f"{layer}.{name}")
+
+    return {"root": str(root), "tasks": sum(counts.values()), "layers": counts, "declared_depends": declared}
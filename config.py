@@ -22,6 +22,43 @@ class Config:
 
     def __init__(self):
         self.default_executor = "hive"
+        # 本地缓存目录（依赖索引等）
+        self.cache_dir = Path(config("DWF_CACHE_DIR", default=".dwf_cache"))
+        # 查询结果缓存（默认关闭；也可以在单次运行中通过 cache_ttl 参数开启）
+        # invalidate：缓存关闭时仍在写入后使缓存失效（其他进程开启了缓存并共享缓存目录时打开）；
+        # stream_max_rows：iter_query 流式结果超过该行数时不缓存
+        self.query_cache = {
+            "enabled": config("DWF_QUERY_CACHE", default=False, cast=bool),
+            "invalidate": config("DWF_QUERY_CACHE_INVALIDATE", default=False, cast=bool),
+            "ttl": config("DWF_QUERY_CACHE_TTL", default=600, cast=int),
+            "stream_max_rows": config("DWF_QUERY_CACHE_STREAM_ROWS", default=100000, cast=int),
+            "memory_max_mb": config("DWF_QUERY_CACHE_MEMORY_MB", default=64, cast=int),
+            "disk_max_mb": config("DWF_QUERY_CACHE_DISK_MB", default=1024, cast=int),
+        }
+        # 性能指标：每次任务运行追加到 JSON Lines 文件，并为每个任务写一个 Prometheus textfile
+        # （prom_dir 可指向 node_exporter 的 --collector.textfile.directory）
+        self.metrics = {
+            "enabled": config("DWF_METRICS", default=True, cast=bool),
+            "jsonl_path": Path(config("DWF_METRICS_JSONL", default=str(self.cache_dir / "metrics" / "metrics.jsonl"))),
+            "prom_dir": Path(config("DWF_METRICS_PROM_DIR", default=str(self.cache_dir / "metrics" / "prom"))),
+        }
+        # 多机任务队列：db_path 需放在各 worker 主机都能访问的共享存储上；worker 每 lease/3 秒续租一次，
+        # 租约过期的任务重新入队，同一任务最多领取 max_attempts 次
+        self.queue = {
+            "db_path": Path(config("DWF_QUEUE_DB", default=str(self.cache_dir / "task_queue.db"))),
+            "lease": config("DWF_QUEUE_LEASE", default=300, cast=float),
+            "max_attempts": config("DWF_QUEUE_MAX_ATTEMPTS", default=3, cast=int),
+            # 判断租约过期时容忍的主机间时钟偏差（秒），各主机仍需 NTP 同步，租约应远大于该值
+            "clock_skew": config("DWF_QUEUE_CLOCK_SKEW", default=30, cast=float),
+        }
+        # 设置了 run_in_process 的 CPU 密集任务使用的进程池：workers 为进程数（0 表示 CPU 核数），
+        # 序列化后超过 inline_result_mb 的返回值经临时文件传回父进程
+        self.process_pool = {
+            "workers": config("DWF_PROCESS_WORKERS", default=0, cast=int),
+            "inline_result_mb": config("DWF_PROCESS_INLINE_RESULT_MB", default=4, cast=float),
+        }
+        # 每个执行器的 statement 配置：语句超时秒数（0 表示不限制，超时后取消服务端查询）、
+        # 连接类/瞬时错误的最大重试次数与指数退避的初始/最大等待秒数（默认只重试读，写语句需任务设置 retry_writes）
         self.executors = {
             "hive": {
                 "class": "executor.hive_executor.HiveExecutor",
@@ -31,8 +68,24 @@ class Config:
                     "database": config("HIVE_DBNAME", default="default"),
                     "user": config("HIVE_USER", default="hive_user"),
                     "password": config("HIVE_PASSWORD", default="hive_password"),
+                    # HiveServer2 认证方式：NONE/NOSASL/LDAP/CUSTOM/KERBEROS
+                    "auth": config("HIVE_AUTH", default="NONE"),
+                    # HiveServer2 可访问的共享目录，配置后 bulk_insert 使用暂存文件 + LOAD DATA
+                    "staging_dir": config("HIVE_STAGING_DIR", default=""),
+                },
+                "pool": {
+                    "size": config("HIVE_POOL_SIZE", default=4, cast=int),
+                    "max_lifetime": config("HIVE_POOL_MAX_LIFETIME", default=3600, cast=int),
+                    "idle_timeout": config("HIVE_POOL_IDLE_TIMEOUT", default=600, cast=int),
+                },
+                "statement": {
+                    "timeout": config("HIVE_STATEMENT_TIMEOUT", default=0, cast=float),
+                    "max_retries": config("HIVE_MAX_RETRIES", default=2, cast=int),
+                    "backoff": config("HIVE_RETRY_BACKOFF", default=1.0, cast=float),
+                    "backoff_max": config("HIVE_RETRY_BACKOFF_MAX", default=60.0, cast=float),
                 },
             },
+            # Spark Thrift Server（HiveServer2 协议）
             "spark": {
                 "class": "executor.hive_executor.SparkExecutor",
                 "config": {
@@ -41,6 +94,19 @@ class Config:
                     "database": config("SPARK_DBNAME", default="default"),
                     "user": config("SPARK_USER", default="spark_user"),
                     "password": config("SPARK_PASSWORD", default="spark_password"),
+                    "auth": config("SPARK_AUTH", default="NONE"),
+                    "staging_dir": config("SPARK_STAGING_DIR", default=""),
+                },
+                "pool": {
+                    "size": config("SPARK_POOL_SIZE", default=4, cast=int),
+                    "max_lifetime": config("SPARK_POOL_MAX_LIFETIME", default=3600, cast=int),
+                    "idle_timeout": config("SPARK_POOL_IDLE_TIMEOUT", default=600, cast=int),
+                },
+                "statement": {
+                    "timeout": config("SPARK_STATEMENT_TIMEOUT", default=0, cast=float),
+                    "max_retries": config("SPARK_MAX_RETRIES", default=2, cast=int),
+                    "backoff": config("SPARK_RETRY_BACKOFF", default=1.0, cast=float),
+                    "backoff_max": config("SPARK_RETRY_BACKOFF_MAX", default=60.0, cast=float),
                 },
             },
             "mysql": {
@@ -51,6 +117,19 @@ class Config:
                     "database": config("MYSQL_DBNAME", default="data_warehouse"),
                     "user": config("MYSQL_USER", default="root"),
                     "password": config("MYSQL_PASSWORD", default="password"),
+                    # 开启后 bulk_insert 使用 LOAD DATA LOCAL INFILE（服务端也需要开启 local_infile）
+                    "allow_local_infile": config("MYSQL_ALLOW_LOCAL_INFILE", default=False, cast=bool),
+                },
+                "pool": {
+                    "size": config("MYSQL_POOL_SIZE", default=8, cast=int),
+                    "max_lifetime": config("MYSQL_POOL_MAX_LIFETIME", default=3600, cast=int),
+                    "idle_timeout": config("MYSQL_POOL_IDLE_TIMEOUT", default=600, cast=int),
+                },
+                "statement": {
+                    "timeout": config("MYSQL_STATEMENT_TIMEOUT", default=0, cast=float),
+                    "max_retries": config("MYSQL_MAX_RETRIES", default=2, cast=int),
+                    "backoff": config("MYSQL_RETRY_BACKOFF", default=1.0, cast=float),
+                    "backoff_max": config("MYSQL_RETRY_BACKOFF_MAX", default=60.0, cast=float),
                 },
             },
             "postgresql": {
@@ -62,6 +141,56 @@ class Config:
                     "user": config("POSTGRESQL_USER", default="postgres"),
                     "password": config("POSTGRESQL_PASSWORD", default="password"),
                 },
+                "pool": {
+                    "size": config("POSTGRESQL_POOL_SIZE", default=8, cast=int),
+                    "max_lifetime": config("POSTGRESQL_POOL_MAX_LIFETIME", default=3600, cast=int),
+                    "idle_timeout": config("POSTGRESQL_POOL_IDLE_TIMEOUT", default=600, cast=int),
+                },
+                "statement": {
+                    "timeout": config("POSTGRESQL_STATEMENT_TIMEOUT", default=0, cast=float),
+                    "max_retries": config("POSTGRESQL_MAX_RETRIES", default=2, cast=int),
+                    "backoff": config("POSTGRESQL_RETRY_BACKOFF", default=1.0, cast=float),
+                    "backoff_max": config("POSTGRESQL_RETRY_BACKOFF_MAX", default=60.0, cast=float),
+                },
+            },
+            # 进程内嵌入式数据库，无需部署服务端，适合本地开发、小型集市和测试/基准
+            "sqlite": {
+                "class": "executor.sqlite_executor.SQLiteExecutor",
+                "config": {
+                    "database": config("SQLITE_DATABASE", default=str(self.cache_dir / "local" / "warehouse.sqlite")),
+                    # 每个 schema 作为独立文件 ATTACH，使 ods.xxx 形式的表名可用
+                    "schemas": config("SQLITE_SCHEMAS", default="source,ods,dw,dim"),
+                },
+                "pool": {
+                    "size": config("SQLITE_POOL_SIZE", default=4, cast=int),
+                    "max_lifetime": config("SQLITE_POOL_MAX_LIFETIME", default=3600, cast=int),
+                    "idle_timeout": config("SQLITE_POOL_IDLE_TIMEOUT", default=600, cast=int),
+                },
+                "statement": {
+                    "timeout": config("SQLITE_STATEMENT_TIMEOUT", default=0, cast=float),
+                    "max_retries": config("SQLITE_MAX_RETRIES", default=2, cast=int),
+                    "backoff": config("SQLITE_RETRY_BACKOFF", default=1.0, cast=float),
+                    "backoff_max": config("SQLITE_RETRY_BACKOFF_MAX", default=60.0, cast=float),
+                },
+            },
+            "duckdb": {
+                "class": "executor.duckdb_executor.DuckDBExecutor",
+                "config": {
+                    "database": config("DUCKDB_DATABASE", default=str(self.cache_dir / "local" / "warehouse.duckdb")),
+                    "schemas": config("DUCKDB_SCHEMAS", default="source,ods,dw,dim"),
+                    "threads": config("DUCKDB_THREADS", default=0, cast=int),
+                },
+                "pool": {
+                    "size": config("DUCKDB_POOL_SIZE", default=4, cast=int),
+                    "max_lifetime": config("DUCKDB_POOL_MAX_LIFETIME", default=3600, cast=int),
+                    "idle_timeout": config("DUCKDB_POOL_IDLE_TIMEOUT", default=600, cast=int),
+                },
+                "statement": {
+                    "timeout": config("DUCKDB_STATEMENT_TIMEOUT", default=0, cast=float),
+                    "max_retries": config("DUCKDB_MAX_RETRIES", default=2, cast=int),
+                    "backoff": config("DUCKDB_RETRY_BACKOFF", default=1.0, cast=float),
+                    "backoff_max": config("DUCKDB_RETRY_BACKOFF_MAX", default=60.0, cast=float),
+                },
             },
         }
 
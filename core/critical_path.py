@@ -0,0 +1,112 @@
+"""关键路径：根据历史耗时估计任务优先级、预计完成时间，并输出甘特图"""
+
+import heapq
+import statistics
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# 没有任何历史耗时时，每个任务的默认估计（秒）
+DEFAULT_DURATION = 1.0
+
+
+def estimate_durations(names: Iterable[str], history: Dict[str, float], done: Optional[Set[str]] = None) -> Dict[str, float]:
+    """每个任务的耗时估计
+
+    有历史记录的取历史均值，没有的取已知任务耗时的中位数；done 中的任务（本批次已成功、会被台账跳过）记为 0。
+    """
+    known = [d for d in history.values() if d is not None]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    done = done or set()
+    return {name: 0.0 if name in done else float(history.get(name, default)) for name in names}
+
+
+def remaining_lengths(order: List[str], downstreams: Dict[str, Set[str]], durations: Dict[str, float]) -> Dict[str, float]:
+    """每个任务到终点的最长剩余路径耗时（含自身），即调度优先级
+
+    Args:
+        order: 选中任务的拓扑序
+    """
+    selected = set(order)
+    lengths: Dict[str, float] = {}
+    for name in reversed(order):
+        children = downstreams.get(name, set()) & selected
+        lengths[name] = durations[name] + max((lengths[child] for child in children), default=0.0)
+    return lengths
+
+
+def critical_path(order: List[str], downstreams: Dict[str, Set[str]], lengths: Dict[str, float]) -> List[str]:
+    """从剩余路径最长的起点出发，每步走向剩余路径最长的下游，得到关键路径"""
+    if not order:
+        return []
+    selected = set(order)
+    has_upstream = set().union(*(downstreams.get(name, set()) & selected for name in order))
+    roots = [name for name in order if name not in has_upstream]
+    current = max(roots, key=lambda name: (lengths[name], name))
+    path = [current]
+    while True:
+        children = downstreams.get(current, set()) & selected
+        if not children:
+            return path
+        current = max(children, key=lambda name: (lengths[name], name))
+        path.append(current)
+
+
+def simulate(
+    order: List[str],
+    upstreams: Dict[str, Set[str]],
+    durations: Dict[str, float],
+    priorities: Dict[str, float],
+    workers: int,
+) -> Dict[str, Tuple[float, float]]:
+    """按优先级的列表调度模拟执行过程，返回每个任务的预计 (开始, 结束) 秒数
+
+    与 DagRunner 的策略一致：空闲 worker 总是取就绪任务中优先级（剩余路径）最高的一个。
+    """
+    selected = set(order)
+    waiting = {name: len(upstreams.get(name, set()) & selected) for name in order}
+    children: Dict[str, List[str]] = {name: [] for name in order}
+    for name in order:
+        for parent in upstreams.get(name, set()) & selected:
+            children[parent].append(name)
+
+    ready = [(-priorities[name], name) for name, count in waiting.items() if count == 0]
+    heapq.heapify(ready)
+    running: List[Tuple[float, str]] = []
+    schedule: Dict[str, Tuple[float, float]] = {}
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < max(1, workers):
+            _, name = heapq.heappop(ready)
+            schedule[name] = (now, now + durations[name])
+            heapq.heappush(running, (now + durations[name], name))
+        now, name = heapq.heappop(running)
+        for child in children[name]:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                heapq.heappush(ready, (-priorities[child], child))
+    return schedule
+
+
+def render_gantt(timeline: Dict[str, Dict[str, Any]], width: int = 50, max_rows: int = 40) -> str:
+    """将 {task: {start, end, status}} 渲染为文本甘特图（按开始时间排序，超过 max_rows 时只显示耗时最长的任务）"""
+    rows = [(name, t) for name, t in timeline.items() if t.get("start") is not None and t.get("end") is not None]
+    if not rows:
+        return ""
+    makespan = max(t["end"] for _, t in rows) or 1e-9
+    hidden = 0
+    if len(rows) > max_rows:
+        hidden = len(rows) - max_rows
+        rows = sorted(rows, key=lambda item: item[1]["end"] - item[1]["start"], reverse=True)[:max_rows]
+    rows.sort(key=lambda item: (item[1]["start"], item[0]))
+
+    name_width = min(max(len(name) for name, _ in rows), 32)
+    marks = {"failed": "x", "skipped": "-"}
+    lines = []
+    for name, t in rows:
+        begin = min(int(t["start"] / makespan * width), width - 1)
+        length = max(1, min(width - begin, round((t["end"] - t["start"]) / makespan * width)))
+        bar = " " * begin + marks.get(t.get("status"), "█") * length
+        flag = " *" if t.get("critical") else ""
+        lines.append(f"{name[:name_width]:<{name_width}} |{bar:<{width}}| {t['start']:7.1f}s ~ {t['end']:7.1f}s{flag}")
+    if hidden:
+        lines.append(f"... 其余 {hidden} 个较短的任务未显示")
+    return "\n".join(lines)
@@ -0,0 +1,391 @@
+"""任务执行：单任务执行与基于依赖图的并行调度"""
+
+import asyncio
+import heapq
+import inspect
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import typer
+
+from config import config
+from core.critical_path import critical_path, estimate_durations, remaining_lengths, simulate
+from core.metrics import AsyncInstrumentedExecutor, InstrumentedExecutor, TaskMetrics, export_metrics
+from core.process_pool import dump_result, get_process_pool, load_result, wants_process
+from core.profiler import profiled
+from core.query_cache import AsyncCachedExecutor, CachedExecutor, get_query_cache
+from core.retry import AsyncResilientExecutor, ResilientExecutor
+from core.run_ledger import get_run_ledger, params_fingerprint, partition_key
+from core.task_depends import TaskDepends
+from core.task_loader import TaskLoader
+from executor.async_executor import AsyncExecutorFactory
+from executor.executor_pool import borrow_executor
+from warehouse.base_task import Status
+
+
+def run_task(task_name: str, task_info: Dict[str, Any], params: Dict[str, Any], output_file: Optional[Path] = None) -> Any:
+    """执行单个任务，异常直接抛出，由调用方决定如何处理
+
+    同步任务使用连接池中的同步执行器；async 任务（async def main / async def execute）
+    在事件循环中运行，并获得一个异步执行器，可以在任务内用 asyncio.gather 并发发起查询。
+    设置了 run_in_process 的任务（CPU 密集的 Python 计算）提交到进程池，在子进程中重新创建执行器并执行。
+
+    warehouse 任务的每次运行记录在运行台账中（键为任务名 + 参数指纹 + 分区）。params["resume"] 为真时
+    （run-all / backfill / worker 批量执行，或单任务指定 --resume）同一分区已成功执行过的运行直接跳过，
+    返回 {"status": "skipped", "reason": "already succeeded"}；单任务默认总是执行，当天手动重跑不会被跳过。
+    params["force"] 为真时强制重跑，dry_run 既不读也不写台账；按水位线增量处理的运行（未指定日期区间）
+    每次处理的数据不同，只记录台账不跳过。
+    """
+    use_ledger = task_info.get("category") == "warehouse" and not params.get("dry_run")
+    if use_ledger:
+        ledger = get_run_ledger()
+        ledger_key = (task_name, params_fingerprint(params), partition_key(params))
+        resume = params.get("resume") and not params.get("force") and not _is_incremental_run(task_info["object"], params)
+        if resume and ledger.succeeded(*ledger_key):
+            typer.echo(f"⏭️  任务 {task_name} 分区 {ledger_key[2]} 已成功执行过，跳过（--force 强制重跑）")
+            return {"status": Status.SKIPPED, "reason": "already succeeded"}
+        ledger.start(*ledger_key)
+
+    if params.get("verbose"):
+        typer.echo(f"🚀 开始执行任务: {task_name}")
+        typer.echo(f"   参数: {params}")
+
+    executor_type = params.get("executor", "hive")
+    task_obj = task_info["object"]
+    metrics = TaskMetrics(task_name, executor_type, params)
+
+    # 指定 profile_dir 时在 cProfile 下执行（同一时刻只剖析一个任务，并行调度时任务会依次执行）
+    profile_dir = params.get("profile_dir")
+    try:
+        with profiled(task_name, profile_dir) if profile_dir else nullcontext():
+            if is_async_task(task_obj):
+                result = asyncio.run(_invoke_async_task(task_obj, executor_type, params, metrics))
+            elif wants_process(task_obj, params) and not profile_dir:
+                # cProfile 只能剖析当前进程，开启剖析时仍在线程中执行
+                payload = get_process_pool().submit(_run_in_child, str(task_info["path"]), executor_type, params).result()
+                metrics.merge(**payload["metrics"])
+                result = load_result(payload)
+            else:
+                # 从连接池借出执行器，同一进程内的任务复用已建立的会话
+                with borrow_executor(executor_type) as executor:
+                    result = _invoke_task(task_obj, _wrap_executor(executor, task_obj, executor_type, params, metrics), params)
+    except BaseException as e:
+        error = str(e) or type(e).__name__
+        metrics.finish(Status.FAILED, error)
+        _export_metrics(metrics)
+        if use_ledger:
+            ledger.finish(*ledger_key, Status.FAILED, metrics.wall_time, error)
+        raise
+    metrics.finish(Status.SUCCESS)
+    _export_metrics(metrics)
+    if use_ledger:
+        ledger.finish(*ledger_key, Status.SUCCESS, metrics.wall_time)
+
+    if output_file:
+        with open(output_file, "w") as f:
+            if isinstance(result, (dict, list)):
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            else:
+                f.write(str(result))
+        typer.echo(f"💾 结果已保存到: {output_file}")
+
+    typer.echo(f"✅ 任务 {task_name} 执行完成（耗时 {metrics.wall_time:.2f}s，{len(metrics.statements)} 条语句）")
+    return result
+
+
+# 进程池子进程中已导入的任务 {文件路径: 任务信息}
+_child_tasks: Dict[str, Dict[str, Any]] = {}
+
+
+def _run_in_child(task_path: str, executor_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """进程池子进程的入口：导入任务，从子进程自己的连接池借用执行器执行，返回结果与语句指标"""
+    task_info = _child_tasks.get(task_path)
+    if task_info is None:
+        task_info = TaskLoader(Path(task_path).parent.parent).load_task_file(Path(task_path))
+        if task_info is None:
+            raise ValueError(f"无法加载任务: {task_path}")
+        _child_tasks[task_path] = task_info
+    task_obj = task_info["object"]
+    metrics = TaskMetrics(Path(task_path).stem, executor_type, params)
+    with borrow_executor(executor_type) as executor:
+        result = _invoke_task(task_obj, _wrap_executor(executor, task_obj, executor_type, params, metrics), params)
+    payload = dump_result(result)
+    payload["metrics"] = {"statements": metrics.statements, "retries": metrics.retries, "connect_time": metrics.connect_time}
+    return payload
+
+
+def _export_metrics(metrics: TaskMetrics):
+    """导出性能指标；导出失败（磁盘已满、目录无权限等）只告警，不覆盖任务本身的异常或成功结果"""
+    try:
+        export_metrics(metrics)
+    except Exception as e:
+        typer.echo(f"⚠️ 任务 {metrics.task_name} 的性能指标导出失败: {e}", err=True)
+
+
+def _is_incremental_run(task_obj: Any, params: Dict[str, Any]) -> bool:
+    """是否为按水位线增量处理的运行（设置了 watermark_column 且未指定 start_date）"""
+    return bool(getattr(task_obj, "watermark_column", None)) and not params.get("start_date")
+
+
+def is_async_task(task_obj: Any) -> bool:
+    """任务入口是否为协程函数"""
+    if isinstance(task_obj, type) or not callable(task_obj):
+        return inspect.iscoroutinefunction(getattr(task_obj, "execute", None))
+    return inspect.iscoroutinefunction(task_obj)
+
+
+def _invoke_task(task_obj: Any, executor: Any, params: Dict[str, Any]) -> Any:
+    if isinstance(task_obj, type):
+        task_instance = task_obj()
+        if hasattr(task_instance, "validate_params"):
+            task_instance.validate_params(params)
+        return task_instance.execute(executor, params)
+    elif callable(task_obj):
+        return task_obj(executor, params)
+    else:
+        return task_obj.execute(executor, params)
+
+
+def _wrap_executor(executor: Any, task_obj: Any, executor_type: str, params: Dict[str, Any], metrics: TaskMetrics) -> Any:
+    """为借出的同步执行器依次加上语句超时/重试、性能指标与查询缓存（由内到外）"""
+    executor = InstrumentedExecutor(_with_statement_policy(executor, task_obj, executor_type, params), metrics)
+    return _with_query_cache(executor, executor_type, params)
+
+
+def _wrap_async_executor(executor: Any, task_obj: Any, executor_type: str, params: Dict[str, Any], metrics: TaskMetrics) -> Any:
+    """_wrap_executor 的异步版本，用于原生异步执行器（aiomysql / asyncpg）"""
+    policy = _statement_policy(task_obj, executor_type, params)
+    if policy:
+        executor = AsyncResilientExecutor(executor, **policy)
+    executor = AsyncInstrumentedExecutor(executor, metrics)
+    cache = _query_cache_settings(params)
+    if cache:
+        executor = AsyncCachedExecutor(executor, get_query_cache(), executor_type, **cache)
+    return executor
+
+
+def _statement_policy(task_obj: Any, executor_type: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """语句超时与失败重试的参数，超时与重试次数都为 0 时返回 None
+
+    超时秒数、重试次数与是否重试写语句依次取 params（statement_timeout / max_retries / retry_writes）、
+    任务类属性、config.executors[...]["statement"]。
+    """
+    settings = dict(config.executors.get(executor_type, {}).get("statement", {}))
+    for key, setting in (("statement_timeout", "timeout"), ("max_retries", "max_retries"), ("retry_writes", "retry_writes")):
+        value = params.get(key)
+        if value is None:
+            value = getattr(task_obj, key, None)
+        if value is not None:
+            settings[setting] = value
+    timeout = float(settings.get("timeout") or 0)
+    max_retries = int(settings.get("max_retries") or 0)
+    if timeout <= 0 and max_retries <= 0:
+        return None
+    return {
+        "timeout": timeout,
+        "max_retries": max_retries,
+        "backoff": settings.get("backoff", 1.0),
+        "backoff_max": settings.get("backoff_max", 60.0),
+        "retry_writes": bool(settings.get("retry_writes", False)),
+    }
+
+
+def _with_statement_policy(executor: Any, task_obj: Any, executor_type: str, params: Dict[str, Any]) -> Any:
+    """按配置为执行器加上语句超时与失败重试，两者都为 0 时不包装"""
+    policy = _statement_policy(task_obj, executor_type, params)
+    return ResilientExecutor(executor, **policy) if policy else executor
+
+
+def _query_cache_settings(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """查询结果缓存的参数，不需要包装时返回 None
+
+    缓存开启（DWF_QUERY_CACHE）或本次指定了 cache_ttl 时读取/写入缓存；缓存关闭时只有显式开启
+    DWF_QUERY_CACHE_INVALIDATE 才包一层（只维护写入后的失效），否则每条写语句都要解析血缘并写缓存库。
+    """
+    settings = config.query_cache
+    ttl = float(params.get("cache_ttl", settings["ttl"] if settings["enabled"] else 0))
+    if ttl <= 0 and not settings["enabled"] and not settings["invalidate"]:
+        return None
+    return {"ttl": ttl, "stream_max_rows": settings["stream_max_rows"]}
+
+
+def _with_query_cache(executor: Any, executor_type: str, params: Dict[str, Any]) -> Any:
+    """按配置为执行器加上查询结果缓存"""
+    cache = _query_cache_settings(params)
+    return CachedExecutor(executor, get_query_cache(), executor_type, **cache) if cache else executor
+
+
+async def _invoke_async_task(task_obj: Any, executor_type: str, params: Dict[str, Any], metrics: TaskMetrics) -> Any:
+    """在事件循环中执行 async 任务
+
+    原生异步执行器外层加上 AsyncResilientExecutor / AsyncInstrumentedExecutor / AsyncCachedExecutor；
+    在线程中执行的同步引擎对每次借出的同步执行器加上与同步任务相同的代理，两种情况都有语句指标、超时重试与缓存。
+    """
+
+    def wrap(executor: Any) -> Any:
+        return _wrap_executor(executor, task_obj, executor_type, params, metrics)
+
+    executor_settings = config.executors.get(executor_type, {})
+    pool_size = executor_settings.get("pool", {}).get("size", 10)
+    executor = AsyncExecutorFactory.create_executor(executor_type, executor_settings.get("config", {}), pool_size, wrap=wrap)
+    if not await executor.connect():
+        raise ConnectionError(f"{executor_type} 连接失败")
+    try:
+        task_executor = executor
+        if executor_type in AsyncExecutorFactory.native_types:
+            task_executor = _wrap_async_executor(executor, task_obj, executor_type, params, metrics)
+        return await _invoke_task(task_obj, task_executor, params)
+    finally:
+        await executor.close()
+
+
+class DagRunner:
+    """依赖图调度器
+
+    上游全部成功的任务进入就绪队列，由有界线程池并发执行；
+    任务失败时其全部下游标记为 skipped，其余无关分支继续执行。
+    就绪队列按关键路径排序：根据运行台账中的历史耗时，到终点的剩余路径最长的任务优先启动。
+    """
+
+    def __init__(
+        self,
+        tasks: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+        fail_fast: bool = False,
+        task_loader: Optional[TaskLoader] = None,
+    ):
+        """
+        Args:
+            tasks: 已加载的任务字典；为 None 时依赖图取自磁盘索引，任务模块在执行前才导入
+        """
+        self.task_loader = task_loader or TaskLoader(Path("warehouse"))
+        self.tasks = dict(tasks) if tasks is not None else {}
+        self.max_workers = max(1, max_workers)
+        self.fail_fast = fail_fast
+        self.depends = TaskDepends(tasks, task_loader=self.task_loader)
+        self.depends.build_graph()
+        # _task_info 在线程池中调用，按需导入任务模块并写入 self.tasks（可重入，子类加锁后仍可调用基类实现）
+        self._tasks_lock = threading.RLock()
+
+    def run(self, params: Dict[str, Any], selector: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """按依赖顺序执行选中的任务
+
+        Returns:
+            执行结果 {task_name: {status, error, duration, start, end}}，start/end 为相对本次运行开始的秒数
+        """
+        selected = self.depends.select(selector)
+        # 提前校验是否有环，避免调度过程中卡死
+        order = self.depends.topological_order(selected)
+        self.plan = self.make_plan(order, params)
+
+        results: Dict[str, Dict[str, Any]] = {name: {"status": Status.PENDING} for name in selected}
+        remaining = {name: self.depends.upstreams[name] & selected for name in selected}
+        ready: List[Tuple[float, str]] = []
+        running: Dict[Future, str] = {}
+        stopped = False
+
+        if params.get("verbose"):
+            typer.echo(f"📋 待执行任务 {len(selected)} 个，并发数 {self.max_workers}")
+        if order:
+            path = self.plan["critical_path"]
+            typer.echo(
+                f"📈 预计耗时 {self.plan['makespan']:.1f}s，预计完成时间 {self.plan['finish_at']:%H:%M:%S}"
+                f"（{self.plan['estimated']}/{len(order)} 个任务有历史耗时）"
+            )
+            typer.echo(f"   关键路径: {' → '.join(path[:8])}{' → ...' if len(path) > 8 else ''}")
+
+        self._started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dwf-task") as pool:
+            while True:
+                if not stopped:
+                    for name in [n for n, deps in remaining.items() if not deps]:
+                        del remaining[name]
+                        heapq.heappush(ready, (-self.plan["priorities"][name], name))
+                    # 只在有空闲 worker 时才提交，保证后就绪的高优先级任务不会排在已提交的任务之后
+                    while ready and len(running) < self.max_workers:
+                        _, name = heapq.heappop(ready)
+                        results[name]["status"] = Status.RUNNING
+                        running[pool.submit(self._run_one, name, params)] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name].update(future.result())
+                    if results[name]["status"] == Status.SUCCESS:
+                        for child in self.depends.downstreams[name]:
+                            if child in remaining:
+                                remaining[child].discard(name)
+                    else:
+                        self._skip_downstream(name, selected, remaining, results)
+                        if self.fail_fast:
+                            stopped = True
+
+        for name in list(remaining) + [name for _, name in ready]:
+            results[name]["status"] = Status.SKIPPED
+        return results
+
+    def make_plan(self, order: List[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """根据运行台账中的历史耗时计算调度优先级、关键路径与预计完成时间
+
+        本批次已成功（会被台账跳过）的任务耗时记为 0；没有历史耗时的任务取已知耗时的中位数。
+        """
+        ledger = get_run_ledger()
+        history = ledger.durations()
+        done: Set[str] = set()
+        if not params.get("dry_run") and not params.get("force"):
+            done = ledger.succeeded_tasks(params_fingerprint(params), partition_key(params))
+        durations = estimate_durations(order, history, done)
+        priorities = remaining_lengths(order, self.depends.downstreams, durations)
+        schedule = simulate(order, self.depends.upstreams, durations, priorities, self.max_workers)
+        makespan = max((end for _, end in schedule.values()), default=0.0)
+        return {
+            "durations": durations,
+            "priorities": priorities,
+            "critical_path": critical_path(order, self.depends.downstreams, priorities),
+            "schedule": schedule,
+            "makespan": makespan,
+            "finish_at": datetime.now() + timedelta(seconds=makespan),
+            "estimated": sum(1 for name in order if name in history),
+        }
+
+    def _run_one(self, task_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.monotonic()
+        try:
+            result = run_task(task_name, self._task_info(task_name), dict(params, resume=True))
+            # 台账中已成功的任务不再执行，对下游而言等同于成功
+            reused = isinstance(result, dict) and result.get("reason") == "already succeeded"
+            return {"status": Status.SUCCESS, "reused": reused, **self._timing(start)}
+        except Exception as e:
+            typer.echo(f"❌ 任务 {task_name} 执行失败: {e}", err=True)
+            return {"status": Status.FAILED, "error": str(e), **self._timing(start)}
+
+    def _timing(self, start: float) -> Dict[str, float]:
+        end = time.monotonic()
+        return {"duration": end - start, "start": start - self._started, "end": end - self._started}
+
+    def _task_info(self, task_name: str) -> Dict[str, Any]:
+        with self._tasks_lock:
+            if task_name not in self.tasks:
+                task_info = self.task_loader.load_task_file(Path(self.depends.entries[task_name]["path"]))
+                if task_info is None:
+                    raise ValueError(f"无法加载任务: {task_name}")
+                self.tasks[task_name] = task_info
+            return self.tasks[task_name]
+
+    def _skip_downstream(
+        self, task_name: str, selected: Set[str], remaining: Dict[str, Set[str]], results: Dict[str, Dict[str, Any]]
+    ):
+        for child in self.depends.downstream(task_name) & selected:
+            if child in remaining:
+                del remaining[child]
+                results[child]["status"] = Status.SKIPPED
+                results[child]["error"] = f"上游任务 {task_name} 失败"
@@ -0,0 +1,376 @@
+"""性能指标：记录任务与 SQL 语句的耗时、行数、字节数，导出为 JSON Lines 与 Prometheus textfile"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from config import config
+
+# 估算结果字节数时最多采样的行数
+_SAMPLE_ROWS = 100
+# 语句记录中保留的 SQL 长度
+_SQL_PREVIEW_CHARS = 200
+
+_jsonl_lock = threading.Lock()
+
+
+def estimate_bytes(rows: List[Any]) -> int:
+    """估算结果集的字节数：按前若干行的平均大小外推，避免逐行计算的开销"""
+    if not rows:
+        return 0
+    sample = rows[:_SAMPLE_ROWS]
+    size = 0
+    for row in sample:
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            if value is None:
+                size += 1
+            elif isinstance(value, (str, bytes)):
+                size += len(value)
+            else:
+                size += 8
+    return size * len(rows) // len(sample)
+
+
+class TaskMetrics:
+    """单次任务运行的指标
+
+    wall_time 为任务总耗时，connect_time 为本次运行中新建连接的耗时（复用连接池中的连接为 0），
+    rows/bytes/retries 为全部语句的汇总，statements 为逐条语句的记录。
+    """
+
+    def __init__(self, task_name: str, executor_type: str, params: Optional[Dict[str, Any]] = None):
+        params = params or {}
+        self.task_name = task_name
+        self.executor_type = executor_type
+        self.partition = f"{params.get('start_date') or ''}~{params.get('end_date') or ''}".strip("~")
+        self.dry_run = bool(params.get("dry_run"))
+        self.started_at = datetime.now()
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.wall_time = 0.0
+        self.connect_time = 0.0
+        self.retries = 0
+        self.statements: List[Dict[str, Any]] = []
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        return sum(s["rows"] for s in self.statements)
+
+    @property
+    def bytes(self) -> int:
+        return sum(s["bytes"] for s in self.statements)
+
+    def add_connect_time(self, seconds: float):
+        with self._lock:
+            self.connect_time += seconds
+
+    def add_retry(self, count: int = 1):
+        with self._lock:
+            self.retries += count
+
+    def record_statement(
+        self, kind: str, sql: str, wall_time: float, rows: int = 0, nbytes: int = 0, status: str = "success", retries: int = 0
+    ):
+        """记录一条语句的执行结果"""
+        text = " ".join(sql.split())
+        record = {
+            "kind": kind,
+            "sql_id": hashlib.sha1(text.encode("utf-8")).hexdigest()[:12],
+            "sql": text[:_SQL_PREVIEW_CHARS],
+            "wall_time": round(wall_time, 6),
+            "rows": rows,
+            "bytes": nbytes,
+            "retries": retries,
+            "status": status,
+        }
+        with self._lock:
+            self.statements.append(record)
+            self.retries += retries
+
+    def merge(self, statements: List[Dict[str, Any]], retries: int = 0, connect_time: float = 0.0):
+        """合并子进程中记录的语句指标（进程池中执行的任务）"""
+        with self._lock:
+            self.statements.extend(statements)
+            self.retries += retries
+            self.connect_time += connect_time
+
+    def finish(self, status: str, error: Optional[str] = None):
+        self.wall_time = time.monotonic() - self._start
+        self.status = status
+        self.error = error
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """转换为 JSON Lines 记录：一条任务记录 + 每条语句一条记录"""
+        base = {"task": self.task_name, "executor": self.executor_type, "partition": self.partition}
+        task_record = {
+            "type": "task",
+            **base,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "status": self.status,
+            "error": self.error,
+            "dry_run": self.dry_run,
+            "wall_time": round(self.wall_time, 6),
+            "connect_time": round(self.connect_time, 6),
+            "statements": len(self.statements),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "retries": self.retries,
+        }
+        statement_records = [{"type": "statement", **base, "seq": i, **s} for i, s in enumerate(self.statements)]
+        return [task_record] + statement_records
+
+
+class InstrumentedExecutor:
+    """记录每条语句指标的执行器代理
+
+    execute_sql / execute_script / execute_query / iter_query / bulk_insert 的耗时、行数、字节数与重试次数记录到 TaskMetrics，
+    其余属性与方法透传给原执行器。
+    """
+
+    def __init__(self, executor: Any, metrics: TaskMetrics):
+        self._executor = executor
+        self._metrics = metrics
+        take_connect_time = getattr(executor, "take_connect_time", None)
+        if take_connect_time is not None:
+            metrics.add_connect_time(take_connect_time())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._executor, name)
+
+    def without_cache(self) -> Any:
+        # 查询缓存（CachedExecutor）总在最外层，内层代理本身就不经过缓存
+        return self
+
+    def _retries(self) -> int:
+        # 外层有 ResilientExecutor 时取其最近一次调用的重试次数
+        return getattr(self._executor, "last_retries", 0)
+
+    def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
+        start = time.monotonic()
+        try:
+            result = self._executor.execute_sql(sql, params)
+        except Exception:
+            self._metrics.record_statement(
+                "execute_sql", sql, time.monotonic() - start, status="failed", retries=self._retries()
+            )
+            raise
+        rows = result.get("rows_affected") if isinstance(result, dict) else result if isinstance(result, int) else 0
+        self._metrics.record_statement(
+            "execute_sql", sql, time.monotonic() - start, rows=max(rows or 0, 0), retries=self._retries()
+        )
+        return result
+
+    def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        # 一批语句在一次调用中执行，作为一条 script 记录（sql 为拼接后的脚本）
+        script = ";\n".join(statements)
+        start = time.monotonic()
+        try:
+            result = self._executor.execute_script(statements, transaction)
+        except Exception:
+            self._metrics.record_statement(
+                "execute_script", script, time.monotonic() - start, status="failed", retries=self._retries()
+            )
+            raise
+        rows = result.get("rows_affected") if isinstance(result, dict) else 0
+        self._metrics.record_statement(
+            "execute_script", script, time.monotonic() - start, rows=max(rows or 0, 0), retries=self._retries()
+        )
+        return result
+
+    def execute_query(self, sql: str, params: Optional[Dict] = None) -> List[Dict]:
+        start = time.monotonic()
+        try:
+            rows = self._executor.execute_query(sql, params)
+        except Exception:
+            self._metrics.record_statement(
+                "execute_query", sql, time.monotonic() - start, status="failed", retries=self._retries()
+            )
+            raise
+        elapsed = time.monotonic() - start
+        self._metrics.record_statement(
+            "execute_query", sql, elapsed, rows=len(rows), nbytes=estimate_bytes(rows), retries=self._retries()
+        )
+        return rows
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        # 流式查询的耗时只统计从服务端取数的时间，不含调用方处理每批数据的时间
+        elapsed = 0.0
+        rows = 0
+        nbytes = 0
+        status = "success"
+        iterator = iter(self._executor.iter_query(sql, params, batch_size))
+        try:
+            while True:
+                start = time.monotonic()
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    elapsed += time.monotonic() - start
+                    break
+                elapsed += time.monotonic() - start
+                rows += len(batch)
+                nbytes += estimate_bytes(batch)
+                yield batch
+        except GeneratorExit:
+            # 调用方提前停止读取不算失败
+            raise
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            self._metrics.record_statement(
+                "iter_query", sql, elapsed, rows=rows, nbytes=nbytes, status=status, retries=self._retries()
+            )
+
+    def bulk_insert(self, table: str, *args, **kwargs) -> int:
+        start = time.monotonic()
+        try:
+            rows = self._executor.bulk_insert(table, *args, **kwargs)
+        except Exception:
+            self._metrics.record_statement(
+                "bulk_insert", f"BULK INSERT {table}", time.monotonic() - start, status="failed", retries=self._retries()
+            )
+            raise
+        self._metrics.record_statement(
+            "bulk_insert", f"BULK INSERT {table}", time.monotonic() - start, rows=rows or 0, retries=self._retries()
+        )
+        return rows
+
+
+class AsyncInstrumentedExecutor:
+    """InstrumentedExecutor 的异步版本，用于 async 任务的原生异步执行器（aiomysql / asyncpg）"""
+
+    def __init__(self, executor: Any, metrics: TaskMetrics):
+        self._executor = executor
+        self._metrics = metrics
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._executor, name)
+
+    def without_cache(self) -> Any:
+        return self
+
+    def _retries(self) -> int:
+        return getattr(self._executor, "last_retries", 0)
+
+    async def _record(self, kind: str, sql: str, call, rows_of=lambda result: 0, bytes_of=lambda result: 0) -> Any:
+        start = time.monotonic()
+        try:
+            result = await call
+        except Exception:
+            self._metrics.record_statement(kind, sql, time.monotonic() - start, status="failed", retries=self._retries())
+            raise
+        self._metrics.record_statement(
+            kind, sql, time.monotonic() - start, rows=rows_of(result), nbytes=bytes_of(result), retries=self._retries()
+        )
+        return result
+
+    async def execute_sql(self, sql: str, params: Optional[Any] = None) -> Any:
+        return await self._record("execute_sql", sql, self._executor.execute_sql(sql, params), _rows_affected)
+
+    async def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        script = ";\n".join(statements)
+        return await self._record(
+            "execute_script", script, self._executor.execute_script(statements, transaction), _rows_affected
+        )
+
+    async def execute_query(self, sql: str, params: Optional[Any] = None) -> List[Dict]:
+        return await self._record("execute_query", sql, self._executor.execute_query(sql, params), len, estimate_bytes)
+
+    async def bulk_insert(self, table: str, *args, **kwargs) -> int:
+        call = self._executor.bulk_insert(table, *args, **kwargs)
+        return await self._record("bulk_insert", f"BULK INSERT {table}", call, lambda rows: rows or 0)
+
+    async def iter_query(self, sql: str, params: Optional[Any] = None, batch_size: int = 10000) -> AsyncIterator[List[Dict]]:
+        elapsed = 0.0
+        rows = 0
+        nbytes = 0
+        status = "success"
+        iterator = self._executor.iter_query(sql, params, batch_size).__aiter__()
+        try:
+            while True:
+                start = time.monotonic()
+                try:
+                    batch = await iterator.__anext__()
+                except StopAsyncIteration:
+                    elapsed += time.monotonic() - start
+                    break
+                elapsed += time.monotonic() - start
+                rows += len(batch)
+                nbytes += estimate_bytes(batch)
+                yield batch
+        except GeneratorExit:
+            raise
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            self._metrics.record_statement(
+                "iter_query", sql, elapsed, rows=rows, nbytes=nbytes, status=status, retries=self._retries()
+            )
+
+
+def _rows_affected(result: Any) -> int:
+    rows = result.get("rows_affected") if isinstance(result, dict) else result if isinstance(result, int) else 0
+    return max(rows or 0, 0)
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# (指标名, 说明, 取值函数)
+_PROM_METRICS = [
+    ("dwf_task_duration_seconds", "Wall time of the last task run.", lambda m: m.wall_time),
+    ("dwf_task_connect_seconds", "Time spent opening new connections in the last task run.", lambda m: m.connect_time),
+    ("dwf_task_statements", "Statements executed in the last task run.", lambda m: len(m.statements)),
+    ("dwf_task_rows", "Rows returned or affected in the last task run.", lambda m: m.rows),
+    ("dwf_task_bytes", "Estimated bytes fetched in the last task run.", lambda m: m.bytes),
+    ("dwf_task_retries", "Statement retries in the last task run.", lambda m: m.retries),
+    ("dwf_task_success", "Whether the last task run succeeded (1) or failed (0).", lambda m: int(m.status == "success")),
+    ("dwf_task_last_run_timestamp_seconds", "Start time of the last task run.", lambda m: m.started_at.timestamp()),
+]
+
+
+def render_prometheus(metrics: TaskMetrics) -> str:
+    """渲染为 Prometheus 文本格式（node_exporter textfile collector）"""
+    labels = f'task="{_escape_label(metrics.task_name)}",executor="{_escape_label(metrics.executor_type)}"'
+    lines = []
+    for name, help_text, getter in _PROM_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name}{{{labels}}} {getter(metrics)}")
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(metrics: TaskMetrics):
+    """追加 JSON Lines 记录，并原子替换该任务的 Prometheus textfile"""
+    settings = config.metrics
+    if not settings["enabled"]:
+        return
+
+    jsonl_path = settings["jsonl_path"]
+    jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in metrics.to_records())
+    with _jsonl_lock, open(jsonl_path, "a", encoding="utf-8") as f:
+        f.write(payload)
+
+    # dry-run 不代表真实耗时，不覆盖 Prometheus 中的最近一次运行
+    if metrics.dry_run:
+        return
+    prom_dir = settings["prom_dir"]
+    prom_dir.mkdir(parents=True, exist_ok=True)
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", metrics.task_name)
+    prom_path = prom_dir / f"dwf_task_{safe_name}.prom"
+    tmp_path = prom_path.with_name(f".{prom_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus(metrics))
+    os.replace(tmp_path, prom_path)
@@ -0,0 +1,81 @@
+"""CPU 密集任务的进程池
+
+纯 Python 计算持有 GIL，在线程池中无法利用多核；设置了 run_in_process 的任务提交到进程池执行，
+子进程从自己的连接池借用执行器。进程池使用 spawn 方式启动子进程（父进程中已有调度线程与数据库连接，fork 不安全），
+子进程在首次提交时创建并在任务之间复用。
+较大的返回值由子进程写入临时文件，只把文件路径经进程间管道传回，避免大结果在管道中分块传输。
+"""
+
+import atexit
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import config
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def wants_process(task_obj: Any, params: Dict[str, Any]) -> bool:
+    """任务是否在进程池中执行：params["run_in_process"] 优先，其次为任务类或函数的 run_in_process 属性"""
+    value = params.get("run_in_process")
+    if value is None:
+        value = getattr(task_obj, "run_in_process", False)
+    return bool(value)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """获取（首次调用时创建）全局进程池，进程数取 config.process_pool["workers"]，0 表示 CPU 核数"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = config.process_pool["workers"] or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_process_pool():
+    """关闭进程池（进程退出时自动调用）"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def dump_result(result: Any) -> Dict[str, Any]:
+    """子进程中打包返回值
+
+    返回值只序列化一次：不超过 inline_result_mb 时直接返回序列化后的 bytes（进程池传输 bytes 几乎没有额外开销），
+    超过时写入临时文件，只返回文件路径。
+    """
+    data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) <= config.process_pool["inline_result_mb"] * 1024 * 1024:
+        return {"result_bytes_inline": data}
+    result_dir = config.cache_dir / "process_results"
+    result_dir.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".pickle", dir=result_dir)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    return {"result_file": path, "result_bytes": len(data)}
+
+
+def load_result(payload: Dict[str, Any]) -> Any:
+    """父进程中还原返回值，读取后删除临时文件"""
+    if "result_file" not in payload:
+        return pickle.loads(payload["result_bytes_inline"])
+    path = Path(payload["result_file"])
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+atexit.register(shutdown_process_pool)
@@ -0,0 +1,93 @@
+"""任务性能剖析：cProfile 输出 pstats 文件与火焰图工具可读的 collapsed stack 文件"""
+
+import cProfile
+import os
+import pstats
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import typer
+
+# 同一时刻只能有一个 cProfile 处于开启状态（Python 3.12+ 基于 sys.monitoring）
+_profile_lock = threading.Lock()
+
+# 展开调用栈的最大深度，以及忽略的最小耗时（秒），避免调用图过大时栈数量爆炸
+_MAX_DEPTH = 64
+_MIN_SECONDS = 1e-6
+
+_Func = Tuple[str, int, str]
+
+
+def _frame_label(func: _Func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        # 内置函数，如 <built-in method time.sleep>
+        return name.strip("<>")
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapse_stats(stats: pstats.Stats) -> Dict[str, float]:
+    """将 cProfile 的调用图展开为 collapsed stack {"root;caller;callee": 自身耗时秒数}
+
+    cProfile 只记录调用方 -> 被调用方的边，函数在某条调用栈上的自身耗时按该边累计耗时占函数总累计耗时的比例分摊。
+    """
+    raw = stats.stats  # func -> (cc, nc, tottime, cumtime, callers)
+    callees: Dict[_Func, Dict[_Func, float]] = defaultdict(dict)
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+
+    stacks: Dict[str, float] = defaultdict(float)
+
+    def walk(func: _Func, path: List[_Func], labels: List[str], fraction: float):
+        _, _, tottime, cumtime, _ = raw[func]
+        path.append(func)
+        labels.append(_frame_label(func))
+        if tottime * fraction >= _MIN_SECONDS:
+            stacks[";".join(labels)] += tottime * fraction
+        if len(path) < _MAX_DEPTH:
+            for child, edge_cumtime in callees.get(func, {}).items():
+                child_cumtime = raw[child][3]
+                if child in path or child_cumtime <= 0 or edge_cumtime * fraction < _MIN_SECONDS:
+                    continue
+                walk(child, path, labels, fraction * min(edge_cumtime / child_cumtime, 1.0))
+        path.pop()
+        labels.pop()
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(func, [], [], 1.0)
+    return stacks
+
+
+def write_collapsed(stats: pstats.Stats, path: Path):
+    """写出 collapsed stack 文件（每行 "frame;frame;frame 微秒数"，可直接交给 flamegraph.pl / speedscope）"""
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, seconds in sorted(collapse_stats(stats).items()):
+            micros = int(round(seconds * 1e6))
+            if micros > 0:
+                f.write(f"{stack} {micros}\n")
+
+
+@contextmanager
+def profiled(name: str, profile_dir: Path) -> Iterator[None]:
+    """在 cProfile 下执行代码块，结束后写出 <name>.<时间戳>.pstats 与 .collapsed 文件"""
+    with _profile_lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profile_dir = Path(profile_dir)
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+            stats = pstats.Stats(profiler)
+            stats.dump_stats(profile_dir / f"{stem}.pstats")
+            write_collapsed(stats, profile_dir / f"{stem}.collapsed")
+            typer.echo(f"🔬 性能剖析已保存到: {profile_dir / stem}.pstats / .collapsed")
@@ -0,0 +1,393 @@
+"""查询结果缓存：按执行器与渲染后的 SQL 缓存 execute_query / iter_query 结果"""
+
+import asyncio
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from config import config
+from core.sql_lineage import extract_lineage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entry_tables (
+    key TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    PRIMARY KEY (table_name, key)
+);
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access);
+"""
+
+
+class QueryCache:
+    """两级查询结果缓存
+
+    内存层为进程内 LRU，磁盘层为 SQLite 文件（多进程共享）；两层都按字节数限制容量，
+    超出时淘汰最久未访问的条目。每个条目记录查询读取的表，写入这些表时条目失效。
+    磁盘层维护每张表的版本号，内存层命中时校验版本，保证其他进程的写入也能使本进程的内存缓存失效。
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.db_path = db_path or config.cache_dir / "query_cache.db"
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        # key -> (payload, expires_at, {table: version})
+        self._memory: "OrderedDict[str, Tuple[bytes, float, Dict[str, int]]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    @staticmethod
+    def make_key(executor_type: str, executor_config: Dict[str, Any], sql: str, params: Any = None) -> str:
+        """缓存键：执行器类型 + 目标库 + 渲染后的 SQL + 绑定参数"""
+        target = {k: executor_config.get(k) for k in ("host", "port", "database")}
+        raw = json.dumps([executor_type, target, sql.strip(), params], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开磁盘层连接，正常退出时提交并关闭"""
+        if not self._schema_ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """读取缓存，未命中或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None and item[1] <= now:
+                self._pop_memory(key)
+                item = None
+
+        if item is not None:
+            if not item[2] or self.table_versions(item[2]) == item[2]:
+                with self._lock:
+                    if key in self._memory:
+                        self._memory.move_to_end(key)
+                return pickle.loads(item[0])
+            with self._lock:
+                self._pop_memory(key)
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at <= now:
+                self._delete_disk(conn, [key])
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            tables = [r[0] for r in conn.execute("SELECT table_name FROM entry_tables WHERE key = ?", (key,))]
+            versions = self._read_versions(conn, tables)
+
+        with self._lock:
+            self._put_memory(key, payload, expires_at, versions)
+        return pickle.loads(payload)
+
+    def table_versions(self, tables: Iterable[str]) -> Dict[str, int]:
+        """返回表的当前版本号（每次写入加一），查询执行前取快照传给 put"""
+        with self._connect() as conn:
+            return self._read_versions(conn, tables)
+
+    @staticmethod
+    def _read_versions(conn: sqlite3.Connection, tables: Iterable[str]) -> Dict[str, int]:
+        versions = {t.lower(): 0 for t in tables}
+        if versions:
+            placeholders = ", ".join("?" * len(versions))
+            sql = f"SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})"
+            versions.update(dict(conn.execute(sql, list(versions))))
+        return versions
+
+    def put(self, key: str, rows: List[Dict], ttl: float, versions: Dict[str, int]):
+        """写入缓存，单条超过对应层容量 1/4 的结果不缓存
+
+        Args:
+            versions: 查询执行前取得的表版本快照；期间表被写入过则放弃缓存
+        """
+        payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+        expires_at = time.time() + ttl
+        tables = set(versions)
+
+        if len(payload) > self.disk_max_bytes // 4:
+            return
+        with self._connect() as conn:
+            if self._read_versions(conn, tables) != versions:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), expires_at, time.time()),
+            )
+            conn.execute("DELETE FROM entry_tables WHERE key = ?", (key,))
+            conn.executemany("INSERT INTO entry_tables (key, table_name) VALUES (?, ?)", [(key, t) for t in tables])
+            self._evict_disk(conn)
+
+        with self._lock:
+            if len(payload) <= self.memory_max_bytes // 4:
+                self._put_memory(key, payload, expires_at, versions)
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """使读取了指定表的缓存条目失效，返回失效的条目数"""
+        tables = {t.lower() for t in tables}
+        if not tables:
+            return 0
+
+        with self._lock:
+            stale = [key for key, (_, _, versions) in self._memory.items() if tables & versions.keys()]
+            for key in stale:
+                self._pop_memory(key)
+
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO table_versions (table_name, version) VALUES (?, 1) "
+                "ON CONFLICT (table_name) DO UPDATE SET version = version + 1",
+                [(t,) for t in tables],
+            )
+            placeholders = ", ".join("?" * len(tables))
+            keys = [
+                r[0]
+                for r in conn.execute(
+                    f"SELECT DISTINCT key FROM entry_tables WHERE table_name IN ({placeholders})", list(tables)
+                )
+            ]
+            self._delete_disk(conn, keys)
+        return len(set(stale) | set(keys))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM entry_tables")
+
+    def _put_memory(self, key: str, payload: bytes, expires_at: float, versions: Dict[str, int]):
+        self._pop_memory(key)
+        self._memory[key] = (payload, expires_at, versions)
+        self._memory_bytes += len(payload)
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            self._pop_memory(next(iter(self._memory)))
+
+    def _pop_memory(self, key: str):
+        item = self._memory.pop(key, None)
+        if item is not None:
+            self._memory_bytes -= len(item[0])
+
+    @staticmethod
+    def _delete_disk(conn: sqlite3.Connection, keys: List[str]):
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            conn.execute(f"DELETE FROM entries WHERE key IN ({placeholders})", chunk)
+            conn.execute(f"DELETE FROM entry_tables WHERE key IN ({placeholders})", chunk)
+
+    def _evict_disk(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            conn.execute("DELETE FROM entry_tables WHERE key NOT IN (SELECT key FROM entries)")
+            return
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total <= self.disk_max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        self._delete_disk(conn, evicted)
+
+
+class CachedExecutor:
+    """为执行器加上查询结果缓存的代理
+
+    execute_query / iter_query 先查缓存；iter_query 边读边缓冲，结果不超过 stream_max_rows 行且完整读完时写入缓存。
+    execute_sql / execute_script / bulk_insert 执行后使被写入表相关的缓存失效；其余属性与方法透传给原执行器。
+    """
+
+    def __init__(self, executor: Any, cache: QueryCache, executor_type: str, ttl: float, stream_max_rows: int = 100000):
+        self._executor = executor
+        self._cache = cache
+        self._executor_type = executor_type
+        self._ttl = ttl
+        self._stream_max_rows = stream_max_rows
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._executor, name)
+
+    def without_cache(self) -> Any:
+        """不经过缓存的内层执行器，用于必须读到最新数据的查询（如水位线）"""
+        return self._executor
+
+    def execute_query(self, sql: str, params: Optional[Dict] = None, ttl: Optional[float] = None) -> List[Dict]:
+        ttl = self._ttl if ttl is None else ttl
+        if ttl <= 0:
+            return self._executor.execute_query(sql, params)
+
+        key = QueryCache.make_key(self._executor_type, self._executor.config, sql, params)
+        rows = self._cache.get(key)
+        if rows is None:
+            _, sources = extract_lineage(sql)
+            versions = self._cache.table_versions(sources)
+            rows = self._executor.execute_query(sql, params)
+            self._cache.put(key, rows, ttl, versions)
+        return rows
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        if self._ttl <= 0:
+            yield from self._executor.iter_query(sql, params, batch_size)
+            return
+
+        key = QueryCache.make_key(self._executor_type, self._executor.config, sql, params)
+        rows = self._cache.get(key)
+        if rows is not None:
+            for start in range(0, len(rows), batch_size):
+                yield rows[start : start + batch_size]
+            return
+
+        # 边读边缓冲，超过 stream_max_rows 行后放弃缓冲，大结果集的内存占用仍与结果大小无关；
+        # 调用方中途停止读取时生成器被关闭，不会写入不完整的结果
+        _, sources = extract_lineage(sql)
+        versions = self._cache.table_versions(sources)
+        buffered: Optional[List[Dict]] = []
+        for batch in self._executor.iter_query(sql, params, batch_size):
+            if buffered is not None:
+                if len(buffered) + len(batch) > self._stream_max_rows:
+                    buffered = None
+                else:
+                    buffered.extend(batch)
+            yield batch
+        if buffered is not None:
+            self._cache.put(key, buffered, self._ttl, versions)
+
+    def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
+        try:
+            return self._executor.execute_sql(sql, params)
+        finally:
+            targets, _ = extract_lineage(sql)
+            self._cache.invalidate_tables(targets)
+
+    def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        try:
+            return self._executor.execute_script(statements, transaction)
+        finally:
+            targets: Set[str] = set()
+            for statement in statements:
+                targets |= extract_lineage(statement)[0]
+            self._cache.invalidate_tables(targets)
+
+    def bulk_insert(self, table: str, *args, **kwargs) -> int:
+        try:
+            return self._executor.bulk_insert(table, *args, **kwargs)
+        finally:
+            self._cache.invalidate_tables([table])
+
+
+class AsyncCachedExecutor(CachedExecutor):
+    """CachedExecutor 的异步版本，用于 async 任务的原生异步执行器；缓存文件读写在线程中执行，不阻塞事件循环"""
+
+    async def execute_query(self, sql: str, params: Optional[Any] = None, ttl: Optional[float] = None) -> List[Dict]:
+        ttl = self._ttl if ttl is None else ttl
+        if ttl <= 0:
+            return await self._executor.execute_query(sql, params)
+
+        key = QueryCache.make_key(self._executor_type, self._executor.config, sql, params)
+        rows = await asyncio.to_thread(self._cache.get, key)
+        if rows is None:
+            _, sources = extract_lineage(sql)
+            versions = await asyncio.to_thread(self._cache.table_versions, sources)
+            rows = await self._executor.execute_query(sql, params)
+            await asyncio.to_thread(self._cache.put, key, rows, ttl, versions)
+        return rows
+
+    async def iter_query(self, sql: str, params: Optional[Any] = None, batch_size: int = 10000) -> AsyncIterator[List[Dict]]:
+        if self._ttl <= 0:
+            async for batch in self._executor.iter_query(sql, params, batch_size):
+                yield batch
+            return
+
+        key = QueryCache.make_key(self._executor_type, self._executor.config, sql, params)
+        rows = await asyncio.to_thread(self._cache.get, key)
+        if rows is not None:
+            for start in range(0, len(rows), batch_size):
+                yield rows[start : start + batch_size]
+            return
+
+        _, sources = extract_lineage(sql)
+        versions = await asyncio.to_thread(self._cache.table_versions, sources)
+        buffered: Optional[List[Dict]] = []
+        async for batch in self._executor.iter_query(sql, params, batch_size):
+            if buffered is not None:
+                if len(buffered) + len(batch) > self._stream_max_rows:
+                    buffered = None
+                else:
+                    buffered.extend(batch)
+            yield batch
+        if buffered is not None:
+            await asyncio.to_thread(self._cache.put, key, buffered, self._ttl, versions)
+
+    async def execute_sql(self, sql: str, params: Optional[Any] = None) -> Any:
+        try:
+            return await self._executor.execute_sql(sql, params)
+        finally:
+            await asyncio.to_thread(self._cache.invalidate_tables, extract_lineage(sql)[0])
+
+    async def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        try:
+            return await self._executor.execute_script(statements, transaction)
+        finally:
+            targets: Set[str] = set()
+            for statement in statements:
+                targets |= extract_lineage(statement)[0]
+            await asyncio.to_thread(self._cache.invalidate_tables, targets)
+
+    async def bulk_insert(self, table: str, *args, **kwargs) -> int:
+        try:
+            return await self._executor.bulk_insert(table, *args, **kwargs)
+        finally:
+            await asyncio.to_thread(self._cache.invalidate_tables, [table])
+
+
+_query_cache: Optional[QueryCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """进程内共享的查询缓存，容量取自 config.query_cache"""
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            settings = config.query_cache
+            _query_cache = QueryCache(
+                memory_max_bytes=settings["memory_max_mb"] * 1024 * 1024,
+                disk_max_bytes=settings["disk_max_mb"] * 1024 * 1024,
+            )
+        return _query_cache
@@ -0,0 +1,220 @@
+"""语句超时、取消与失败重试"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
+
+import typer
+
+
+class StatementTimeoutError(TimeoutError):
+    """语句执行超时（已请求取消服务端查询）"""
+
+
+class ResilientExecutor:
+    """为执行器加上语句超时与失败重试的代理
+
+    每次调用启动一个看门狗定时器，超过 timeout 秒仍未返回时调用执行器的 cancel() 取消服务端查询，
+    调用因此中止后抛出 StatementTimeoutError（超时不重试，避免卡住的查询拉长批处理窗口）。
+    失败时按执行器的 classify_error() 分类：连接类错误重建连接后重试，瞬时错误（锁等待、队列已满等）
+    在原连接上重试；等待时间按 backoff * 2^n 指数增长（上限 backoff_max）并带随机抖动。
+
+    重试单位是一次调用：默认只重试读（execute_query，iter_query 只在取回第一批之前重试）。连接在语句执行中
+    断开时无法确认写入是否已提交，重放非幂等的 DML 可能重复写入，因此 execute_sql 与 execute_script 只在
+    retry_writes 为真（任务声明写入可安全重放）时重试，execute_script 还要求在事务中执行（失败整体回滚）；
+    bulk_insert 分批提交，失败时可能已写入部分批次，始终不重试。
+    last_retries 为最近一次调用的重试次数，InstrumentedExecutor 据此记录到性能指标。
+    """
+
+    def __init__(
+        self,
+        executor: Any,
+        timeout: float = 0,
+        max_retries: int = 0,
+        backoff: float = 1.0,
+        backoff_max: float = 60.0,
+        retry_writes: bool = False,
+    ):
+        self._executor = executor
+        self.timeout = float(timeout or 0)
+        self.max_retries = max(0, int(max_retries or 0))
+        self.backoff = float(backoff)
+        self.backoff_max = float(backoff_max)
+        self.retry_writes = bool(retry_writes)
+        self.last_retries = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._executor, name)
+
+    def without_cache(self) -> Any:
+        # 查询缓存（CachedExecutor）总在最外层，内层代理本身就不经过缓存
+        return self
+
+    def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
+        return self._call(self._executor.execute_sql, sql, params, retry=self.retry_writes)
+
+    def execute_query(self, sql: str, params: Optional[Dict] = None) -> List[Dict]:
+        return self._call(self._executor.execute_query, sql, params)
+
+    def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        # 只有整批在事务中执行（失败整体回滚）时才能从头重试，否则已提交的语句会被重复执行
+        retry = bool(self.retry_writes and transaction and self._executor.supports_transactions)
+        return self._call(self._executor.execute_script, statements, transaction, retry=retry)
+
+    def bulk_insert(self, table: str, *args, **kwargs) -> int:
+        return self._call(self._executor.bulk_insert, table, *args, retry=False, **kwargs)
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        def start():
+            iterator = iter(self._executor.iter_query(sql, params, batch_size))
+            return iterator, next(iterator, None)
+
+        iterator, batch = self._call(start)
+        # 调用方开始处理数据后不再重试，否则会重复处理；超时只统计每批取数的时间
+        while batch is not None:
+            yield batch
+            batch = self._with_timeout(next, iterator, None)
+
+    def _call(self, fn: Callable[..., Any], *args, retry: bool = True, **kwargs) -> Any:
+        self.last_retries = 0
+        reconnect = False
+        while True:
+            try:
+                if reconnect:
+                    self._reconnect()
+                return self._with_timeout(fn, *args, **kwargs)
+            except StatementTimeoutError:
+                raise
+            except Exception as e:
+                kind = self._executor.classify_error(e) if retry else None
+                if kind is None or self.last_retries >= self.max_retries:
+                    raise
+                self.last_retries += 1
+                delay = min(self.backoff_max, self.backoff * 2 ** (self.last_retries - 1)) * random.uniform(0.5, 1.0)
+                typer.echo(f"🔁 {kind} 错误，{delay:.1f}s 后第 {self.last_retries} 次重试: {e}", err=True)
+                time.sleep(delay)
+                reconnect = kind == "connection"
+
+    def _with_timeout(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if self.timeout <= 0:
+            return fn(*args, **kwargs)
+
+        lock = threading.Lock()
+        state = {"done": False, "fired": False}
+
+        def on_timeout():
+            # 与调用结束互斥，避免语句刚好完成时取消到同一连接上的下一条语句
+            with lock:
+                if state["done"]:
+                    return
+                state["fired"] = True
+                typer.echo(f"⏰ 语句执行超过 {self.timeout:g}s，取消查询", err=True)
+                try:
+                    if not self._executor.cancel():
+                        typer.echo("⚠️ 执行器不支持取消，等待语句自行结束", err=True)
+                except Exception as e:
+                    typer.echo(f"⚠️ 取消查询失败: {e}", err=True)
+
+        timer = threading.Timer(self.timeout, on_timeout)
+        timer.daemon = True
+        timer.start()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if state["fired"]:
+                raise StatementTimeoutError(f"语句执行超时（{self.timeout:g}s），已取消") from e
+            raise
+        finally:
+            with lock:
+                state["done"] = True
+            timer.cancel()
+
+    def _reconnect(self):
+        try:
+            self._executor.close()
+        except Exception as e:
+            typer.echo(f"⚠️ 关闭连接失败: {e}", err=True)
+        # 重建失败时抛出 ConnectionError，计为一次连接类错误继续重试
+        if not self._executor.connect():
+            raise ConnectionError("重建连接失败")
+
+
+class AsyncResilientExecutor:
+    """ResilientExecutor 的异步版本，用于 async 任务的原生异步执行器（aiomysql / asyncpg）
+
+    超时由 asyncio.wait_for 控制：取消等待中的协程时驱动会中止服务端语句（asyncpg 发送取消请求）；
+    重试规则（默认只重试读，写入需 retry_writes）与同步版本相同。驱动连接池会丢弃断开的连接，连接类错误直接重试，不需要重建执行器。
+    """
+
+    def __init__(
+        self,
+        executor: Any,
+        timeout: float = 0,
+        max_retries: int = 0,
+        backoff: float = 1.0,
+        backoff_max: float = 60.0,
+        retry_writes: bool = False,
+    ):
+        self._executor = executor
+        self.timeout = float(timeout or 0)
+        self.max_retries = max(0, int(max_retries or 0))
+        self.backoff = float(backoff)
+        self.backoff_max = float(backoff_max)
+        self.retry_writes = bool(retry_writes)
+        self.last_retries = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._executor, name)
+
+    def without_cache(self) -> Any:
+        return self
+
+    async def execute_sql(self, sql: str, params: Optional[Any] = None) -> Any:
+        return await self._call(self._executor.execute_sql, sql, params, retry=self.retry_writes)
+
+    async def execute_query(self, sql: str, params: Optional[Any] = None) -> List[Dict]:
+        return await self._call(self._executor.execute_query, sql, params)
+
+    async def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        retry = bool(self.retry_writes and transaction and self._executor.supports_transactions)
+        return await self._call(self._executor.execute_script, statements, transaction, retry=retry)
+
+    async def bulk_insert(self, table: str, *args, **kwargs) -> int:
+        return await self._call(self._executor.bulk_insert, table, *args, retry=False, **kwargs)
+
+    async def iter_query(self, sql: str, params: Optional[Any] = None, batch_size: int = 10000) -> AsyncIterator[List[Dict]]:
+        async def start():
+            iterator = self._executor.iter_query(sql, params, batch_size).__aiter__()
+            return iterator, await anext(iterator, None)
+
+        iterator, batch = await self._call(start)
+        while batch is not None:
+            yield batch
+            batch = await self._with_timeout(anext(iterator, None))
+
+    async def _call(self, fn: Callable[..., Any], *args, retry: bool = True, **kwargs) -> Any:
+        self.last_retries = 0
+        while True:
+            try:
+                return await self._with_timeout(fn(*args, **kwargs))
+            except StatementTimeoutError:
+                raise
+            except Exception as e:
+                kind = self._executor.classify_error(e) if retry else None
+                if kind is None or self.last_retries >= self.max_retries:
+                    raise
+                self.last_retries += 1
+                delay = min(self.backoff_max, self.backoff * 2 ** (self.last_retries - 1)) * random.uniform(0.5, 1.0)
+                typer.echo(f"🔁 {kind} 错误，{delay:.1f}s 后第 {self.last_retries} 次重试: {e}", err=True)
+                await asyncio.sleep(delay)
+
+    async def _with_timeout(self, awaitable: Any) -> Any:
+        if self.timeout <= 0:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError as e:
+            typer.echo(f"⏰ 语句执行超过 {self.timeout:g}s，已取消", err=True)
+            raise StatementTimeoutError(f"语句执行超时（{self.timeout:g}s），已取消") from e
@@ -0,0 +1,177 @@
+"""运行台账：持久化记录每个任务/参数/分区的执行状态，重跑时跳过已成功的运行"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from config import config
+from warehouse.base_task import Status
+
+# 不参与参数指纹计算的参数（每次运行都会变化、属于分区本身或不影响结果）
+VOLATILE_PARAMS = {
+    "run_time",
+    "start_date",
+    "end_date",
+    "verbose",
+    "dry_run",
+    "force",
+    "resume",
+    "profile_dir",
+    "statement_timeout",
+    "max_retries",
+    "retry_writes",
+    "run_in_process",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    task_name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    partition_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT,
+    finished_at TEXT,
+    duration REAL,
+    error TEXT,
+    PRIMARY KEY (task_name, fingerprint, partition_key)
+);
+"""
+
+
+def params_fingerprint(params: Dict[str, Any]) -> str:
+    """参数指纹：排除易变参数后的稳定哈希"""
+    stable = {k: v for k, v in params.items() if k not in VOLATILE_PARAMS}
+    return hashlib.sha1(json.dumps(stable, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def partition_key(params: Dict[str, Any]) -> str:
+    """分区标识：指定了日期区间时为 "start~end"，否则为运行日期（同一天内 run-all 的重跑视为同一批次）"""
+    if params.get("start_date"):
+        return f"{params['start_date']}~{params.get('end_date') or ''}"
+    run_time = params.get("run_time") or datetime.now().isoformat()
+    return run_time[:10]
+
+
+class RunLedger:
+    """运行台账（本地 SQLite 文件）
+
+    以 (任务名, 参数指纹, 分区) 为键记录最近一次运行的状态。开始执行时记为 running，
+    结束后记为 success/failed；进程崩溃留下的 running 记录在重跑时会被重新执行。
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or config.cache_dir / "run_ledger.db"
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接，正常退出时提交并关闭"""
+        if not self._schema_ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, task_name: str, fingerprint: str, partition: str) -> Optional[Dict[str, Any]]:
+        """返回运行记录，未运行过时返回 None"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(
+                "SELECT * FROM runs WHERE task_name = ? AND fingerprint = ? AND partition_key = ?",
+                (task_name, fingerprint, partition),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def succeeded(self, task_name: str, fingerprint: str, partition: str) -> bool:
+        record = self.get(task_name, fingerprint, partition)
+        return record is not None and record["status"] == Status.SUCCESS
+
+    def succeeded_partitions(self, task_name: str, fingerprint: str) -> List[str]:
+        """返回该任务在指定参数下已成功的全部分区"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT partition_key FROM runs WHERE task_name = ? AND fingerprint = ? AND status = ?",
+                (task_name, fingerprint, Status.SUCCESS),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def succeeded_tasks(self, fingerprint: str, partition: str) -> Set[str]:
+        """返回在指定参数与分区下已成功的全部任务"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_name FROM runs WHERE fingerprint = ? AND partition_key = ? AND status = ?",
+                (fingerprint, partition, Status.SUCCESS),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def durations(self, recent: int = 5) -> Dict[str, float]:
+        """每个任务最近 recent 次成功运行的平均耗时（秒），作为调度时的耗时估计"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_name, AVG(duration) FROM ("
+                "  SELECT task_name, duration, "
+                "  ROW_NUMBER() OVER (PARTITION BY task_name ORDER BY finished_at DESC) AS rn "
+                "  FROM runs WHERE status = ? AND duration IS NOT NULL"
+                ") WHERE rn <= ? GROUP BY task_name",
+                (Status.SUCCESS, recent),
+            ).fetchall()
+        return {name: duration for name, duration in rows}
+
+    def start(self, task_name: str, fingerprint: str, partition: str):
+        """记录开始执行"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs (task_name, fingerprint, partition_key, status, attempts, started_at) "
+                "VALUES (?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT (task_name, fingerprint, partition_key) DO UPDATE SET "
+                "status = excluded.status, attempts = attempts + 1, started_at = excluded.started_at, "
+                "finished_at = NULL, duration = NULL, error = NULL",
+                (task_name, fingerprint, partition, Status.RUNNING, now),
+            )
+
+    def finish(
+        self, task_name: str, fingerprint: str, partition: str, status: str, duration: float, error: Optional[str] = None
+    ):
+        """记录执行结果"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ?, duration = ?, error = ? "
+                "WHERE task_name = ? AND fingerprint = ? AND partition_key = ?",
+                (status, now, duration, error, task_name, fingerprint, partition),
+            )
+
+    def reset(self, task_name: Optional[str] = None):
+        """清除运行记录（不指定任务时清除全部）"""
+        with self._connect() as conn:
+            if task_name is None:
+                conn.execute("DELETE FROM runs")
+            else:
+                conn.execute("DELETE FROM runs WHERE task_name = ?", (task_name,))
+
+
+_run_ledger: Optional[RunLedger] = None
+_run_ledger_lock = threading.Lock()
+
+
+def get_run_ledger() -> RunLedger:
+    """进程内共享的运行台账"""
+    global _run_ledger
+    with _run_ledger_lock:
+        if _run_ledger is None:
+            _run_ledger = RunLedger()
+        return _run_ledger
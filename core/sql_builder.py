@@ -1,58 +1,146 @@
-from typing import Dict, Any, Optional
 import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+# 占位符 ${key} 与条件指令 /* IF cond */ /* ELSE */ /* ENDIF */；
+# 指令单独占一行时连同该行的缩进与换行一起匹配，渲染后不留空行
+_TOKEN_RE = re.compile(
+    r"(?P<line>^[ \t]*(?P<line_directive>/\*\s*(?:IF\s+\w+|ELSE|ENDIF)\s*\*/)[ \t]*(?:\n|$))"
+    r"|\$\{(?P<param>\w+)\}"
+    r"|(?P<directive>/\*\s*(?:IF\s+\w+|ELSE|ENDIF)\s*\*/)",
+    re.M,
+)
+_DIRECTIVE_RE = re.compile(r"/\*\s*(IF|ELSE|ENDIF)(?:\s+(\w+))?\s*\*/")
+
+# 编译后的节点：("text", str) / ("param", key, in_quotes) / ("if", cond, then_nodes, else_nodes)
+Node = Tuple[Any, ...]
+
+
+class CompiledTemplate:
+    """编译后的SQL模板：字面量片段、占位符与 IF/ELSE/ENDIF 块组成的节点树"""
+
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes: List[Node]):
+        self.nodes = nodes
+
+    def render(self, params: Dict[str, Any]) -> str:
+        """单次线性遍历渲染SQL"""
+        out: List[str] = []
+        self._render(self.nodes, params, out)
+        return "".join(out)
+
+    @classmethod
+    def _render(cls, nodes: List[Node], params: Dict[str, Any], out: List[str]):
+        for node in nodes:
+            kind = node[0]
+            if kind == "text":
+                out.append(node[1])
+            elif kind == "param":
+                key = node[1]
+                if key in params:
+                    out.append(_format_value(params[key], node[2]))
+                else:
+                    # 未提供的参数保留原样
+                    out.append(f"${{{key}}}")
+            else:
+                cls._render(node[2] if params.get(node[1], False) else node[3], params, out)
+
+
+def _format_value(value: Any, in_quotes: bool) -> str:
+    if isinstance(value, str):
+        # 字符串值需要转义；模板中已写在引号内的占位符不再额外加引号
+        value = value.replace("'", "''")
+        return value if in_quotes else f"'{value}'"
+    return str(value)
+
+
+def _compile(template: str) -> CompiledTemplate:
+    root: List[Node] = []
+    # 栈元素: [cond, then_nodes, else_nodes, 当前写入的列表]
+    stack: List[List[Any]] = []
+    current = root
+    pos = 0
+    in_quotes = False
+
+    for match in _TOKEN_RE.finditer(template):
+        text = template[pos : match.start()]
+        if text:
+            current.append(("text", text))
+            in_quotes ^= text.count("'") % 2 == 1
+        pos = match.end()
+
+        if match.group("param"):
+            current.append(("param", match.group("param"), in_quotes))
+            continue
+
+        directive = match.group("line_directive") or match.group("directive")
+        keyword, cond = _DIRECTIVE_RE.match(directive).groups()
+        if keyword == "IF":
+            frame = [cond, [], [], None]
+            frame[3] = frame[1]
+            current.append(("if", cond, frame[1], frame[2]))
+            stack.append(frame)
+            current = frame[1]
+        elif keyword == "ELSE":
+            if not stack or stack[-1][3] is stack[-1][2]:
+                raise ValueError(f"SQL模板中存在多余的 ELSE: 位置 {match.start()}")
+            stack[-1][3] = stack[-1][2]
+            current = stack[-1][2]
+        else:
+            if not stack:
+                raise ValueError(f"SQL模板中存在多余的 ENDIF: 位置 {match.start()}")
+            stack.pop()
+            current = stack[-1][3] if stack else root
+
+    if stack:
+        raise ValueError(f"SQL模板中的 IF {stack[-1][0]} 缺少 ENDIF")
+
+    text = template[pos:]
+    if text:
+        current.append(("text", text))
+    return CompiledTemplate(root)
+
 
 class SQLBuilder:
     """SQL构建器，支持参数化SQL拼接"""
-    
+
     @staticmethod
-    def build_sql(template: str, params: Dict[str, Any]) -> str:
-        """根据模板和参数构建SQL"""
-        sql = template
-        
-        # 替换参数占位符
-        for key, value in params.items():
-            placeholder = f"${{{key}}}"
-            if placeholder in sql:
-                if isinstance(value, str):
-                    # 字符串值需要转义
-                    value = value.replace("'", "''")
-                    sql = sql.replace(placeholder, f"'{value}'")
-                else:
-                    sql = sql.replace(placeholder, str(value))
-        
-        # 处理条件逻辑
-        sql = SQLBuilder._process_conditional_logic(sql, params)
-        
-        return sql
-    
+    @lru_cache(maxsize=512)
+    def compile(template: str) -> CompiledTemplate:
+        """将模板编译为节点树，按模板文本做 LRU 缓存"""
+        return _compile(template)
+
     @staticmethod
-    def _process_conditional_logic(sql: str, params: Dict[str, Any]) -> str:
-        """处理条件逻辑（如IF-ELSE）"""
-        # 简单的条件逻辑处理，例如：/* IF condition */ ... /* ENDIF */
-        lines = sql.split('\n')
-        result_lines = []
-        skip_mode = False
-        condition_stack = []
-        
-        for line in lines:
-            if '/* IF' in line:
-                # 提取条件
-                match = re.search(r'/\*\s*IF\s+(\w+)\s*\*/', line)
-                if match:
-                    condition = match.group(1)
-                    should_include = params.get(condition, False)
-                    condition_stack.append(should_include)
-                    if not should_include:
-                        skip_mode = True
-                    result_lines.append(line.replace(match.group(0), '').strip())
-                else:
-                    result_lines.append(line)
-            elif '/* ENDIF */' in line:
-                if condition_stack:
-                    condition_stack.pop()
-                    skip_mode = any(not cond for cond in condition_stack)
-                result_lines.append(line.replace('/* ENDIF */', '').strip())
-            elif not skip_mode:
-                result_lines.append(line)
-        
-        return '\n'.join([line for line in result_lines if line])
\ No newline at end of file
+    def build_sql(template: str, params: Dict[str, Any]) -> str:
+        """根据模板和参数构建SQL
+
+        支持 ${key} 占位符与 /* IF key */ ... /* ELSE */ ... /* ENDIF */ 条件块（可嵌套），
+        条件取 params[key] 的真值。
+        """
+        return SQLBuilder.compile(template).render(params)
+
+
+# 引号内的字符串/标识符、行注释、块注释与语句分隔符
+_SPLIT_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|(?P<comment>--[^\n]*|/\*.*?\*/)|;", re.S)
+
+
+def split_statements(sql: str) -> List[str]:
+    """按分号拆分多语句SQL，忽略字符串、引号标识符与注释中的分号，去掉只有空白/注释的语句"""
+    statements = []
+    start = 0  # 当前语句的起点
+    pos = 0  # 上一个匹配片段的结束位置
+    has_code = False
+    for match in _SPLIT_RE.finditer(sql):
+        if sql[pos : match.start()].strip():
+            has_code = True
+        pos = match.end()
+        if match.group() == ";":
+            if has_code:
+                statements.append(sql[start : match.start()].strip())
+            start, has_code = pos, False
+        elif not match.group("comment"):
+            has_code = True
+    if has_code or sql[pos:].strip():
+        statements.append(sql[start:].strip())
+    return statements
@@ -0,0 +1,236 @@
+"""SQL 血缘解析：从 SQL 文本中提取写入目标表与读取来源表"""
+
+import re
+from typing import List, Set, Tuple
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_TOKEN_RE = re.compile(r"`[^`]+`|\"[^\"]+\"|[\w$.{}]+|[(),;]")
+
+# 出现在括号前时表示子查询/表达式分组而非函数调用的关键字
+_NON_FUNCTION_KEYWORDS = {
+    "AS",
+    "IN",
+    "EXISTS",
+    "FROM",
+    "JOIN",
+    "ALL",
+    "ANY",
+    "SOME",
+    "UNION",
+    "SELECT",
+    "WHERE",
+    "AND",
+    "OR",
+    "NOT",
+    "ON",
+    "WITH",
+    "VALUES",
+    "WHEN",
+    "THEN",
+    "ELSE",
+    "LATERAL",
+    "USING",
+}
+# 表名后面出现这些关键字时说明表引用已结束（不是别名）
+_CLAUSE_KEYWORDS = {
+    "WHERE",
+    "GROUP",
+    "ORDER",
+    "HAVING",
+    "LIMIT",
+    "UNION",
+    "JOIN",
+    "LEFT",
+    "RIGHT",
+    "INNER",
+    "OUTER",
+    "FULL",
+    "CROSS",
+    "ON",
+    "USING",
+    "LATERAL",
+    "WINDOW",
+    "DISTRIBUTE",
+    "SORT",
+    "CLUSTER",
+    "SET",
+    "SELECT",
+    "INSERT",
+    "VALUES",
+}
+# 在同一括号层级出现时表示 FROM 子句已结束，其后的逗号不再分隔表引用
+_FROM_END_KEYWORDS = {
+    "WHERE",
+    "GROUP",
+    "ORDER",
+    "HAVING",
+    "LIMIT",
+    "UNION",
+    "INTERSECT",
+    "EXCEPT",
+    "WINDOW",
+    "QUALIFY",
+    "LATERAL",
+    "DISTRIBUTE",
+    "SORT",
+    "CLUSTER",
+    "SELECT",
+    "INSERT",
+    "SET",
+    "VALUES",
+}
+
+
+def _normalize(name: str) -> str:
+    return ".".join(part.strip('`"') for part in name.split(".")).lower()
+
+
+def _tokenize(sql: str) -> List[str]:
+    sql = _COMMENT_RE.sub(" ", sql)
+    sql = _STRING_RE.sub("''", sql)
+    return _TOKEN_RE.findall(sql)
+
+
+def _is_identifier(token: str) -> bool:
+    return token not in ("(", ")", ",", ";", "''")
+
+
+def extract_lineage(sql: str) -> Tuple[Set[str], Set[str]]:
+    """解析 SQL 血缘
+
+    支持 INSERT INTO/OVERWRITE、CREATE TABLE/VIEW、UPDATE、DELETE、MERGE、LOAD DATA 的写入目标，
+    以及 FROM/JOIN（含逗号连接）、MERGE ... USING 的读取来源；WITH 定义的 CTE 不计入来源。
+    条件注释（/* IF ... */）会被当作普通注释去掉，两个分支中的表都会计入。
+
+    Returns:
+        (targets, sources) 均为小写的表名集合
+    """
+    tokens = _tokenize(sql)
+    upper = [t.upper() for t in tokens]
+    n = len(tokens)
+
+    targets: Set[str] = set()
+    sources: Set[str] = set()
+    ctes: Set[str] = set()
+    # 括号栈：True 表示函数调用括号（其中的 FROM 属于 EXTRACT/TRIM 等函数语法）
+    paren_stack: List[bool] = []
+    # FROM 子句尚未结束的括号层级：JOIN ... ON <条件> 之后同层级的逗号仍然引出新的表引用
+    from_open: Set[int] = set()
+
+    def skip_parens(j: int) -> int:
+        depth = 0
+        while j < n:
+            if tokens[j] == "(":
+                depth += 1
+            elif tokens[j] == ")":
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            j += 1
+        return j
+
+    def read_table(j: int) -> Tuple[str, int]:
+        if j < n and _is_identifier(tokens[j]) and upper[j] not in _CLAUSE_KEYWORDS:
+            return _normalize(tokens[j]), j + 1
+        return "", j
+
+    def skip_alias(j: int) -> int:
+        if j < n and upper[j] == "AS":
+            j += 1
+        if j < n and _is_identifier(tokens[j]) and upper[j] not in _CLAUSE_KEYWORDS:
+            j += 1
+        return j
+
+    def read_sources(j: int) -> int:
+        # 读取逗号分隔的表引用列表，遇到子查询等非表名时停止
+        while True:
+            name, j = read_table(j)
+            if not name:
+                return j
+            if name not in ctes:
+                sources.add(name)
+            j = skip_alias(j)
+            if j < n and tokens[j] == ",":
+                j += 1
+                continue
+            return j
+
+    i = 0
+    while i < n:
+        tok, up = tokens[i], upper[i]
+
+        if tok == "(":
+            prev = upper[i - 1] if i > 0 else ""
+            paren_stack.append(bool(prev) and _is_identifier(prev) and prev not in _NON_FUNCTION_KEYWORDS)
+        elif tok == ")":
+            from_open.discard(len(paren_stack))
+            if paren_stack:
+                paren_stack.pop()
+        elif tok == ";" or up in _FROM_END_KEYWORDS:
+            from_open.discard(len(paren_stack))
+        elif tok == "," and len(paren_stack) in from_open:
+            i = read_sources(i + 1)
+            continue
+        elif up == "WITH":
+            # 记录 CTE 名称：WITH [RECURSIVE] name [(cols)] AS (...), name AS (...)
+            j = i + 1
+            if j < n and upper[j] == "RECURSIVE":
+                j += 1
+            while j < n and _is_identifier(tokens[j]):
+                ctes.add(_normalize(tokens[j]))
+                j += 1
+                if j < n and tokens[j] == "(":
+                    j = skip_parens(j)
+                if j < n and upper[j] == "AS":
+                    j += 1
+                if j < n and tokens[j] == "(":
+                    j = skip_parens(j)
+                if j < n and tokens[j] == ",":
+                    j += 1
+                    continue
+                break
+        elif up in ("INTO", "OVERWRITE", "UPDATE"):
+            j = i + 1
+            if j < n and upper[j] == "TABLE":
+                j += 1
+            name, j = read_table(j)
+            if name:
+                targets.add(name)
+                # MERGE INTO 目标 [别名] USING 来源：USING 后是来源表（子查询由后续 FROM 处理），
+                # 不同于 JOIN ... USING (列)
+                if up == "INTO" and i > 0 and upper[i - 1] == "MERGE":
+                    j = skip_alias(j)
+                    if j < n and upper[j] == "USING":
+                        j = read_sources(j + 1)
+                i = j
+                continue
+        elif up == "CREATE":
+            j = i + 1
+            while j < n and j <= i + 4 and upper[j] not in ("TABLE", "VIEW"):
+                j += 1
+            if j < n and upper[j] in ("TABLE", "VIEW"):
+                j += 1
+                if j + 2 < n and upper[j] == "IF" and upper[j + 1] == "NOT" and upper[j + 2] == "EXISTS":
+                    j += 3
+                name, j = read_table(j)
+                if name:
+                    targets.add(name)
+                    i = j
+                    continue
+        elif up == "DELETE":
+            j = i + 1
+            if j < n and upper[j] == "FROM":
+                j += 1
+            name, j = read_table(j)
+            if name:
+                targets.add(name)
+                i = j
+                continue
+        elif up in ("FROM", "JOIN") and not (paren_stack and paren_stack[-1]):
+            from_open.add(len(paren_stack))
+            i = read_sources(i + 1)
+            continue
+        i += 1
+
+    return targets, sources - targets
@@ -0,0 +1,318 @@
+"""任务依赖分析"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from config import config
+from core.sql_lineage import extract_lineage
+from core.task_loader import TaskLoader
+
+# 数仓分层的执行顺序：上游层全部完成后才执行下游层
+LAYERS = ["ods", "dw", "dim"]
+
+# 索引结构变化时递增，旧索引整体失效
+INDEX_VERSION = 1
+
+
+class TaskDepends:
+    """任务依赖分析器
+
+    依赖来源：
+        1. 任务类显式声明的 depends() 返回值（任务名列表）
+        2. SQL 血缘：解析 create()/pre_sql()/get_sql_template()/post_sql()，
+           读取表 X 的任务依赖所有写入表 X 的任务
+        3. 既无声明也无法解析 SQL 的任务（如函数式任务）按分层顺序 ods -> dw -> dim 依赖上一非空层的全部任务
+
+    解析结果按任务文件的 mtime/size 缓存到磁盘索引，文件未变化时不再导入模块。
+    """
+
+    def __init__(
+        self,
+        tasks: Optional[Dict[str, Any]] = None,
+        task_loader: Optional[TaskLoader] = None,
+        index_path: Optional[Path] = None,
+    ):
+        self.task_loader = task_loader or TaskLoader(Path("warehouse"))
+        self.index_path = index_path or config.cache_dir / "depends_index.json"
+        self._tasks = tasks
+        # task_name -> {path, signature, layer, declared, targets, sources}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # task_name -> 直接上游任务集合
+        self.upstreams: Dict[str, Set[str]] = {}
+        # task_name -> 直接下游任务集合
+        self.downstreams: Dict[str, Set[str]] = {}
+        # table -> 写入该表的任务集合
+        self.writers: Dict[str, Set[str]] = {}
+
+    def build_graph(self) -> Dict[str, Set[str]]:
+        """构建依赖图（优先使用磁盘索引）
+
+        Returns:
+            依赖字典 {task_name: {upstream_task_name, ...}}
+        """
+        index = self._read_index()
+        entries, dirty = self._load_entries(index.get("tasks", {}))
+        self.entries = entries
+
+        if not dirty and "upstreams" in index:
+            self.upstreams = {name: set(deps) for name, deps in index["upstreams"].items()}
+            self.downstreams = {name: set(deps) for name, deps in index["downstreams"].items()}
+            self.writers = {table: set(names) for table, names in index["writers"].items()}
+            return self.upstreams
+
+        self._compute_edges()
+        self.topological_order()
+        self._write_index()
+        return self.upstreams
+
+    def _load_entries(self, cached: Dict[str, Dict[str, Any]]):
+        """加载每个任务的依赖信息，返回 (entries, 是否有变化)"""
+        if self._tasks is not None:
+            candidates = [(name, Path(info["path"]), info) for name, info in self._tasks.items()]
+        else:
+            candidates = [(py_file.stem, py_file, None) for py_file in self.task_loader.iter_task_files("warehouse")]
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        dirty = set(cached) != {name for name, _, _ in candidates}
+        for task_name, path, task_info in candidates:
+            signature = self._file_signature(path)
+            entry = cached.get(task_name)
+            if entry and entry["path"] == str(path) and entry["signature"] == signature:
+                entries[task_name] = entry
+                continue
+
+            dirty = True
+            if task_info is None:
+                task_info = self.task_loader.load_task_file(path)
+                if task_info is None:
+                    continue
+            entries[task_name] = self._extract_entry(task_info, path, signature)
+
+        return entries, dirty
+
+    @staticmethod
+    def _file_signature(path: Path) -> List[int]:
+        try:
+            stat = os.stat(path)
+            return [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            return [0, 0]
+
+    def _extract_entry(self, task_info: Dict[str, Any], path: Path, signature: List[int]) -> Dict[str, Any]:
+        """从任务对象中提取声明依赖与 SQL 血缘"""
+        entry = {
+            "path": str(path),
+            "signature": signature,
+            "layer": task_info.get("layer"),
+            "declared": None,
+            "targets": None,
+            "sources": None,
+        }
+        task_obj = task_info["object"]
+        if not isinstance(task_obj, type):
+            return entry
+
+        task_instance = task_obj()
+        if hasattr(task_instance, "depends"):
+            deps = task_instance.depends()
+            if isinstance(deps, str):
+                deps = [deps]
+            entry["declared"] = list(deps) if deps is not None else None
+
+        targets: Set[str] = set()
+        sources: Set[str] = set()
+        found_sql = False
+        for hook in ("create", "pre_sql", "get_sql_template", "post_sql"):
+            try:
+                sql = getattr(task_instance, hook)() if hasattr(task_instance, hook) else None
+            except NotImplementedError:
+                sql = None
+            if isinstance(sql, str) and sql.strip():
+                found_sql = True
+                hook_targets, hook_sources = extract_lineage(sql)
+                targets |= hook_targets
+                sources |= hook_sources
+        if found_sql:
+            entry["targets"] = sorted(targets)
+            entry["sources"] = sorted(sources - targets)
+        return entry
+
+    def _compute_edges(self):
+        writers: Dict[str, Set[str]] = {}
+        layer_members: Dict[str, List[str]] = {layer: [] for layer in LAYERS}
+        for task_name, entry in self.entries.items():
+            for table in entry["targets"] or []:
+                writers.setdefault(table, set()).add(task_name)
+            if entry["layer"] in layer_members:
+                layer_members[entry["layer"]].append(task_name)
+
+        upstreams: Dict[str, Set[str]] = {}
+        for task_name, entry in self.entries.items():
+            deps: Set[str] = set()
+            if entry["declared"] is not None:
+                unknown = [dep for dep in entry["declared"] if dep not in self.entries]
+                if unknown:
+                    raise ValueError(f"任务 {task_name} 依赖了不存在的任务: {', '.join(unknown)}")
+                deps.update(entry["declared"])
+            if entry["sources"] is not None:
+                for table in entry["sources"]:
+                    deps.update(writers.get(table, ()))
+            elif entry["declared"] is None:
+                deps.update(self._previous_layer_tasks(entry["layer"], layer_members))
+            deps.discard(task_name)
+            upstreams[task_name] = deps
+
+        downstreams: Dict[str, Set[str]] = {task_name: set() for task_name in upstreams}
+        for task_name, deps in upstreams.items():
+            for dep in deps:
+                downstreams[dep].add(task_name)
+
+        self.upstreams = upstreams
+        self.downstreams = downstreams
+        self.writers = writers
+
+    @staticmethod
+    def _previous_layer_tasks(layer: Optional[str], layer_members: Dict[str, List[str]]) -> List[str]:
+        """返回上一个非空层的全部任务"""
+        if layer not in LAYERS:
+            return []
+        for prev_layer in reversed(LAYERS[: LAYERS.index(layer)]):
+            if layer_members[prev_layer]:
+                return layer_members[prev_layer]
+        return []
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != INDEX_VERSION:
+            return {}
+        return index
+
+    def _write_index(self):
+        index = {
+            "version": INDEX_VERSION,
+            "tasks": self.entries,
+            "upstreams": {name: sorted(deps) for name, deps in self.upstreams.items()},
+            "downstreams": {name: sorted(deps) for name, deps in self.downstreams.items()},
+            "writers": {table: sorted(names) for table, names in self.writers.items()},
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # 索引只是缓存，写入失败不影响本次分析
+            pass
+
+    def _ensure_graph(self):
+        if not self.entries:
+            self.build_graph()
+
+    def analyze(self, task_name: str) -> List[str]:
+        """返回任务的直接上游依赖"""
+        self._ensure_graph()
+        if task_name not in self.upstreams:
+            raise ValueError(f"未找到任务: {task_name}")
+        return sorted(self.upstreams[task_name])
+
+    def upstream(self, task_name: str, recursive: bool = True) -> Set[str]:
+        """返回任务的上游任务（默认递归）"""
+        self._ensure_graph()
+        return self._walk(task_name, self.upstreams, recursive)
+
+    def downstream(self, task_name: str, recursive: bool = True) -> Set[str]:
+        """返回任务的下游任务（默认递归）"""
+        self._ensure_graph()
+        return self._walk(task_name, self.downstreams, recursive)
+
+    def readers_of(self, table: str) -> Set[str]:
+        """返回读取指定表的任务"""
+        self._ensure_graph()
+        table = table.lower()
+        return {name for name, entry in self.entries.items() if table in (entry["sources"] or [])}
+
+    def writers_of(self, table: str) -> Set[str]:
+        """返回写入指定表的任务"""
+        self._ensure_graph()
+        return set(self.writers.get(table.lower(), ()))
+
+    @staticmethod
+    def _walk(task_name: str, edges: Dict[str, Set[str]], recursive: bool) -> Set[str]:
+        if task_name not in edges:
+            raise ValueError(f"未找到任务: {task_name}")
+        if not recursive:
+            return set(edges[task_name])
+        visited: Set[str] = set()
+        stack = list(edges[task_name])
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            stack.extend(edges[current])
+        return visited
+
+    def select(self, selector: Optional[str] = None) -> Set[str]:
+        """按选择器筛选任务
+
+        语法（逗号分隔多个）：
+            all / *       全部任务
+            ods           ods 层全部任务（也可以是任务名）
+            ods+          ods 层及其全部下游
+            +dim_date     dim_date 及其全部上游
+        """
+        self._ensure_graph()
+        if not selector:
+            return set(self.upstreams)
+
+        selected: Set[str] = set()
+        for item in (part.strip() for part in selector.split(",")):
+            if not item:
+                continue
+            if item in ("all", "*"):
+                selected.update(self.upstreams)
+                continue
+
+            with_upstream = item.startswith("+")
+            with_downstream = item.endswith("+")
+            name = item.strip("+")
+
+            if name in LAYERS:
+                matched = {t for t, entry in self.entries.items() if entry["layer"] == name}
+            elif name in self.upstreams:
+                matched = {name}
+            else:
+                raise ValueError(f"无法识别的选择器: {item}")
+
+            selected.update(matched)
+            for task_name in matched:
+                if with_upstream:
+                    selected.update(self.upstream(task_name))
+                if with_downstream:
+                    selected.update(self.downstream(task_name))
+        return selected
+
+    def topological_order(self, selected: Optional[Set[str]] = None) -> List[str]:
+        """返回拓扑序（同一批次内按名称排序），存在环时抛出异常"""
+        nodes = set(self.upstreams) if selected is None else set(selected)
+        indegree = {node: len(self.upstreams[node] & nodes) for node in nodes}
+        ready = sorted(node for node, degree in indegree.items() if degree == 0)
+        order: List[str] = []
+        while ready:
+            node = ready.pop(0)
+            order.append(node)
+            for child in sorted(self.downstreams[node] & nodes):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(order) != len(nodes):
+            cycle = sorted(nodes - set(order))
+            raise ValueError(f"任务依赖存在环: {', '.join(cycle)}")
+        return order
@@ -1,7 +1,8 @@
 import importlib
+import importlib.util
 import inspect
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 
 class TaskLoader:
@@ -18,67 +19,84 @@ class TaskLoader:
             category: 任务类别 ('warehouse', 'utils', None表示全部)
 
         Returns:
-            任务字典 {task_name: {module, object, path, category}}
+            任务字典 {task_name: {module, object, path, category, layer}}
         """
         tasks = {}
+        for py_file in self.iter_task_files(category):
+            task_info = self.load_task_file(py_file)
+            if task_info:
+                tasks[py_file.stem] = task_info
 
-        # 确定扫描的目录
+        return tasks
+
+    def scan_dirs(self, category: Optional[str] = None) -> List[Path]:
+        """返回指定类别需要扫描的目录"""
+        warehouse_dirs = [
+            self.task_base_dir / "ods",
+            self.task_base_dir / "dw",
+            self.task_base_dir / "dim",
+        ]
         if category == "warehouse":
-            scan_dirs = [
-                self.task_base_dir / "ods",
-                self.task_base_dir / "dw",
-                self.task_base_dir / "dim",
-            ]
+            return warehouse_dirs
         elif category == "utils":
-            scan_dirs = [Path("utils")]
+            return [Path("utils")]
         else:
-            scan_dirs = [
-                self.task_base_dir / "ods",
-                self.task_base_dir / "dw",
-                self.task_base_dir / "dim",
-                Path("utils"),
-            ]
-
-        for scan_dir in scan_dirs:
+            return warehouse_dirs + [Path("utils")]
+
+    def iter_task_files(self, category: Optional[str] = None) -> Iterator[Path]:
+        """列出任务文件（不导入模块）"""
+        for scan_dir in self.scan_dirs(category):
             if not scan_dir.exists():
                 continue
 
-            for py_file in scan_dir.glob("*.py"):
+            for py_file in sorted(scan_dir.glob("*.py")):
                 if py_file.name == "__init__.py":
                     continue
+                yield py_file
 
-                task_name = py_file.stem
-                module_name = f"{scan_dir.name}.{task_name}"
-
-                try:
-                    # 动态导入模块
-                    spec = importlib.util.spec_from_file_location(module_name, py_file)
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-
-                    # 检查模块是否有合适的任务类或函数
-                    task_obj = self._extract_task_from_module(module, task_name)
-                    if task_obj:
-                        cat = "warehouse" if scan_dir.name in ["ods", "dw", "dim"] else "utils"
-                        tasks[task_name] = {
-                            "module": module,
-                            "object": task_obj,
-                            "path": py_file,
-                            "category": cat,
-                        }
-                        print("*" * 20, "task_loader", "task", tasks)
-
-                except Exception:
-                    pass
+    def load_task_file(self, py_file: Path) -> Optional[Dict[str, Any]]:
+        """导入单个任务文件并提取任务对象，失败或没有任务对象时返回 None
 
-        return tasks
+        Returns:
+            任务信息 {module, object, path, category, layer}
+        """
+        scan_dir = py_file.parent
+        task_name = py_file.stem
+        module_name = f"{scan_dir.name}.{task_name}"
+
+        try:
+            # 动态导入模块
+            spec = importlib.util.spec_from_file_location(module_name, py_file)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+
+            # 检查模块是否有合适的任务类或函数
+            task_obj = self._extract_task_from_module(module, task_name)
+            if task_obj:
+                cat = "warehouse" if scan_dir.name in ["ods", "dw", "dim"] else "utils"
+                return {
+                    "module": module,
+                    "object": task_obj,
+                    "path": py_file,
+                    "category": cat,
+                    "layer": scan_dir.name,
+                }
+
+        except Exception:
+            pass
+
+        return None
 
     def _extract_task_from_module(self, module, task_name: str) -> Optional[Any]:
         """从模块中提取任务对象"""
-        # 优先查找类
-        for name, obj in inspect.getmembers(module, inspect.isclass):
-            print("=" * 20, "inspect", "name", name, "obj", obj, "task_name", task_name)
-            if name.lower().endswith("task"):
+        # 优先查找类：只考虑模块自身定义的类，并跳过被其他任务类继承的基类（如 BaseTask）
+        candidates = [
+            obj
+            for name, obj in inspect.getmembers(module, inspect.isclass)
+            if name.lower().endswith("task") and obj.__module__ == module.__name__
+        ]
+        for obj in candidates:
+            if not any(other is not obj and issubclass(other, obj) for other in candidates):
                 return obj
 
         # 查找函数
@@ -0,0 +1,168 @@
+"""任务清单：静态解析任务文件，缓存 CLI 注册所需的元信息"""
+
+import ast
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import config
+from core.task_loader import TaskLoader
+
+# 清单结构变化时递增，旧清单整体失效
+MANIFEST_VERSION = 2
+
+
+class TaskManifest:
+    """任务清单
+
+    使用 ast 静态解析任务文件（不执行 exec_module），记录
+    {name, category, layer, path, mtime_ns, sha1, description, entry_type, object_name}。
+    mtime 变化时先比较文件哈希，内容未变只刷新 mtime，内容变化才重新解析。
+    """
+
+    def __init__(self, task_loader: TaskLoader, manifest_path: Optional[Path] = None):
+        self.task_loader = task_loader
+        self.manifest_path = manifest_path or config.cache_dir / "manifest.json"
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def load(self, category: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """返回指定类别的任务清单 {task_name: entry}"""
+        if self._entries is None:
+            self._entries = self._refresh()
+        if category is None:
+            return dict(self._entries)
+        return {name: entry for name, entry in self._entries.items() if entry["category"] == category}
+
+    def get(self, task_name: str, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self.load(category).get(task_name)
+
+    def _refresh(self) -> Dict[str, Dict[str, Any]]:
+        cached = self._read()
+        entries: Dict[str, Dict[str, Any]] = {}
+        dirty = False
+
+        for py_file in self.task_loader.iter_task_files():
+            try:
+                mtime_ns = os.stat(py_file).st_mtime_ns
+            except OSError:
+                continue
+
+            key = str(py_file)
+            entry = cached.get(key)
+            if entry and entry["mtime_ns"] == mtime_ns:
+                entries[key] = entry
+                continue
+
+            dirty = True
+            source = py_file.read_bytes()
+            sha1 = hashlib.sha1(source).hexdigest()
+            if entry and entry["sha1"] == sha1:
+                entry["mtime_ns"] = mtime_ns
+                entries[key] = entry
+                continue
+
+            entry = self._parse(py_file, source)
+            entry["mtime_ns"] = mtime_ns
+            entry["sha1"] = sha1
+            entries[key] = entry
+
+        if dirty or set(cached) != set(entries):
+            self._write(entries)
+
+        return {entry["name"]: entry for entry in entries.values() if entry["entry_type"]}
+
+    def _parse(self, py_file: Path, source: bytes) -> Dict[str, Any]:
+        """静态提取任务入口，规则与 TaskLoader._extract_task_from_module 保持一致"""
+        layer = py_file.parent.name
+        entry = {
+            "name": py_file.stem,
+            "category": "warehouse" if layer in ["ods", "dw", "dim"] else "utils",
+            "layer": layer,
+            "path": str(py_file),
+            "description": "",
+            "entry_type": None,
+            "object_name": None,
+        }
+        try:
+            tree = ast.parse(source, filename=str(py_file))
+        except SyntaxError:
+            return entry
+
+        classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+        functions = {node.name: node for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+
+        candidates = [name for name in classes if name.lower().endswith("task")]
+        bases = {self._base_name(base) for name in candidates for base in classes[name].bases}
+        for name in sorted(candidates):
+            if name not in bases:
+                entry["entry_type"] = "class"
+                entry["object_name"] = name
+                entry["description"] = self._class_description(classes[name])
+                return entry
+
+        for name in sorted(functions):
+            if not name.startswith("_") and name != "main":
+                break
+        else:
+            name = "main" if "main" in functions else None
+
+        if name:
+            entry["entry_type"] = "function"
+            entry["object_name"] = name
+            entry["description"] = self._first_line(ast.get_docstring(functions[name]))
+        return entry
+
+    @staticmethod
+    def _base_name(node: ast.expr) -> str:
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            return node.attr
+        return ""
+
+    def _class_description(self, node: ast.ClassDef) -> str:
+        """优先取 __init__ 中的 self.description 字面量，其次取类文档字符串"""
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+                for stmt in ast.walk(item):
+                    if (
+                        isinstance(stmt, ast.Assign)
+                        and any(
+                            isinstance(t, ast.Attribute) and t.attr == "description" and isinstance(t.value, ast.Name)
+                            for t in stmt.targets
+                        )
+                        and isinstance(stmt.value, ast.Constant)
+                        and isinstance(stmt.value.value, str)
+                    ):
+                        return stmt.value.value
+        return self._first_line(ast.get_docstring(node))
+
+    @staticmethod
+    def _first_line(text: Optional[str]) -> str:
+        return text.strip().splitlines()[0] if text and text.strip() else ""
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("files", {})
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]):
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            # 清单只是缓存，写入失败不影响命令注册
+            pass
+
+    def names(self, category: Optional[str] = None) -> List[str]:
+        return sorted(self.load(category))
@@ -0,0 +1,267 @@
+"""多机共享任务队列（SQLite 文件）
+
+submit 把一次 DAG 运行的全部任务写入队列：没有未完成上游的任务为就绪状态，其余任务记录尚未完成的上游数。
+worker 以 BEGIN IMMEDIATE 事务领取就绪任务并获得租约，执行期间定期续租；任务完成后递减下游的等待数，
+失败时跳过全部下游。worker 失联（租约过期）的任务由其他 worker 在领取时重新入队，超过最大尝试次数记为失败。
+
+队列是共享存储上的 SQLite 文件，没有统一的服务端时钟：租约到期时间由续租的 worker 按本机时间写入，
+由领取任务的 worker 按本机时间判断是否过期，因此各主机需要通过 NTP 同步时钟。判断过期时额外容忍
+clock_skew 秒的偏差，租约需远大于该偏差（至少 3 倍），否则时钟较快的主机会把正在执行的任务重新入队。
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
+
+import typer
+
+from config import config
+from warehouse.base_task import Status
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_runs (
+    run_id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    selector TEXT,
+    status TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS queue_tasks (
+    run_id TEXT NOT NULL,
+    task_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    waiting INTEGER NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL,
+    error TEXT,
+    PRIMARY KEY (run_id, task_name)
+);
+CREATE INDEX IF NOT EXISTS idx_queue_tasks_ready ON queue_tasks (status, waiting);
+CREATE TABLE IF NOT EXISTS queue_edges (
+    run_id TEXT NOT NULL,
+    upstream TEXT NOT NULL,
+    task_name TEXT NOT NULL,
+    PRIMARY KEY (run_id, upstream, task_name)
+);
+"""
+
+# 失败任务的全部下游（递归）
+_DOWNSTREAM_SQL = """
+WITH RECURSIVE down(name) AS (
+    SELECT task_name FROM queue_edges WHERE run_id = :run_id AND upstream = :task_name
+    UNION
+    SELECT e.task_name FROM queue_edges e JOIN down d ON e.upstream = d.name WHERE e.run_id = :run_id
+)
+SELECT name FROM down
+"""
+
+
+class TaskQueue:
+    """共享任务队列
+
+    多台机器共享同一个队列文件时，文件需放在支持 POSIX 文件锁的共享存储上；
+    队列使用默认的回滚日志模式（WAL 依赖共享内存，不能跨主机使用）。
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        clock_skew: Optional[float] = None,
+    ):
+        settings = config.queue
+        self.db_path = Path(db_path or settings["db_path"])
+        self.lease_seconds = float(lease_seconds or settings["lease"])
+        self.max_attempts = int(max_attempts or settings["max_attempts"])
+        self.clock_skew = float(settings["clock_skew"] if clock_skew is None else clock_skew)
+        self._schema_ready = False
+        if self.lease_seconds < 3 * self.clock_skew:
+            typer.echo(
+                f"⚠️ 租约 {self.lease_seconds:g}s 不足允许时钟偏差 {self.clock_skew:g}s 的 3 倍，"
+                "主机时钟不同步时执行中的任务可能被重新入队",
+                err=True,
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务：BEGIN IMMEDIATE 立即获取写锁，多个 worker 同时领取时互斥"""
+        if not self._schema_ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def submit(
+        self,
+        upstreams: Dict[str, Set[str]],
+        params: Dict[str, Any],
+        priorities: Optional[Dict[str, float]] = None,
+        selector: Optional[str] = None,
+    ) -> str:
+        """提交一次 DAG 运行
+
+        Args:
+            upstreams: {任务名: 上游任务名集合}，只包含本次运行选中的任务
+            priorities: 任务优先级（关键路径剩余耗时），就绪任务按优先级从高到低被领取
+
+        Returns:
+            run_id
+        """
+        run_id = f"{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+        priorities = priorities or {}
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO queue_runs (run_id, params, selector, status, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, json.dumps(params, default=str), selector, Status.RUNNING, time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO queue_tasks (run_id, task_name, status, waiting, priority) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, name, Status.PENDING, len(deps & upstreams.keys()), priorities.get(name, 0.0))
+                    for name, deps in upstreams.items()
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO queue_edges (run_id, upstream, task_name) VALUES (?, ?, ?)",
+                [(run_id, upstream, name) for name, deps in upstreams.items() for upstream in deps & upstreams.keys()],
+            )
+            self._finish_run_if_done(conn, run_id)
+        return run_id
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """领取一个就绪任务（先提交的运行优先，同一运行内优先级高的优先），没有就绪任务时返回 None"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT t.run_id, t.task_name, t.attempts, r.params FROM queue_tasks t "
+                "JOIN queue_runs r ON r.run_id = t.run_id "
+                "WHERE t.status = ? AND t.waiting = 0 "
+                "ORDER BY r.submitted_at, t.priority DESC, t.task_name LIMIT 1",
+                (Status.PENDING,),
+            ).fetchone()
+            if row is None:
+                return None
+            run_id, task_name, attempts, params = row
+            conn.execute(
+                "UPDATE queue_tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, started_at = ? "
+                "WHERE run_id = ? AND task_name = ?",
+                (Status.RUNNING, worker_id, now + self.lease_seconds, now, run_id, task_name),
+            )
+        return {"run_id": run_id, "task_name": task_name, "attempt": attempts + 1, "params": json.loads(params)}
+
+    def heartbeat(self, run_id: str, task_name: str, worker_id: str) -> bool:
+        """续租；租约已被收回（worker 被判定失联后任务重新入队）时返回 False"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE queue_tasks SET lease_until = ? WHERE run_id = ? AND task_name = ? AND worker = ? AND status = ?",
+                (time.time() + self.lease_seconds, run_id, task_name, worker_id, Status.RUNNING),
+            )
+            return cursor.rowcount > 0
+
+    def complete(
+        self, run_id: str, task_name: str, worker_id: str, status: str, duration: float, error: Optional[str] = None
+    ) -> bool:
+        """记录任务结果并推进下游；租约已被收回时忽略本次结果并返回 False"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE queue_tasks SET status = ?, finished_at = ?, duration = ?, error = ?, lease_until = NULL "
+                "WHERE run_id = ? AND task_name = ? AND worker = ? AND status = ?",
+                (status, time.time(), duration, error, run_id, task_name, worker_id, Status.RUNNING),
+            )
+            if cursor.rowcount == 0:
+                return False
+            if status == Status.SUCCESS:
+                conn.execute(
+                    "UPDATE queue_tasks SET waiting = waiting - 1 WHERE run_id = ? AND task_name IN "
+                    "(SELECT task_name FROM queue_edges WHERE run_id = ? AND upstream = ?)",
+                    (run_id, run_id, task_name),
+                )
+            else:
+                self._skip_downstream(conn, run_id, task_name)
+            self._finish_run_if_done(conn, run_id)
+        return True
+
+    def run_status(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """运行状态 {status, counts: {状态: 任务数}, failed: {任务名: 错误}}，run_id 不存在时返回 None"""
+        with self._transaction() as conn:
+            run = conn.execute("SELECT status FROM queue_runs WHERE run_id = ?", (run_id,)).fetchone()
+            if run is None:
+                return None
+            counts = dict(
+                conn.execute("SELECT status, COUNT(*) FROM queue_tasks WHERE run_id = ? GROUP BY status", (run_id,)).fetchall()
+            )
+            failed = dict(
+                conn.execute(
+                    "SELECT task_name, error FROM queue_tasks WHERE run_id = ? AND status = ?", (run_id, Status.FAILED)
+                ).fetchall()
+            )
+        return {"status": run[0], "counts": counts, "failed": failed}
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float):
+        """租约过期（超过到期时间 clock_skew 秒以上）的任务重新入队，超过最大尝试次数的记为失败"""
+        expired = conn.execute(
+            "SELECT run_id, task_name, worker, attempts FROM queue_tasks WHERE status = ? AND lease_until < ?",
+            (Status.RUNNING, now - self.clock_skew),
+        ).fetchall()
+        for run_id, task_name, worker, attempts in expired:
+            if attempts >= self.max_attempts:
+                error = f"租约过期 {attempts} 次（最后领取的 worker: {worker}）"
+                conn.execute(
+                    "UPDATE queue_tasks SET status = ?, error = ?, lease_until = NULL, finished_at = ? "
+                    "WHERE run_id = ? AND task_name = ?",
+                    (Status.FAILED, error, now, run_id, task_name),
+                )
+                self._skip_downstream(conn, run_id, task_name)
+                self._finish_run_if_done(conn, run_id)
+                typer.echo(f"❌ 任务 {task_name} {error}，不再重试", err=True)
+            else:
+                conn.execute(
+                    "UPDATE queue_tasks SET status = ?, worker = NULL, lease_until = NULL WHERE run_id = ? AND task_name = ?",
+                    (Status.PENDING, run_id, task_name),
+                )
+                typer.echo(f"♻️  任务 {task_name} 的租约已过期（worker {worker} 失联），重新入队", err=True)
+
+    @staticmethod
+    def _skip_downstream(conn: sqlite3.Connection, run_id: str, task_name: str):
+        names = [row[0] for row in conn.execute(_DOWNSTREAM_SQL, {"run_id": run_id, "task_name": task_name})]
+        conn.executemany(
+            "UPDATE queue_tasks SET status = ?, error = ? WHERE run_id = ? AND task_name = ? AND status = ?",
+            [(Status.SKIPPED, f"上游任务 {task_name} 失败", run_id, name, Status.PENDING) for name in names],
+        )
+
+    @staticmethod
+    def _finish_run_if_done(conn: sqlite3.Connection, run_id: str):
+        counts = dict(
+            conn.execute("SELECT status, COUNT(*) FROM queue_tasks WHERE run_id = ? GROUP BY status", (run_id,)).fetchall()
+        )
+        if counts.get(Status.PENDING) or counts.get(Status.RUNNING):
+            return
+        status = Status.FAILED if counts.get(Status.FAILED) or counts.get(Status.SKIPPED) else Status.SUCCESS
+        conn.execute(
+            "UPDATE queue_runs SET status = ?, finished_at = ? WHERE run_id = ? AND status = ?",
+            (status, time.time(), run_id, Status.RUNNING),
+        )
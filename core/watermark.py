@@ -0,0 +1,93 @@
+"""增量处理水位线存储"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from config import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    task_key TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (task_key, column_name)
+);
+"""
+
+
+def _is_newer(value: str, current: str) -> bool:
+    """比较水位值：都是数字时按数值比较，否则按字符串（ISO 日期时间）比较"""
+    try:
+        return float(value) > float(current)
+    except ValueError:
+        return value > current
+
+
+class WatermarkStore:
+    """水位线存储（本地 SQLite 文件）
+
+    每个任务 + 水位列记录最近一次成功提交的高水位值，只有任务执行成功后才推进。
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or config.cache_dir / "watermarks.db"
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接，正常退出时提交并关闭"""
+        if not self._schema_ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, task_key: str, column: str) -> Optional[str]:
+        """返回已提交的水位值，未记录时返回 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM watermarks WHERE task_key = ? AND column_name = ?", (task_key, column)
+            ).fetchone()
+        return row[0] if row else None
+
+    def commit(self, task_key: str, column: str, value: Any):
+        """推进水位线（只前进不后退）"""
+        value = value.isoformat(sep=" ") if isinstance(value, datetime) else str(value)
+        with self._lock, self._connect() as conn:
+            current = conn.execute(
+                "SELECT value FROM watermarks WHERE task_key = ? AND column_name = ?", (task_key, column)
+            ).fetchone()
+            if current and not _is_newer(value, current[0]):
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO watermarks (task_key, column_name, value, updated_at) VALUES (?, ?, ?, ?)",
+                (task_key, column, value, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def reset(self, task_key: str, column: Optional[str] = None):
+        """清除水位线，下次运行从初始值开始"""
+        with self._connect() as conn:
+            if column is None:
+                conn.execute("DELETE FROM watermarks WHERE task_key = ?", (task_key,))
+            else:
+                conn.execute("DELETE FROM watermarks WHERE task_key = ? AND column_name = ?", (task_key, column))
+
+    def all(self) -> Dict[str, Dict[str, str]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT task_key, column_name, value FROM watermarks ORDER BY task_key").fetchall()
+        result: Dict[str, Dict[str, str]] = {}
+        for task_key, column, value in rows:
+            result.setdefault(task_key, {})[column] = value
+        return result
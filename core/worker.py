@@ -0,0 +1,144 @@
+"""多机 worker：从共享任务队列领取任务并执行"""
+
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
+
+import typer
+
+from core.execute import DagRunner
+from core.task_loader import TaskLoader
+from core.task_queue import TaskQueue
+from warehouse.base_task import Status
+
+
+def submit_run(
+    queue: TaskQueue, params: Dict[str, Any], selector: Optional[str] = None, task_loader: Optional[TaskLoader] = None
+) -> Dict[str, Any]:
+    """把选中的任务及其依赖提交到队列，优先级与 run-all 相同（按历史耗时的关键路径）
+
+    Returns:
+        {run_id, tasks, plan}
+    """
+    runner = DagRunner(task_loader=task_loader)
+    selected = runner.depends.select(selector)
+    order = runner.depends.topological_order(selected)
+    plan = runner.make_plan(order, params)
+    upstreams = {name: runner.depends.upstreams[name] & selected for name in order}
+    run_id = queue.submit(upstreams, params, priorities=plan["priorities"], selector=selector)
+    return {"run_id": run_id, "tasks": len(order), "plan": plan}
+
+
+class QueueWorker(DagRunner):
+    """从共享队列拉取任务的 worker
+
+    每台主机启动一个或多个 worker，每个 worker 同时执行最多 concurrency 个任务；
+    依赖关系由队列维护，worker 只领取上游已全部成功的任务，因此增加 worker 即可水平扩展吞吐。
+    执行期间后台线程每 lease/3 秒续租一次；worker 崩溃或失联后租约过期，任务由其他 worker 重新领取。
+    """
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        concurrency: int = 4,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 2.0,
+        idle_exit: float = 0,
+        task_loader: Optional[TaskLoader] = None,
+    ):
+        """
+        Args:
+            idle_exit: 连续空闲超过该秒数后退出，0 表示一直运行
+        """
+        super().__init__(max_workers=concurrency, task_loader=task_loader)
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.idle_exit = idle_exit
+
+    def serve(self) -> Dict[str, int]:
+        """循环领取并执行任务，直到空闲超时或收到 Ctrl+C（等待执行中的任务完成后退出）
+
+        Returns:
+            本 worker 的执行统计 {状态: 任务数}
+        """
+        stats = {Status.SUCCESS: 0, Status.FAILED: 0}
+        running: Dict[Future, Dict[str, Any]] = {}
+        idle_since = time.monotonic()
+        stopping = False
+        self._started = time.monotonic()
+        typer.echo(f"👷 worker {self.worker_id} 已启动，并发数 {self.max_workers}，队列 {self.queue.db_path}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dwf-worker") as pool:
+            while True:
+                try:
+                    # 只在有空闲槽位时领取，未执行的任务留在队列里给其他 worker
+                    while not stopping and len(running) < self.max_workers:
+                        claim = self.queue.claim(self.worker_id)
+                        if claim is None:
+                            break
+                        typer.echo(f"📥 领取 {claim['task_name']}（运行 {claim['run_id']}，第 {claim['attempt']} 次）")
+                        running[pool.submit(self._serve_one, claim)] = claim
+
+                    if not running:
+                        if stopping or (self.idle_exit and time.monotonic() - idle_since >= self.idle_exit):
+                            break
+                        time.sleep(self.poll_interval)
+                        continue
+
+                    done, _ = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+                        status = future.result()
+                        if status in stats:
+                            stats[status] += 1
+                    if not running:
+                        idle_since = time.monotonic()
+                except KeyboardInterrupt:
+                    if stopping:
+                        raise
+                    stopping = True
+                    typer.echo(f"🛑 停止领取新任务，等待 {len(running)} 个执行中的任务完成（再次 Ctrl+C 强制退出）")
+
+        typer.echo(f"👋 worker {self.worker_id} 退出：成功 {stats[Status.SUCCESS]}，失败 {stats[Status.FAILED]}")
+        return stats
+
+    def _serve_one(self, claim: Dict[str, Any]) -> Optional[str]:
+        run_id, task_name = claim["run_id"], claim["task_name"]
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(run_id, task_name, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = self._run_one(task_name, claim["params"])
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if not self.queue.complete(
+            run_id, task_name, self.worker_id, result["status"], result["duration"], result.get("error")
+        ):
+            typer.echo(f"⚠️ 任务 {task_name} 的租约已被收回，本次结果不计入队列", err=True)
+            return None
+        icon = "✅" if result["status"] == Status.SUCCESS else "❌"
+        typer.echo(f"{icon} {task_name} {result['status']}（{result['duration']:.1f}s）")
+        return result["status"]
+
+    def _heartbeat(self, run_id: str, task_name: str, stop: threading.Event):
+        while not stop.wait(self.queue.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(run_id, task_name, self.worker_id):
+                    typer.echo(f"⚠️ 任务 {task_name} 续租失败：租约已过期并被重新分配", err=True)
+                    return
+            except Exception as e:
+                # 共享存储短暂不可用时继续尝试，租约过期前恢复即可
+                typer.echo(f"⚠️ 任务 {task_name} 续租出错: {e}", err=True)
+
+    def _task_info(self, task_name: str) -> Dict[str, Any]:
+        # worker 长期运行，队列中出现本机索引里没有的任务时重建依赖图
+        with self._tasks_lock:
+            if task_name not in self.tasks and task_name not in self.depends.entries:
+                self.depends.build_graph()
+            return super()._task_info(task_name)
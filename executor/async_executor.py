@@ -0,0 +1,361 @@
+import asyncio
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence
+
+import typer
+
+from executor.base_executor import BaseExecutor
+
+
+class AsyncBaseExecutor(ABC):
+    """异步执行器基类
+
+    每个实例持有一个驱动级连接池，execute_* 每次调用从池中取一个连接，
+    因此同一个执行器上可以用 asyncio.gather 同时发起多个查询，并发度受 pool_size 限制。
+    错误分类（classify_error）与同步执行器相同，供 AsyncResilientExecutor 判断是否重试。
+    """
+
+    supports_transactions = True
+    connection_error_patterns = BaseExecutor.connection_error_patterns
+    transient_error_patterns = BaseExecutor.transient_error_patterns
+    classify_error = BaseExecutor.classify_error
+
+    def __init__(self, config: Dict[str, Any], pool_size: int = 10):
+        self.config = config
+        self.pool_size = max(1, pool_size)
+        self.pool = None
+
+    @abstractmethod
+    async def connect(self) -> bool:
+        """建立连接池"""
+        pass
+
+    @abstractmethod
+    async def execute_sql(self, sql: str, params: Optional[Any] = None) -> Any:
+        """执行SQL语句"""
+        pass
+
+    @abstractmethod
+    async def execute_query(self, sql: str, params: Optional[Any] = None) -> List[Dict]:
+        """执行查询语句"""
+        pass
+
+    async def iter_query(self, sql: str, params: Optional[Any] = None, batch_size: int = 10000) -> AsyncIterator[List[Dict]]:
+        """流式执行查询语句，按批返回结果（默认实现整体加载后分批）"""
+        rows = await self.execute_query(sql, params)
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+    @abstractmethod
+    async def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        """在同一个连接上按顺序执行一批语句，transaction 为真时包在一个事务中"""
+        pass
+
+    @abstractmethod
+    async def bulk_insert(
+        self, table: str, rows: Iterable[Any], columns: Optional[Sequence[str]] = None, batch_size: int = 10000
+    ) -> int:
+        """批量写入数据，返回写入行数"""
+        pass
+
+    @abstractmethod
+    async def close(self):
+        """关闭连接池"""
+        pass
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class AsyncMySQLExecutor(AsyncBaseExecutor):
+    """MySQL异步执行器（aiomysql）"""
+
+    async def connect(self) -> bool:
+        try:
+            import aiomysql
+
+            self.pool = await aiomysql.create_pool(
+                host=self.config["host"],
+                port=self.config["port"],
+                user=self.config["user"],
+                password=self.config["password"],
+                db=self.config["database"],
+                minsize=1,
+                maxsize=self.pool_size,
+                autocommit=True,
+            )
+            typer.echo(f"🔗 连接MySQL(async): {self.config['host']}:{self.config['port']}")
+            return True
+        except Exception as e:
+            typer.echo(f"❌ MySQL连接失败: {e}", err=True)
+            return False
+
+    async def execute_sql(self, sql: str, params: Optional[Any] = None) -> Any:
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                return {"status": "success", "rows_affected": cursor.rowcount}
+
+    async def execute_query(self, sql: str, params: Optional[Any] = None) -> List[Dict]:
+        import aiomysql
+
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, params)
+                return list(await cursor.fetchall())
+
+    async def iter_query(self, sql: str, params: Optional[Any] = None, batch_size: int = 10000) -> AsyncIterator[List[Dict]]:
+        import aiomysql
+
+        # 非缓冲游标，结果按批从服务端读取
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.SSDictCursor) as cursor:
+                await cursor.execute(sql, params)
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield list(rows)
+
+    async def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        rows_affected = 0
+        async with self.pool.acquire() as conn:
+            # 连接池为 autocommit 模式，begin() 显式开启事务
+            if transaction:
+                await conn.begin()
+            try:
+                async with conn.cursor() as cursor:
+                    for statement in statements:
+                        await cursor.execute(statement)
+                        rows_affected += max(cursor.rowcount, 0)
+                if transaction:
+                    await conn.commit()
+            except BaseException:
+                if transaction:
+                    await conn.rollback()
+                raise
+        return {"status": "success", "statements": len(statements), "rows_affected": rows_affected}
+
+    async def bulk_insert(
+        self, table: str, rows: Iterable[Any], columns: Optional[Sequence[str]] = None, batch_size: int = 10000
+    ) -> int:
+        """每批一次 executemany（aiomysql 将 INSERT ... VALUES 改写为多行插入），按批提交"""
+        total = 0
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                for batch_columns, batch in BaseExecutor._row_batches(rows, columns, batch_size):
+                    column_sql = f" ({', '.join(batch_columns)})" if batch_columns else ""
+                    placeholders = ", ".join(["%s"] * len(batch[0]))
+                    await cursor.executemany(f"INSERT INTO {table}{column_sql} VALUES ({placeholders})", batch)
+                    total += len(batch)
+        return total
+
+    async def close(self):
+        if self.pool:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+            typer.echo("✅ MySQL连接已关闭")
+
+
+class AsyncPostgreSQLExecutor(AsyncBaseExecutor):
+    """PostgreSQL异步执行器（asyncpg，参数占位符为 $1, $2 ...）"""
+
+    async def connect(self) -> bool:
+        try:
+            import asyncpg
+
+            self.pool = await asyncpg.create_pool(
+                host=self.config["host"],
+                port=self.config["port"],
+                user=self.config["user"],
+                password=self.config["password"],
+                database=self.config["database"],
+                min_size=1,
+                max_size=self.pool_size,
+            )
+            typer.echo(f"🔗 连接PostgreSQL(async): {self.config['host']}:{self.config['port']}")
+            return True
+        except Exception as e:
+            typer.echo(f"❌ PostgreSQL连接失败: {e}", err=True)
+            return False
+
+    async def execute_sql(self, sql: str, params: Optional[Any] = None) -> Any:
+        async with self.pool.acquire() as conn:
+            status = await conn.execute(sql, *(params or ()))
+            return {"status": "success", "result": status}
+
+    async def execute_query(self, sql: str, params: Optional[Any] = None) -> List[Dict]:
+        async with self.pool.acquire() as conn:
+            return [dict(record) for record in await conn.fetch(sql, *(params or ()))]
+
+    async def iter_query(self, sql: str, params: Optional[Any] = None, batch_size: int = 10000) -> AsyncIterator[List[Dict]]:
+        # asyncpg 的游标必须在事务内使用，prefetch 控制每次从服务端拉取的行数
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                cursor = await conn.cursor(sql, *(params or ()), prefetch=batch_size)
+                while True:
+                    rows = await cursor.fetch(batch_size)
+                    if not rows:
+                        break
+                    yield [dict(record) for record in rows]
+
+    async def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        """不带参数时 asyncpg 使用简单查询协议，整个脚本一次发送，在服务端的一个隐式事务中执行"""
+        async with self.pool.acquire() as conn:
+            if transaction:
+                async with conn.transaction():
+                    await conn.execute(";\n".join(statements))
+            else:
+                await conn.execute(";\n".join(statements))
+        return {"status": "success", "statements": len(statements), "rows_affected": 0}
+
+    async def bulk_insert(
+        self, table: str, rows: Iterable[Any], columns: Optional[Sequence[str]] = None, batch_size: int = 10000
+    ) -> int:
+        """每批通过 COPY 二进制协议写入（copy_records_to_table）"""
+        schema, _, name = table.rpartition(".")
+        total = 0
+        async with self.pool.acquire() as conn:
+            for batch_columns, batch in BaseExecutor._row_batches(rows, columns, batch_size):
+                await conn.copy_records_to_table(name, records=batch, columns=batch_columns, schema_name=schema or None)
+                total += len(batch)
+        return total
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+            typer.echo("✅ PostgreSQL连接已关闭")
+
+
+class ThreadedAsyncExecutor(AsyncBaseExecutor):
+    """同步执行器的异步适配器
+
+    用于没有异步驱动的引擎（如 Hive、SQLite、DuckDB）：每次调用从同步连接池借出执行器，在线程中执行。
+    wrap 用于给借出的同步执行器加上与同步任务相同的代理（超时/重试、性能指标、查询缓存）。
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        pool_size: int = 10,
+        executor_type: str = "hive",
+        wrap: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__(config, pool_size)
+        self.executor_type = executor_type
+        self.wrap = wrap
+
+    async def connect(self) -> bool:
+        from executor.executor_pool import get_pool
+
+        self.pool = get_pool(self.executor_type)
+        return True
+
+    def _wrapped(self, executor: Any) -> Any:
+        return self.wrap(executor) if self.wrap else executor
+
+    async def _call(self, method: str, *args, **kwargs) -> Any:
+        def run():
+            with self.pool.borrow() as executor:
+                return getattr(self._wrapped(executor), method)(*args, **kwargs)
+
+        return await asyncio.to_thread(run)
+
+    async def execute_sql(self, sql: str, params: Optional[Any] = None) -> Any:
+        return await self._call("execute_sql", sql, params)
+
+    async def execute_query(self, sql: str, params: Optional[Any] = None) -> List[Dict]:
+        return await self._call("execute_query", sql, params)
+
+    async def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        return await self._call("execute_script", statements, transaction)
+
+    async def bulk_insert(
+        self, table: str, rows: Iterable[Any], columns: Optional[Sequence[str]] = None, batch_size: int = 10000
+    ) -> int:
+        return await self._call("bulk_insert", table, rows, columns, batch_size)
+
+    async def iter_query(self, sql: str, params: Optional[Any] = None, batch_size: int = 10000) -> AsyncIterator[List[Dict]]:
+        """服务端游标只能在一个线程中读取：由专用线程借出执行器逐批读取，经有界队列交给事件循环，
+        读取速度受消费速度限制，内存中最多保留两批数据；调用方提前停止时通知读取线程关闭游标"""
+        batches: "queue.Queue" = queue.Queue(maxsize=2)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                with self.pool.borrow() as executor:
+                    iterator = iter(self._wrapped(executor).iter_query(sql, params, batch_size))
+                    try:
+                        for batch in iterator:
+                            if not put(("batch", batch)):
+                                return
+                    finally:
+                        close = getattr(iterator, "close", None)
+                        if close is not None:
+                            close()
+                put(("done", None))
+            except BaseException as e:
+                put(("error", e))
+
+        reader = threading.Thread(target=produce, name="dwf-async-iter", daemon=True)
+        reader.start()
+        try:
+            while True:
+                try:
+                    kind, item = await asyncio.to_thread(batches.get, True, 0.5)
+                except queue.Empty:
+                    continue
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            await asyncio.to_thread(reader.join)
+
+    async def close(self):
+        # 同步连接池由进程统一管理，这里只释放引用
+        self.pool = None
+
+
+class AsyncExecutorFactory:
+    """异步执行器工厂"""
+
+    # 有原生异步驱动的执行器类型
+    native_types = ("mysql", "postgresql")
+
+    @staticmethod
+    def create_executor(
+        executor_type: str, config: Dict[str, Any], pool_size: int = 10, wrap: Optional[Callable[[Any], Any]] = None
+    ) -> AsyncBaseExecutor:
+        """创建异步执行器实例
+
+        Args:
+            wrap: 为借出的同步执行器加代理的函数，只用于没有异步驱动、在线程中执行的引擎
+        """
+        if executor_type == "mysql":
+            return AsyncMySQLExecutor(config, pool_size)
+        elif executor_type == "postgresql":
+            return AsyncPostgreSQLExecutor(config, pool_size)
+        else:
+            # 没有异步驱动的引擎（Hive、SQLite、DuckDB 等）借用同步连接池，在线程中执行；
+            # 未知类型在首次借出连接时由 ExecutorFactory 报错
+            return ThreadedAsyncExecutor(config, pool_size, executor_type=executor_type, wrap=wrap)
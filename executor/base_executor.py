@@ -1,13 +1,85 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-import typer
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+def sql_literal(value: Any, backslash_escapes: bool = True) -> str:
+    """将 Python 值转换为 SQL 字面量
+
+    Args:
+        backslash_escapes: 字符串中的反斜杠是否为转义符（MySQL/Hive 为是，PostgreSQL 标准字符串为否）
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    value = str(value)
+    if backslash_escapes:
+        value = value.replace("\\", "\\\\")
+    return "'" + value.replace("'", "''") + "'"
+
+
+def delimited_value(value: Any, sep: str = "\t") -> str:
+    """将 Python 值转换为分隔文本文件中的字段（MySQL LOAD DATA / Hive 文本表约定：\\N 表示 NULL）"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        value = int(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\").replace(sep, "\\" + sep).replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _rows_affected(result: Any) -> int:
+    """从 execute_sql 的返回值中取影响行数"""
+    if isinstance(result, dict):
+        result = result.get("rows_affected")
+    return max(result, 0) if isinstance(result, int) else 0
+
 
 class BaseExecutor(ABC):
     """执行器基类"""
-    
+
+    # 字符串字面量中反斜杠是否为转义符
+    backslash_escapes = True
+    # 是否支持多语句事务（BEGIN / COMMIT / ROLLBACK）
+    supports_transactions = True
+    # 错误信息（小写）包含这些片段时视为连接类错误：重建连接后可重试
+    connection_error_patterns: Tuple[str, ...] = (
+        "connection reset",
+        "connection refused",
+        "connection aborted",
+        "broken pipe",
+        "lost connection",
+        "server has gone away",
+        "server closed the connection",
+        "ttransportexception",
+    )
+    # 错误信息（小写）包含这些片段时视为瞬时错误：原连接上退避后可重试
+    transient_error_patterns: Tuple[str, ...] = (
+        "lock wait timeout",
+        "deadlock",
+        "database is locked",
+        "too many connections",
+        "queue full",
+        "queue is full",
+        "temporarily unavailable",
+        "could not serialize access",
+    )
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.connection = None
+        # 最近一次建立连接的耗时（秒），由连接池记录，供性能指标统计
+        self.connect_time = 0.0
     
     @abstractmethod
     def connect(self) -> bool:
@@ -24,10 +96,155 @@ class BaseExecutor(ABC):
         """执行查询语句"""
         pass
     
+    def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        """在同一会话中按顺序执行一批语句
+
+        Args:
+            statements: 语句列表（每条不含结尾分号，可用 core.sql_builder.split_statements 拆分）
+            transaction: 是否包在一个事务中，任一语句失败时回滚
+
+        Returns:
+            {"status": "success", "statements": 语句数, "rows_affected": 影响行数之和}
+
+        默认实现在当前连接上逐条 execute_sql（嵌入式引擎没有网络往返，逐条执行即可），
+        子类按引擎覆盖为一次发送整个脚本或复用同一游标。
+        """
+        transaction = transaction and self.supports_transactions
+        rows_affected = 0
+        if transaction:
+            self.execute_sql("BEGIN")
+        try:
+            for statement in statements:
+                rows_affected += _rows_affected(self.execute_sql(statement))
+            if transaction:
+                self.execute_sql("COMMIT")
+        except BaseException:
+            if transaction:
+                try:
+                    self.execute_sql("ROLLBACK")
+                except Exception:
+                    pass
+            raise
+        return {"status": "success", "statements": len(statements), "rows_affected": rows_affected}
+
+    def cancel(self) -> bool:
+        """取消当前连接上正在执行的语句（由超时看门狗线程调用）
+
+        Returns:
+            是否已发出取消请求；默认不支持，子类按驱动实现（interrupt / cancel / KILL QUERY）
+        """
+        return False
+
+    def classify_error(self, error: BaseException) -> Optional[str]:
+        """对执行失败的异常分类
+
+        Returns:
+            "connection"（连接类错误，重建连接后重试）、"transient"（瞬时错误，退避后重试），
+            其余错误（语法错误、权限不足等）返回 None，不重试
+        """
+        if isinstance(error, ConnectionError):
+            return "connection"
+        message = str(error).lower()
+        if any(pattern in message for pattern in self.connection_error_patterns):
+            return "connection"
+        if any(pattern in message for pattern in self.transient_error_patterns):
+            return "transient"
+        return None
+
+    def take_connect_time(self) -> float:
+        """返回尚未统计的建连耗时并清零（复用的连接返回 0）"""
+        elapsed, self.connect_time = self.connect_time, 0.0
+        return elapsed
+
+    def without_cache(self) -> "BaseExecutor":
+        """不经过查询结果缓存的执行器；执行器本身没有缓存，返回自身（CachedExecutor 返回内层执行器）"""
+        return self
+
+    def query_columns(self, sql: str, params: Optional[Dict] = None) -> List[str]:
+        """查询结果的列名（取自游标的列描述，结果为空时也能得到）
+
+        会重新执行一次查询，用于结果集为空时补全导出文件的表头等场景；无法取得列描述的执行器返回空列表。
+        """
+        return []
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        """流式执行查询语句，按批返回结果
+
+        默认实现基于 execute_query（整体加载后分批），子类应使用服务端游标/非缓冲游标覆盖，
+        以保证大结果集的内存占用与结果大小无关。
+        """
+        rows = self.execute_query(sql, params)
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+    def bulk_insert(
+        self,
+        table: str,
+        rows: Iterable[Any],
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 10000,
+    ) -> int:
+        """批量写入数据
+
+        Args:
+            table: 目标表
+            rows: 行（dict 或 tuple/list）的可迭代对象，也可以是按批组织的行列表（如 iter_query 的输出）
+            columns: 列名；为 None 时取第一行 dict 的键，tuple 行则不指定列（按表定义顺序）
+            batch_size: 每批写入的行数
+
+        Returns:
+            写入的行数
+
+        默认实现为多行 INSERT ... VALUES，子类按引擎覆盖为 executemany / COPY / LOAD DATA 等快速路径。
+        """
+        total = 0
+        for columns, batch in self._row_batches(rows, columns, batch_size):
+            column_sql = f" ({', '.join(columns)})" if columns else ""
+            values_sql = ",\n".join(
+                "(" + ", ".join(sql_literal(v, self.backslash_escapes) for v in row) + ")" for row in batch
+            )
+            self.execute_sql(f"INSERT INTO {table}{column_sql} VALUES\n{values_sql}")
+            total += len(batch)
+        return total
+
+    @staticmethod
+    def _row_batches(
+        rows: Iterable[Any], columns: Optional[Sequence[str]], batch_size: int
+    ) -> Iterator[Tuple[Optional[List[str]], List[tuple]]]:
+        """将行/批次统一整理为 (columns, [tuple, ...]) 批次"""
+        columns = list(columns) if columns else None
+        batch: List[tuple] = []
+
+        def flatten():
+            for item in rows:
+                # 元素本身是行列表时视为一个批次
+                if isinstance(item, list) and item and isinstance(item[0], (dict, list, tuple)):
+                    yield from item
+                else:
+                    yield item
+
+        for row in flatten():
+            if isinstance(row, dict):
+                if columns is None:
+                    columns = list(row.keys())
+                row = tuple(row.get(column) for column in columns)
+            else:
+                row = tuple(row)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield columns, batch
+                batch = []
+        if batch:
+            yield columns, batch
+
     @abstractmethod
     def close(self):
         """关闭连接"""
         pass
+
+    def ping(self) -> bool:
+        """健康检查（连接池借出前调用），子类可按驱动覆盖"""
+        return True
     
     def __enter__(self):
         self.connect()
@@ -45,8 +262,20 @@ class ExecutorFactory:
         if executor_type == "hive":
             from executor.hive_executor import HiveExecutor
             return HiveExecutor(config)
+        elif executor_type == "spark":
+            from executor.hive_executor import SparkExecutor
+            return SparkExecutor(config)
         elif executor_type == "mysql":
             from executor.mysql_executor import MySQLExecutor
             return MySQLExecutor(config)
+        elif executor_type == "postgresql":
+            from executor.postgresql_executor import PostgreSQLExecutor
+            return PostgreSQLExecutor(config)
+        elif executor_type == "sqlite":
+            from executor.sqlite_executor import SQLiteExecutor
+            return SQLiteExecutor(config)
+        elif executor_type == "duckdb":
+            from executor.duckdb_executor import DuckDBExecutor
+            return DuckDBExecutor(config)
         else:
             raise ValueError(f"不支持的执行器类型: {executor_type}")
\ No newline at end of file
@@ -0,0 +1,190 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import typer
+
+from .base_executor import BaseExecutor, ExecutorFactory
+
+# 未在 config.executors[...]["pool"] 中配置时使用的默认值
+DEFAULT_POOL_CONFIG = {
+    "size": 4,  # 最大连接数（使用中 + 空闲）
+    "max_lifetime": 3600,  # 连接最长存活秒数，超过后归还时关闭
+    "idle_timeout": 600,  # 空闲超过该秒数的连接被回收
+    "acquire_timeout": 300,  # 等待可用连接的最长秒数
+}
+
+
+class ExecutorPool:
+    """执行器连接池
+
+    同一执行器类型的连接在任务之间复用：借出前做健康检查，
+    超过 max_lifetime 或空闲超过 idle_timeout 的连接会被关闭回收。
+    """
+
+    def __init__(self, executor_type: str, executor_config: Dict[str, Any], pool_config: Optional[Dict[str, Any]] = None):
+        self.executor_type = executor_type
+        self.executor_config = executor_config
+        pool_config = {**DEFAULT_POOL_CONFIG, **(pool_config or {})}
+        self.size = max(1, int(pool_config["size"]))
+        self.max_lifetime = float(pool_config["max_lifetime"])
+        self.idle_timeout = float(pool_config["idle_timeout"])
+        self.acquire_timeout = float(pool_config["acquire_timeout"])
+
+        # 空闲连接栈（后进先出，优先复用最热的连接）：(executor, created_at, last_used)
+        self._idle: List[Tuple[BaseExecutor, float, float]] = []
+        # 借出中的连接 id -> created_at
+        self._in_use: Dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    @property
+    def total(self) -> int:
+        return len(self._idle) + len(self._in_use)
+
+    def acquire(self, timeout: Optional[float] = None) -> BaseExecutor:
+        """借出一个可用的执行器，池满时等待"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"{self.executor_type} 连接池已关闭")
+                self._evict_expired_locked()
+
+                while self._idle:
+                    executor, created_at, _ = self._idle.pop()
+                    if executor.ping():
+                        self._in_use[id(executor)] = created_at
+                        return executor
+                    self._close_quietly(executor)
+
+                if self.total < self.size:
+                    # 先占位再在锁外建立连接，避免慢连接阻塞其他线程归还
+                    placeholder = object()
+                    self._in_use[id(placeholder)] = time.monotonic()
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待 {self.executor_type} 连接超时（池大小 {self.size}）")
+                self._cond.wait(remaining)
+
+        try:
+            executor = self._connect()
+        except BaseException:
+            with self._cond:
+                del self._in_use[id(placeholder)]
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            created_at = self._in_use.pop(id(placeholder))
+            self._in_use[id(executor)] = created_at
+        return executor
+
+    def release(self, executor: BaseExecutor, discard: bool = False):
+        """归还执行器；discard=True 或超过 max_lifetime 时直接关闭"""
+        now = time.monotonic()
+        with self._cond:
+            created_at = self._in_use.pop(id(executor), now)
+            if discard or self._closed or now - created_at > self.max_lifetime:
+                self._close_quietly(executor)
+            else:
+                self._idle.append((executor, created_at, now))
+            self._cond.notify()
+
+    @contextmanager
+    def borrow(self) -> Iterator[BaseExecutor]:
+        """上下文管理器形式的借出/归还"""
+        executor = self.acquire()
+        try:
+            yield executor
+        except BaseException:
+            # 出错后连接状态不确定，不健康则直接丢弃
+            self.release(executor, discard=not executor.ping())
+            raise
+        else:
+            self.release(executor)
+
+    def close(self):
+        """关闭全部空闲连接，借出中的连接在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for executor, _, _ in idle:
+            self._close_quietly(executor)
+
+    def _connect(self) -> BaseExecutor:
+        executor = ExecutorFactory.create_executor(self.executor_type, self.executor_config)
+        start = time.monotonic()
+        if not executor.connect():
+            raise ConnectionError(f"{self.executor_type} 连接失败")
+        executor.connect_time = time.monotonic() - start
+        return executor
+
+    def _evict_expired_locked(self):
+        now = time.monotonic()
+        alive = []
+        for executor, created_at, last_used in self._idle:
+            if now - last_used > self.idle_timeout or now - created_at > self.max_lifetime:
+                self._close_quietly(executor)
+            else:
+                alive.append((executor, created_at, last_used))
+        self._idle = alive
+
+    @staticmethod
+    def _close_quietly(executor: BaseExecutor):
+        try:
+            executor.close()
+        except Exception as e:
+            typer.echo(f"⚠️ 关闭连接失败: {e}", err=True)
+
+
+_pools: Dict[str, ExecutorPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(executor_type: str) -> ExecutorPool:
+    """获取（必要时创建）指定执行器类型的连接池，配置取自 config.executors"""
+    from config import config
+
+    with _pools_lock:
+        pool = _pools.get(executor_type)
+        if pool is None:
+            executor_settings = config.executors.get(executor_type, {})
+            pool = ExecutorPool(executor_type, executor_settings.get("config", {}), executor_settings.get("pool"))
+            _pools[executor_type] = pool
+        return pool
+
+
+def register_pool(executor_type: str, pool: ExecutorPool):
+    """注册自定义连接池（如基准测试中的本地替身执行器），已有同名连接池时先关闭"""
+    with _pools_lock:
+        previous = _pools.get(executor_type)
+        _pools[executor_type] = pool
+    if previous is not None:
+        previous.close()
+
+
+@contextmanager
+def borrow_executor(executor_type: str) -> Iterator[BaseExecutor]:
+    """从连接池借出执行器"""
+    with get_pool(executor_type).borrow() as executor:
+        yield executor
+
+
+def close_all_pools():
+    """关闭全部连接池（进程退出时自动调用）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
@@ -1,22 +1,38 @@
-from typing import Any, Dict, List, Optional
+import os
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import typer
 
-from .base_executor import BaseExecutor
+from .base_executor import BaseExecutor, delimited_value
 
 
 class HiveExecutor(BaseExecutor):
     """Hive执行器"""
 
+    # HiveServer2 不支持多语句事务（ACID 表也只有单语句事务）
+    supports_transactions = False
+    # YARN 队列已满 / 资源不足时作业无法提交，稍后重试即可
+    transient_error_patterns = BaseExecutor.transient_error_patterns + (
+        "is at capacity",
+        "exceeds the maximum",
+        "too many pending",
+    )
+
     def connect(self) -> bool:
         try:
-            # 这里使用pyhive或者impyla等库实际实现
-            # from pyhive import hive
-            # self.connection = hive.connect(
-            #     host=self.config['host'],
-            #     port=self.config['port'],
-            #     database=self.config['database']
-            # )
+            from pyhive import hive
+
+            # 密码只在 LDAP/CUSTOM 认证下传给 HiveServer2，NONE（默认）认证只带用户名
+            auth = self.config.get("auth", "NONE")
+            self.connection = hive.connect(
+                host=self.config["host"],
+                port=self.config["port"],
+                database=self.config["database"],
+                username=self.config["user"],
+                auth=auth,
+                password=self.config["password"] if auth in ("LDAP", "CUSTOM") else None,
+            )
             typer.echo(f"🔗 连接Hive: {self.config['host']}:{self.config['port']}")
             return True
         except Exception as e:
@@ -24,22 +40,159 @@ class HiveExecutor(BaseExecutor):
             return False
 
     def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
-        try:
-            # with self.connection.cursor() as cursor:
-            #     cursor.execute(sql, parameters=params)
-            #     return cursor.fetchall() if sql.strip().lower().startswith('select') else None
+        if self.connection is None:
             typer.echo(f"🚀 执行Hive SQL: {sql}")
             return {"status": "success", "rows_affected": 1}
+
+        cursor = self._active_cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, parameters=params)
+            return {"status": "success", "rows_affected": max(cursor.rowcount or 0, 0)}
         except Exception as e:
             typer.echo(f"❌ SQL执行失败: {e}", err=True)
             raise
+        finally:
+            self._active_cursor = None
+            cursor.close()
 
     def execute_query(self, sql: str, params: Optional[Dict] = None) -> List[Dict]:
-        result = self.execute_sql(sql, params)
-        # 实际处理查询结果
-        return [{"column1": "value1", "column2": "value2"}]  # 示例数据
+        if self.connection is None:
+            self.execute_sql(sql, params)
+            return [{"column1": "value1", "column2": "value2"}]  # 示例数据
+
+        cursor = self._active_cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, parameters=params)
+            # 列名形如 表名.列名，只保留列名
+            columns = [column[0].split(".")[-1] for column in cursor.description or []]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()] if columns else []
+        except Exception as e:
+            typer.echo(f"❌ SQL执行失败: {e}", err=True)
+            raise
+        finally:
+            self._active_cursor = None
+            cursor.close()
+
+    def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        """在同一个 HiveServer2 会话与游标上依次执行一批语句
+
+        HiveServer2 每次 execute 只接受一条语句；复用同一游标省去每条语句打开/关闭 operation 的开销，
+        SET 等会话级设置对后续语句生效。transaction 不支持，忽略。
+        """
+        if transaction:
+            typer.echo("⚠️  Hive 不支持多语句事务，按顺序逐条执行", err=True)
+        if self.connection is None:
+            return super().execute_script(statements)
+
+        rows_affected = 0
+        cursor = self._active_cursor = self.connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+                rows_affected += max(cursor.rowcount or 0, 0)
+        except Exception as e:
+            typer.echo(f"❌ SQL执行失败: {e}", err=True)
+            raise
+        finally:
+            self._active_cursor = None
+            cursor.close()
+        return {"status": "success", "statements": len(statements), "rows_affected": rows_affected}
+
+    def query_columns(self, sql: str, params: Optional[Dict] = None) -> List[str]:
+        if self.connection is None:
+            return super().query_columns(sql, params)
+
+        cursor = self._active_cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, parameters=params)
+            return [column[0].split(".")[-1] for column in cursor.description or []]
+        finally:
+            self._active_cursor = None
+            cursor.close()
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        if self.connection is None:
+            yield from super().iter_query(sql, params, batch_size)
+            return
+
+        # HiveServer2 按 arraysize 分批拉取结果，fetchmany 不会一次性加载全部结果
+        cursor = self._active_cursor = self.connection.cursor(arraysize=batch_size)
+        try:
+            cursor.execute(sql, parameters=params)
+            columns = [column[0].split(".")[-1] for column in cursor.description or []]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(zip(columns, row)) for row in rows]
+        finally:
+            self._active_cursor = None
+            cursor.close()
+
+    def bulk_insert(
+        self,
+        table: str,
+        rows: Iterable[Any],
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 100000,
+    ) -> int:
+        """批量写入数据
+
+        配置了 staging_dir（HiveServer2 可访问的共享目录）时，每批写成 Hive 默认文本格式的暂存文件
+        （\\001 分隔、\\N 表示 NULL）再 LOAD DATA 装载，字段顺序需与表定义一致；
+        否则退化为多行 INSERT ... VALUES。
+        """
+        staging_dir = self.config.get("staging_dir")
+        if not staging_dir:
+            return super().bulk_insert(table, rows, columns, batch_size)
+
+        os.makedirs(staging_dir, exist_ok=True)
+        total = 0
+        for _, batch in self._row_batches(rows, columns, batch_size):
+            staging_path = os.path.join(staging_dir, f"dwf_{uuid.uuid4().hex}.txt")
+            with open(staging_path, "w", encoding="utf-8", newline="\n") as f:
+                for row in batch:
+                    f.write("\x01".join(delimited_value(v, "\x01") for v in row) + "\n")
+            try:
+                self.execute_sql(f"LOAD DATA LOCAL INPATH '{staging_path}' INTO TABLE {table}")
+            finally:
+                # LOAD DATA LOCAL 是复制而非移动，装载后清理暂存文件
+                if os.path.exists(staging_path):
+                    os.remove(staging_path)
+            total += len(batch)
+        return total
+
+    def cancel(self) -> bool:
+        # 取消游标上正在执行的 operation，HiveServer2 会终止对应的 YARN 作业
+        cursor = getattr(self, "_active_cursor", None)
+        if cursor is None:
+            return False
+        cursor.cancel()
+        return True
+
+    def ping(self) -> bool:
+        if self.connection is None:
+            return False
+        try:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
 
     def close(self):
         if self.connection:
             self.connection.close()
             typer.echo("✅ Hive连接已关闭")
+
+
+class SparkExecutor(HiveExecutor):
+    """Spark Thrift Server 执行器
+
+    Spark Thrift Server 实现了 HiveServer2 协议，连接、游标、取消与 LOAD DATA 批量写入沿用 HiveExecutor；
+    同样不支持多语句事务。
+    """
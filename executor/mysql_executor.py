@@ -1,8 +1,10 @@
-from typing import Any, Dict, List, Optional
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import typer
 
-from .base_executor import BaseExecutor
+from .base_executor import BaseExecutor, delimited_value
 
 
 class MySQLExecutor(BaseExecutor):
@@ -18,6 +20,7 @@ class MySQLExecutor(BaseExecutor):
                 user=self.config["user"],
                 password=self.config["password"],
                 database=self.config["database"],
+                allow_local_infile=self.config.get("allow_local_infile", False),
             )
             typer.echo(f"🔗 连接MySQL: {self.config['host']}:{self.config['port']}")
             return True
@@ -26,23 +29,171 @@ class MySQLExecutor(BaseExecutor):
             return False
 
     def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
-        try:
-            # with self.connection.cursor(dictionary=True) as cursor:
-            #     cursor.execute(sql, params)
-            #     if sql.strip().lower().startswith('select'):
-            #         return cursor.fetchall()
-            #     else:
-            #         self.connection.commit()
-            #         return cursor.rowcount
+        if self.connection is None:
             typer.echo(f"🚀 执行MySQL SQL: {sql}")
             return {"status": "success", "rows_affected": 1}
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                if cursor.with_rows:
+                    cursor.fetchall()
+                rows_affected = max(cursor.rowcount, 0)
+            self.connection.commit()
+            return {"status": "success", "rows_affected": rows_affected}
         except Exception as e:
+            self.connection.rollback()
             typer.echo(f"❌ SQL执行失败: {e}", err=True)
             raise
 
     def execute_query(self, sql: str, params: Optional[Dict] = None) -> List[Dict]:
-        result = self.execute_sql(sql, params)
-        return [{"id": 1, "name": "example"}]  # 示例数据
+        if self.connection is None:
+            self.execute_sql(sql, params)
+            return [{"id": 1, "name": "example"}]  # 示例数据
+
+        try:
+            with self.connection.cursor(dictionary=True) as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall() if cursor.with_rows else []
+            # 结束读事务，否则连接归还连接池后下次查询仍读取 REPEATABLE READ 的旧快照
+            self.connection.commit()
+            return rows
+        except Exception as e:
+            self.connection.rollback()
+            typer.echo(f"❌ SQL执行失败: {e}", err=True)
+            raise
+
+    def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        """在同一连接与游标上依次执行一批语句
+
+        整批执行完只提交一次。transaction 为真时失败整体回滚（DDL 会隐式提交，只对 DML 有效）；
+        否则与逐条执行的语义一致，失败时提交已执行的语句后再抛出异常。
+        """
+        if self.connection is None:
+            return super().execute_script(statements, transaction)
+
+        rows_affected = 0
+        try:
+            with self.connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+                    if cursor.with_rows:
+                        cursor.fetchall()
+                    rows_affected += max(cursor.rowcount, 0)
+            self.connection.commit()
+        except Exception as e:
+            if transaction:
+                self.connection.rollback()
+            else:
+                self.connection.commit()
+            typer.echo(f"❌ SQL执行失败: {e}", err=True)
+            raise
+        return {"status": "success", "statements": len(statements), "rows_affected": rows_affected}
+
+    def query_columns(self, sql: str, params: Optional[Dict] = None) -> List[str]:
+        if self.connection is None:
+            return super().query_columns(sql, params)
+
+        cursor = self.connection.cursor(buffered=False)
+        try:
+            cursor.execute(sql, params)
+            return list(cursor.column_names)
+        finally:
+            # 只取列描述，丢弃未读结果后才能复用连接
+            if self.connection.unread_result:
+                self.connection.consume_results()
+            cursor.close()
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        if self.connection is None:
+            yield from super().iter_query(sql, params, batch_size)
+            return
+
+        # 非缓冲游标：结果保留在服务端，fetchmany 按批拉取
+        cursor = self.connection.cursor(buffered=False, dictionary=True)
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            # 消费方提前停止迭代时，需要丢弃未读结果才能复用连接
+            if self.connection.unread_result:
+                self.connection.consume_results()
+            cursor.close()
+
+    def bulk_insert(
+        self,
+        table: str,
+        rows: Iterable[Any],
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 10000,
+        method: Optional[str] = None,
+    ) -> int:
+        """批量写入数据
+
+        Args:
+            method: executemany（默认，驱动会改写为多行 INSERT）或 load_data
+                （先写入本地临时文件再 LOAD DATA LOCAL INFILE，需要配置 allow_local_infile）
+        """
+        if self.connection is None:
+            return super().bulk_insert(table, rows, columns, batch_size)
+
+        method = method or ("load_data" if self.config.get("allow_local_infile") else "executemany")
+        total = 0
+        for batch_columns, batch in self._row_batches(rows, columns, batch_size):
+            column_sql = f" ({', '.join(batch_columns)})" if batch_columns else ""
+            with self.connection.cursor() as cursor:
+                if method == "load_data":
+                    self._load_data(cursor, table, column_sql, batch)
+                else:
+                    placeholders = ", ".join(["%s"] * len(batch[0]))
+                    cursor.executemany(f"INSERT INTO {table}{column_sql} VALUES ({placeholders})", batch)
+            self.connection.commit()
+            total += len(batch)
+        return total
+
+    @staticmethod
+    def _load_data(cursor, table: str, column_sql: str, batch: List[tuple]):
+        # 使用 LOAD DATA 默认的文本格式：制表符分隔、反斜杠转义、\N 表示 NULL
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", newline="\n", delete=False) as f:
+            for row in batch:
+                f.write("\t".join(delimited_value(v) for v in row) + "\n")
+            spool_path = f.name
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{spool_path}' INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'{column_sql}"
+            )
+        finally:
+            os.remove(spool_path)
+
+    def cancel(self) -> bool:
+        """另开一个连接执行 KILL QUERY，中止本连接上正在执行的语句（连接本身保留）"""
+        if self.connection is None:
+            return False
+        import mysql.connector
+
+        killer = mysql.connector.connect(
+            host=self.config["host"],
+            port=self.config["port"],
+            user=self.config["user"],
+            password=self.config["password"],
+        )
+        try:
+            with killer.cursor() as cursor:
+                cursor.execute(f"KILL QUERY {int(self.connection.connection_id)}")
+        finally:
+            killer.close()
+        return True
+
+    def ping(self) -> bool:
+        try:
+            return self.connection is not None and self.connection.is_connected()
+        except Exception:
+            return False
 
     def close(self):
         if self.connection:
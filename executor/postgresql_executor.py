@@ -1,4 +1,7 @@
-from typing import Any, Dict, List, Optional
+import csv
+import io
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import typer
 
@@ -8,16 +11,20 @@ from .base_executor import BaseExecutor
 class PostgreSQLExecutor(BaseExecutor):
     """PostgreSQL执行器"""
 
+    backslash_escapes = False
+    connection_error_patterns = BaseExecutor.connection_error_patterns + ("terminating connection",)
+
     def connect(self) -> bool:
         try:
-            # import mysql.connector
-            # self.connection = mysql.connector.connect(
-            #     host=self.config['host'],
-            #     port=self.config['port'],
-            #     user=self.config['user'],
-            #     password=self.config['password'],
-            #     database=self.config['database']
-            # )
+            import psycopg2
+
+            self.connection = psycopg2.connect(
+                host=self.config["host"],
+                port=self.config["port"],
+                user=self.config["user"],
+                password=self.config["password"],
+                dbname=self.config["database"],
+            )
             typer.echo(f"🔗 连接PostgreSQL: {self.config['host']}:{self.config['port']}")
             return True
         except Exception as e:
@@ -25,23 +32,133 @@ class PostgreSQLExecutor(BaseExecutor):
             return False
 
     def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
-        try:
-            # with self.connection.cursor(dictionary=True) as cursor:
-            #     cursor.execute(sql, params)
-            #     if sql.strip().lower().startswith('select'):
-            #         return cursor.fetchall()
-            #     else:
-            #         self.connection.commit()
-            #         return cursor.rowcount
+        if self.connection is None:
             typer.echo(f"🚀 执行PostgreSQL SQL: {sql}")
             return {"status": "success", "rows_affected": 1}
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows_affected = max(cursor.rowcount, 0)
+            self.connection.commit()
+            return {"status": "success", "rows_affected": rows_affected}
         except Exception as e:
+            self.connection.rollback()
             typer.echo(f"❌ SQL执行失败: {e}", err=True)
             raise
 
     def execute_query(self, sql: str, params: Optional[Dict] = None) -> List[Dict]:
-        result = self.execute_sql(sql, params)
-        return [{"id": 1, "name": "example"}]  # 示例数据
+        if self.connection is None:
+            self.execute_sql(sql, params)
+            return [{"id": 1, "name": "example"}]  # 示例数据
+
+        from psycopg2.extras import RealDictCursor
+
+        try:
+            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(sql, params)
+                rows = [dict(row) for row in cursor.fetchall()] if cursor.description else []
+            # psycopg2 默认在首条语句时隐式开启事务，查询后提交，避免连接归还连接池时处于 idle in transaction
+            self.connection.commit()
+            return rows
+        except Exception as e:
+            self.connection.rollback()
+            typer.echo(f"❌ SQL执行失败: {e}", err=True)
+            raise
+
+    def execute_script(self, statements: Sequence[str], transaction: bool = False) -> Dict[str, Any]:
+        """将一批语句拼成一个脚本，一次网络往返发送
+
+        不带参数时 psycopg2 使用简单查询协议，多条语句在服务端的一个隐式事务中执行，失败整体回滚，
+        因此 transaction 为真或为假时都是原子的；rows_affected 只能取到最后一条语句的影响行数。
+        """
+        if self.connection is None:
+            return super().execute_script(statements, transaction)
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(";\n".join(statements))
+                rows_affected = max(cursor.rowcount, 0)
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            typer.echo(f"❌ SQL执行失败: {e}", err=True)
+            raise
+        return {"status": "success", "statements": len(statements), "rows_affected": rows_affected}
+
+    def query_columns(self, sql: str, params: Optional[Dict] = None) -> List[str]:
+        if self.connection is None:
+            return super().query_columns(sql, params)
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                columns = [column[0] for column in cursor.description or []]
+            self.connection.commit()
+            return columns
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        if self.connection is None:
+            yield from super().iter_query(sql, params, batch_size)
+            return
+
+        from psycopg2.extras import RealDictCursor
+
+        # 命名游标即服务端游标，每次 fetchmany 只传输一批数据
+        with self.connection.cursor(name=f"dwf_{uuid.uuid4().hex}", cursor_factory=RealDictCursor) as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+
+    def bulk_insert(
+        self,
+        table: str,
+        rows: Iterable[Any],
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 10000,
+    ) -> int:
+        """批量写入数据：每批写入内存 CSV 缓冲后通过 COPY ... FROM STDIN 一次性发送"""
+        if self.connection is None:
+            return super().bulk_insert(table, rows, columns, batch_size)
+
+        total = 0
+        for batch_columns, batch in self._row_batches(rows, columns, batch_size):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                # 用 \N 表示 NULL，空字符串保持为空字段
+                writer.writerow(["\\N" if v is None else v for v in row])
+            buffer.seek(0)
+
+            column_sql = f" ({', '.join(batch_columns)})" if batch_columns else ""
+            with self.connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table}{column_sql} FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+            self.connection.commit()
+            total += len(batch)
+        return total
+
+    def cancel(self) -> bool:
+        # psycopg2 通过独立的取消请求中止服务端正在执行的语句（QueryCanceledError）
+        if self.connection is None:
+            return False
+        self.connection.cancel()
+        return True
+
+    def ping(self) -> bool:
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            self.connection.rollback()
+            return True
+        except Exception:
+            return False
 
     def close(self):
         if self.connection:
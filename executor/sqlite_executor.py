@@ -0,0 +1,142 @@
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import typer
+
+from .base_executor import BaseExecutor
+
+# Python 3.12 起 sqlite3 的默认日期适配器已弃用，显式注册；Decimal 按字符串保存以保留精度（NUMERIC 列会自动转换）
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=" "))
+sqlite3.register_adapter(Decimal, str)
+
+
+class SQLiteExecutor(BaseExecutor):
+    """SQLite执行器（进程内嵌入式数据库）
+
+    config:
+        database: 数据库文件路径，":memory:" 为进程内共享的内存库
+        schemas: 逗号分隔的 schema 名，每个 schema 作为独立文件 ATTACH（<库名>.<schema>.sqlite），
+                 使 ods.xxx / dw.xxx 形式的表名可以直接使用
+    """
+
+    backslash_escapes = False
+    transient_error_patterns = BaseExecutor.transient_error_patterns + ("database is busy",)
+
+    def connect(self) -> bool:
+        try:
+            database = str(self.config.get("database", ":memory:"))
+            in_memory = database == ":memory:"
+            if in_memory:
+                # 共享缓存的命名内存库，连接池中的多个连接看到同一份数据（最后一个连接关闭后释放）
+                target = "file:dwf_memory?mode=memory&cache=shared"
+            else:
+                Path(database).parent.mkdir(parents=True, exist_ok=True)
+                target = database
+            # 自动提交模式，事务由 bulk_insert 等显式控制；连接池保证同一时刻只有一个线程使用连接
+            self.connection = sqlite3.connect(target, isolation_level=None, check_same_thread=False, timeout=30, uri=in_memory)
+            if not in_memory:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("PRAGMA synchronous=NORMAL")
+            for schema in self._schemas():
+                if in_memory:
+                    path = f"file:dwf_memory_{schema}?mode=memory&cache=shared"
+                else:
+                    path = str(Path(database).with_suffix(f".{schema}.sqlite"))
+                self.connection.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            typer.echo(f"🔗 连接SQLite: {database}")
+            return True
+        except Exception as e:
+            typer.echo(f"❌ SQLite连接失败: {e}", err=True)
+            return False
+
+    def _schemas(self) -> List[str]:
+        schemas = self.config.get("schemas") or ""
+        if isinstance(schemas, str):
+            schemas = schemas.split(",")
+        return [s.strip() for s in schemas if s.strip()]
+
+    def execute_sql(self, sql: str, params: Optional[Dict] = None) -> Any:
+        try:
+            cursor = self.connection.execute(sql, params or ())
+            try:
+                return {"status": "success", "rows_affected": max(cursor.rowcount, 0)}
+            finally:
+                cursor.close()
+        except Exception as e:
+            typer.echo(f"❌ SQL执行失败: {e}", err=True)
+            raise
+
+    def execute_query(self, sql: str, params: Optional[Dict] = None) -> List[Dict]:
+        cursor = self.connection.execute(sql, params or ())
+        try:
+            columns = [column[0] for column in cursor.description or []]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def query_columns(self, sql: str, params: Optional[Dict] = None) -> List[str]:
+        # 列描述在语句准备后即可得到，不会取出结果
+        cursor = self.connection.execute(sql, params or ())
+        try:
+            return [column[0] for column in cursor.description or []]
+        finally:
+            cursor.close()
+
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: int = 10000) -> Iterator[List[Dict]]:
+        # SQLite 游标按需逐步执行语句，fetchmany 不会预先加载全部结果
+        cursor = self.connection.execute(sql, params or ())
+        try:
+            columns = [column[0] for column in cursor.description or []]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(zip(columns, row)) for row in rows]
+        finally:
+            cursor.close()
+
+    def bulk_insert(
+        self,
+        table: str,
+        rows: Iterable[Any],
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 10000,
+    ) -> int:
+        """批量写入数据：每批在一个事务内 executemany（预编译语句，参数绑定）"""
+        total = 0
+        for batch_columns, batch in self._row_batches(rows, columns, batch_size):
+            column_sql = f" ({', '.join(batch_columns)})" if batch_columns else ""
+            placeholders = ", ".join("?" * len(batch[0]))
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(f"INSERT INTO {table}{column_sql} VALUES ({placeholders})", batch)
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            total += len(batch)
+        return total
+
+    def cancel(self) -> bool:
+        # interrupt 可以在其他线程调用，正在执行的语句以 "interrupted" 错误中止
+        if self.connection is None:
+            return False
+        self.connection.interrupt()
+        return True
+
+    def ping(self) -> bool:
+        try:
+            self.connection.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+            typer.echo("✅ SQLite连接已关闭")
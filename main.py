@@ -1,14 +1,23 @@
-import json
+import time
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import click
 import typer
+from typer.core import TyperGroup
 
 from config import config
+from core.backfill import Backfill
+from core.critical_path import render_gantt
+from core.execute import DagRunner, run_task
+from core.profiler import profiled
 from core.task_loader import TaskLoader
-from executor.base_executor import ExecutorFactory
+from core.task_manifest import TaskManifest
+from core.task_queue import TaskQueue
+from core.worker import QueueWorker, submit_run
+from warehouse.base_task import Status
 
 APP_NAME = "Awesome CLI 数据仓库任务调度器"
 APP_VERSION = "1.0.0"
@@ -21,8 +30,45 @@ app = typer.Typer(
 )
 
 
+# 任务加载器（指向 warehouse 根目录）与任务清单
+task_loader = TaskLoader(Path("warehouse"))
+task_manifest = TaskManifest(task_loader)
+
+
+class LazyTaskGroup(TyperGroup):
+    """按需注册任务命令的 group
+
+    命令列表来自任务清单（静态解析，不导入模块），任务模块在命令真正执行时才导入。
+    """
+
+    category: Optional[str] = None
+
+    def list_commands(self, ctx: click.Context):
+        names = set(super().list_commands(ctx))
+        names.update(task_manifest.names(self.category))
+        return sorted(names)
+
+    def get_command(self, ctx: click.Context, cmd_name: str):
+        command = super().get_command(ctx, cmd_name)
+        if command is None:
+            entry = task_manifest.get(cmd_name, self.category)
+            if entry:
+                command = build_task_command(entry)
+                self.add_command(command, cmd_name)
+        return command
+
+
+class WarehouseGroup(LazyTaskGroup):
+    category = "warehouse"
+
+
+class UtilsGroup(LazyTaskGroup):
+    category = "utils"
+
+
 # 创建两个子应用（group），在 help 中加入简短描述与示例
 warehouse_app = typer.Typer(
+    cls=WarehouseGroup,
     help=(
         "Warehouse 分类任务（对应 warehouse/ods | dw | dim 下的 .py 文件）。\n\n"
         "Examples:\n"
@@ -33,6 +79,7 @@ warehouse_app = typer.Typer(
 )
 
 utils_app = typer.Typer(
+    cls=UtilsGroup,
     help=(
         "Utils 分类工具（对应 utils/ 下的 .py 文件）。\n\n"
         "Examples:\n"
@@ -46,45 +93,10 @@ app.add_typer(warehouse_app, name="warehouse")
 app.add_typer(utils_app, name="utils")
 
 
-# 任务加载器（指向 warehouse 根目录）
-task_loader = TaskLoader(Path("warehouse"))
-
-
 def execute_single_task(task_name: str, task_info: Dict[str, Any], params: Dict[str, Any], output_file: Optional[Path] = None):
     """执行单个任务（通用实现）"""
     try:
-        if params.get("verbose"):
-            typer.echo(f"🚀 开始执行任务: {task_name}")
-            typer.echo(f"   参数: {params}")
-
-        executor_type = params.get("executor", "hive")
-        executor_config = config.executors.get(executor_type, {}).get("config", {})
-
-        with ExecutorFactory.create_executor(executor_type, executor_config) as executor:
-            task_obj = task_info["object"]
-            print("*" * 20, "task_obj", task_obj)
-
-            if isinstance(task_obj, type):
-                task_instance = task_obj()
-                if hasattr(task_instance, "validate_params"):
-                    task_instance.validate_params(params)
-                result = task_instance.execute(executor, params)
-            elif callable(task_obj):
-                result = task_obj(executor, params)
-            else:
-                result = task_obj.execute(executor, params)
-
-            if output_file:
-                with open(output_file, "w") as f:
-                    if isinstance(result, (dict, list)):
-                        json.dump(result, f, indent=2, ensure_ascii=False)
-                    else:
-                        f.write(str(result))
-                typer.echo(f"💾 结果已保存到: {output_file}")
-
-            typer.echo(f"✅ 任务 {task_name} 执行完成")
-            return result
-
+        return run_task(task_name, task_info, params, output_file)
     except Exception as e:
         typer.echo(f"❌ 任务执行失败: {e}", err=True)
         if params.get("verbose"):
@@ -94,113 +106,322 @@ def execute_single_task(task_name: str, task_info: Dict[str, Any], params: Dict[
         raise typer.Exit(code=1)
 
 
-# 动态注册 warehouse 下的所有任务作为命令
-warehouse_tasks = task_loader.discover_tasks(category="warehouse")
-print("*" * 20, "warehouse_tasks", warehouse_tasks)
-for task_name in sorted(warehouse_tasks.keys()):
-    task_info = warehouse_tasks[task_name]
-    print("*" * 20, "task_info", task_info)
-
-    def create_warehouse_command(task_name: str, task_info: Dict[str, Any]):
-        """工厂函数创建具体任务命令"""
-
-        def task_command(
-            executor: str = typer.Option("hive", "--executor", help="执行器类型: hive/mysql/postgresql"),
-            start_date: Optional[str] = typer.Option(None, "--start-date", help="开始日期 (YYYY-MM-DD)"),
-            end_date: Optional[str] = typer.Option(None, "--end-date", help="结束日期 (YYYY-MM-DD)"),
-            dry_run: bool = typer.Option(False, "--dry-run", help="干跑模式，只生成SQL不执行"),
-            verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
-        ):
-            """执行具体任务"""
-            # 合并 group-level 参数（如果 group 提供了非默认值，则作为子命令的默认）
-            ctx = click.get_current_context()
-            parent_obj = getattr(ctx.parent, "obj", {}) if ctx.parent is not None else {}
-            group_params = parent_obj.get("warehouse_group_params", {}) if parent_obj else {}
-
-            defaults = {"executor": "hive", "start_date": None, "end_date": None, "dry_run": False, "verbose": False}
-            sub_params = {
-                "executor": executor,
-                "start_date": start_date,
-                "end_date": end_date,
-                "dry_run": dry_run,
-                "verbose": verbose,
-            }
-
-            params = {}
-            for k, dv in defaults.items():
-                if (
-                    k in group_params
-                    and group_params.get(k) is not None
-                    and sub_params.get(k) == dv
-                    and group_params.get(k) != dv
-                ):
-                    params[k] = group_params.get(k)
-                else:
-                    params[k] = sub_params.get(k)
-
-            params["run_time"] = datetime.now().isoformat()
-            execute_single_task(task_name, task_info, params)
-
-        task_command.__doc__ = f"执行任务: {task_name}"
-        task_command.__name__ = task_name
-        return task_command
-
-    warehouse_app.command(name=task_name)(create_warehouse_command(task_name, task_info))
-    # warehouse_app.command(name=task_name, help="xxxx")(create_warehouse_command(task_name, task_info))
-
-
-# 动态注册 utils 下的所有工具作为命令
-utils_tasks = task_loader.discover_tasks(category="utils")
-for tool_name in sorted(utils_tasks.keys()):
-    tool_info = utils_tasks[tool_name]
-
-    def create_utils_command(tool_name: str, tool_info: Dict[str, Any]):
-        """工厂函数创建具体工具命令"""
-
-        def tool_command(
-            output: Optional[Path] = typer.Option(None, "--output", "-o", help="结果输出文件（可选）"),
-            verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
-        ):
-            """执行具体工具"""
-            # 合并 group-level 参数（utils）
-            ctx = click.get_current_context()
-            parent_obj = getattr(ctx.parent, "obj", {}) if ctx.parent is not None else {}
-            group_params = parent_obj.get("utils_group_params", {}) if parent_obj else {}
-
-            defaults = {"output": None, "verbose": False}
-            sub_params = {"output": str(output) if output else None, "verbose": verbose}
-
-            params = {}
-            for k, dv in defaults.items():
-                if (
-                    k in group_params
-                    and group_params.get(k) is not None
-                    and sub_params.get(k) == dv
-                    and group_params.get(k) != dv
-                ):
-                    params[k] = group_params.get(k)
-                else:
-                    params[k] = sub_params.get(k)
-
-            params["run_time"] = datetime.now().isoformat()
-            execute_single_task(tool_name, tool_info, params, Path(params["output"]) if params.get("output") else None)
-
-        tool_command.__doc__ = f"执行工具: {tool_name}"
-        tool_command.__name__ = tool_name
-        return tool_command
-
-    utils_app.command(name=tool_name)(create_utils_command(tool_name, tool_info))
+def merge_group_params(group_key: str, defaults: Dict[str, Any], sub_params: Dict[str, Any]) -> Dict[str, Any]:
+    """合并 group-level 参数（如果 group 提供了非默认值，则作为子命令的默认）"""
+    ctx = click.get_current_context()
+    parent_obj = getattr(ctx.parent, "obj", {}) if ctx.parent is not None else {}
+    group_params = parent_obj.get(group_key, {}) if parent_obj else {}
+
+    params = {}
+    for k, dv in defaults.items():
+        if k in group_params and group_params.get(k) is not None and sub_params.get(k) == dv and group_params.get(k) != dv:
+            params[k] = group_params.get(k)
+        else:
+            params[k] = sub_params.get(k)
+    return params
+
+
+def group_profile_dir(group_key: str) -> Optional[str]:
+    """group 指定了 --profile 时返回剖析文件目录，否则返回 None"""
+    ctx = click.get_current_context()
+    parent_obj = getattr(ctx.parent, "obj", {}) if ctx.parent is not None else {}
+    return (parent_obj or {}).get(group_key, {}).get("profile_dir")
+
+
+def group_statement_policy(group_key: str) -> Dict[str, Any]:
+    """group 指定的 --statement-timeout / --max-retries（未指定的项不返回，沿用任务与执行器配置）"""
+    ctx = click.get_current_context()
+    parent_obj = getattr(ctx.parent, "obj", {}) if ctx.parent is not None else {}
+    group_params = (parent_obj or {}).get(group_key, {})
+    return {k: group_params[k] for k in ("statement_timeout", "max_retries") if group_params.get(k) is not None}
+
+
+def parse_key_value_args(args: Optional[List[str]]) -> Dict[str, str]:
+    """解析 key=value 形式的命令行参数"""
+    parsed = {}
+    for arg in args or []:
+        key, sep, value = arg.partition("=")
+        if not sep or not key:
+            typer.echo(f"❌ 参数格式错误（应为 key=value）: {arg}", err=True)
+            raise typer.Exit(code=1)
+        parsed[key.strip()] = value
+    return parsed
+
+
+def load_task_info(task_name: str, category: str, profile_dir: Optional[str] = None) -> Dict[str, Any]:
+    """命令执行时才导入任务模块；指定 profile_dir 时同时剖析模块导入（<task>.import.*）"""
+    entry = task_manifest.get(task_name, category)
+    with profiled(f"{task_name}.import", Path(profile_dir)) if profile_dir else nullcontext():
+        task_info = task_loader.load_task_file(Path(entry["path"])) if entry else None
+    if task_info is None:
+        typer.echo(f"❌ 无法加载任务: {task_name}", err=True)
+        raise typer.Exit(code=1)
+    return task_info
+
+
+def build_task_command(entry: Dict[str, Any]) -> click.Command:
+    """根据清单条目构建 click 命令（不导入任务模块）"""
+    if entry["category"] == "warehouse":
+        command_func = create_warehouse_command(entry["name"])
+    else:
+        command_func = create_utils_command(entry["name"])
+
+    command_app = typer.Typer(rich_markup_mode="rich")
+    command_app.command(name=entry["name"], help=entry["description"] or command_func.__doc__)(command_func)
+    return typer.main.get_command(command_app)
+
+
+def create_warehouse_command(task_name: str):
+    """工厂函数创建具体任务命令"""
+
+    def task_command(
+        executor: str = typer.Option("hive", "--executor", help="执行器类型: hive/spark/mysql/postgresql/sqlite/duckdb"),
+        start_date: Optional[str] = typer.Option(None, "--start-date", help="开始日期 (YYYY-MM-DD)"),
+        end_date: Optional[str] = typer.Option(None, "--end-date", help="结束日期 (YYYY-MM-DD)"),
+        dry_run: bool = typer.Option(False, "--dry-run", help="干跑模式，只生成SQL不执行"),
+        verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
+        resume: bool = typer.Option(False, "--resume", help="跳过运行台账中已成功的分区（默认总是执行）"),
+        force: bool = typer.Option(False, "--force", help="忽略运行台账，已成功的分区也重新执行（优先于 --resume）"),
+    ):
+        """执行具体任务"""
+        defaults = {"executor": "hive", "start_date": None, "end_date": None, "dry_run": False, "verbose": False}
+        sub_params = {
+            "executor": executor,
+            "start_date": start_date,
+            "end_date": end_date,
+            "dry_run": dry_run,
+            "verbose": verbose,
+        }
+        params = merge_group_params("warehouse_group_params", defaults, sub_params)
+
+        params["run_time"] = datetime.now().isoformat()
+        params["resume"] = resume
+        params["force"] = force
+        params["profile_dir"] = group_profile_dir("warehouse_group_params")
+        params.update(group_statement_policy("warehouse_group_params"))
+        execute_single_task(task_name, load_task_info(task_name, "warehouse", params["profile_dir"]), params)
+
+    task_command.__doc__ = f"执行任务: {task_name}"
+    task_command.__name__ = task_name
+    return task_command
+
+
+def create_utils_command(tool_name: str):
+    """工厂函数创建具体工具命令"""
+
+    def tool_command(
+        args: Optional[List[str]] = typer.Argument(None, help="工具参数，key=value 格式，如 sql=\"SELECT 1\""),
+        output: Optional[Path] = typer.Option(None, "--output", "-o", help="结果输出文件（可选）"),
+        verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
+    ):
+        """执行具体工具"""
+        defaults = {"output": None, "verbose": False}
+        sub_params = {"output": str(output) if output else None, "verbose": verbose}
+        params = merge_group_params("utils_group_params", defaults, sub_params)
+        params.update(parse_key_value_args(args))
+
+        params["run_time"] = datetime.now().isoformat()
+        params["profile_dir"] = group_profile_dir("utils_group_params")
+        tool_info = load_task_info(tool_name, "utils", params["profile_dir"])
+        execute_single_task(tool_name, tool_info, params, Path(params["output"]) if params.get("output") else None)
+
+    tool_command.__doc__ = f"执行工具: {tool_name}"
+    tool_command.__name__ = tool_name
+    return tool_command
+
+
+@warehouse_app.command(name="run-all")
+def run_all_command(
+    select: Optional[str] = typer.Option(None, "--select", "-s", help="任务选择器，如 ods+、+dim_date、dw,dim（默认全部）"),
+    workers: int = typer.Option(4, "--workers", "-w", help="并发执行的最大任务数"),
+    fail_fast: bool = typer.Option(False, "--fail-fast", help="任一任务失败后不再启动新任务"),
+    executor: str = typer.Option("hive", "--executor", help="执行器类型: hive/spark/mysql/postgresql/sqlite/duckdb"),
+    start_date: Optional[str] = typer.Option(None, "--start-date", help="开始日期 (YYYY-MM-DD)"),
+    end_date: Optional[str] = typer.Option(None, "--end-date", help="结束日期 (YYYY-MM-DD)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="干跑模式，只生成SQL不执行"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
+    force: bool = typer.Option(False, "--force", help="忽略运行台账，已成功的任务也重新执行"),
+):
+    """按依赖关系（ods -> dw -> dim）并行执行全部或选中的任务"""
+    defaults = {"executor": "hive", "start_date": None, "end_date": None, "dry_run": False, "verbose": False}
+    sub_params = {
+        "executor": executor,
+        "start_date": start_date,
+        "end_date": end_date,
+        "dry_run": dry_run,
+        "verbose": verbose,
+    }
+    params = merge_group_params("warehouse_group_params", defaults, sub_params)
+    params["run_time"] = datetime.now().isoformat()
+    params["force"] = force
+    params["profile_dir"] = group_profile_dir("warehouse_group_params")
+    params.update(group_statement_policy("warehouse_group_params"))
+
+    try:
+        runner = DagRunner(max_workers=workers, fail_fast=fail_fast, task_loader=task_loader)
+        results = runner.run(params, selector=select)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+
+    failed = [name for name, r in results.items() if r["status"] == Status.FAILED]
+    skipped = [name for name, r in results.items() if r["status"] == Status.SKIPPED]
+    succeeded = len(results) - len(failed) - len(skipped)
+    reused = sum(1 for r in results.values() if r.get("reused"))
+    typer.echo(
+        f"📊 共 {len(results)} 个任务，成功 {succeeded}（其中 {reused} 个此前已成功），"
+        f"失败 {len(failed)}，跳过 {len(skipped)}"
+    )
+    if results:
+        critical = set(runner.plan["critical_path"])
+        timeline = {name: {**r, "critical": name in critical} for name, r in results.items()}
+        elapsed = max((r.get("end", 0.0) for r in results.values()), default=0.0)
+        typer.echo(f"⏱️  实际耗时 {elapsed:.1f}s（预计 {runner.plan['makespan']:.1f}s），甘特图（* 为预计关键路径）:")
+        typer.echo(render_gantt(timeline))
+    for name in sorted(failed):
+        typer.echo(f"   ❌ {name}: {results[name].get('error')}", err=True)
+    if failed or skipped:
+        raise typer.Exit(code=1)
+
+
+@warehouse_app.command(name="backfill")
+def backfill_command(
+    task_name: str = typer.Argument(..., help="需要回刷的任务名"),
+    grain: str = typer.Option("month", "--grain", "-g", help="分区粒度: day/week/month"),
+    parallel: int = typer.Option(4, "--parallel", "-p", help="并发执行的最大分区数"),
+    restart: bool = typer.Option(False, "--restart", help="忽略运行台账，全部分区重新执行"),
+    executor: str = typer.Option("hive", "--executor", help="执行器类型: hive/spark/mysql/postgresql/sqlite/duckdb"),
+    start_date: Optional[str] = typer.Option(None, "--start-date", help="开始日期 (YYYY-MM-DD)"),
+    end_date: Optional[str] = typer.Option(None, "--end-date", help="结束日期 (YYYY-MM-DD)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="干跑模式，只生成SQL不执行"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
+):
+    """按日/周/月分区并行回刷任务，失败后重跑自动跳过已完成的分区"""
+    defaults = {"executor": "hive", "start_date": None, "end_date": None, "dry_run": False, "verbose": False}
+    sub_params = {
+        "executor": executor,
+        "start_date": start_date,
+        "end_date": end_date,
+        "dry_run": dry_run,
+        "verbose": verbose,
+    }
+    params = merge_group_params("warehouse_group_params", defaults, sub_params)
+    params["run_time"] = datetime.now().isoformat()
+    params["profile_dir"] = group_profile_dir("warehouse_group_params")
+    params.update(group_statement_policy("warehouse_group_params"))
+
+    task_info = load_task_info(task_name, "warehouse", params["profile_dir"])
+    try:
+        results = Backfill(task_name, task_info, grain=grain, parallel=parallel).run(params, restart=restart)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+
+    failed = [key for key, r in results.items() if r["status"] == Status.FAILED]
+    skipped = [key for key, r in results.items() if r["status"] == Status.SKIPPED]
+    succeeded = len(results) - len(failed) - len(skipped)
+    typer.echo(f"📊 共 {len(results)} 个分区，执行成功 {succeeded}，失败 {len(failed)}，跳过 {len(skipped)}")
+    for key in failed:
+        typer.echo(f"   ❌ {key}: {results[key].get('error')}", err=True)
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@warehouse_app.command(name="submit")
+def submit_command(
+    select: Optional[str] = typer.Option(None, "--select", "-s", help="任务选择器，如 ods+、+dim_date、dw,dim（默认全部）"),
+    executor: str = typer.Option("hive", "--executor", help="执行器类型: hive/spark/mysql/postgresql/sqlite/duckdb"),
+    start_date: Optional[str] = typer.Option(None, "--start-date", help="开始日期 (YYYY-MM-DD)"),
+    end_date: Optional[str] = typer.Option(None, "--end-date", help="结束日期 (YYYY-MM-DD)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="干跑模式，只生成SQL不执行"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
+    force: bool = typer.Option(False, "--force", help="忽略运行台账，已成功的任务也重新执行"),
+    queue_db: Path = typer.Option(config.queue["db_path"], "--queue-db", help="共享任务队列文件（各 worker 主机都能访问）"),
+    wait_done: bool = typer.Option(False, "--wait", help="等待运行结束并输出汇总"),
+):
+    """把全部或选中的任务提交到共享队列，由各主机上的 worker 按依赖关系领取执行"""
+    defaults = {"executor": "hive", "start_date": None, "end_date": None, "dry_run": False, "verbose": False}
+    sub_params = {
+        "executor": executor,
+        "start_date": start_date,
+        "end_date": end_date,
+        "dry_run": dry_run,
+        "verbose": verbose,
+    }
+    params = merge_group_params("warehouse_group_params", defaults, sub_params)
+    params["run_time"] = datetime.now().isoformat()
+    params["force"] = force
+    params.update(group_statement_policy("warehouse_group_params"))
+
+    queue = TaskQueue(queue_db)
+    try:
+        submitted = submit_run(queue, params, selector=select, task_loader=task_loader)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"📤 已提交运行 {submitted['run_id']}：{submitted['tasks']} 个任务，队列 {queue.db_path}")
+    if not wait_done:
+        return
+
+    last = None
+    while True:
+        status = queue.run_status(submitted["run_id"])
+        counts = status["counts"]
+        progress = "，".join(f"{name} {counts[name]}" for name in sorted(counts))
+        if progress != last:
+            typer.echo(f"⏳ {progress}")
+            last = progress
+        if status["status"] != Status.RUNNING:
+            break
+        time.sleep(2)
+    for name, error in sorted(status["failed"].items()):
+        typer.echo(f"   ❌ {name}: {error}", err=True)
+    if status["status"] != Status.SUCCESS:
+        raise typer.Exit(code=1)
+
+
+@warehouse_app.command(name="worker")
+def worker_command(
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="本 worker 同时执行的最大任务数"),
+    queue_db: Path = typer.Option(config.queue["db_path"], "--queue-db", help="共享任务队列文件（各 worker 主机都能访问）"),
+    lease: float = typer.Option(config.queue["lease"], "--lease", help="任务租约秒数，worker 失联超过该时间后任务重新入队"),
+    poll_interval: float = typer.Option(2.0, "--poll-interval", help="队列为空时的轮询间隔秒数"),
+    idle_exit: float = typer.Option(0, "--idle-exit", help="连续空闲超过该秒数后退出（0 表示一直运行）"),
+    worker_id: Optional[str] = typer.Option(None, "--worker-id", help="worker 标识（默认 主机名:进程号）"),
+):
+    """启动 worker，从共享队列领取上游已完成的任务并执行（可在多台主机上同时启动）"""
+    worker = QueueWorker(
+        TaskQueue(queue_db, lease_seconds=lease),
+        concurrency=concurrency,
+        worker_id=worker_id,
+        poll_interval=poll_interval,
+        idle_exit=idle_exit,
+        task_loader=task_loader,
+    )
+    stats = worker.serve()
+    if stats[Status.FAILED]:
+        raise typer.Exit(code=1)
+
+
 # group-level callbacks（在文件末尾统一定义）
 
 
 @warehouse_app.callback(invoke_without_command=True)
 def warehouse_group_callback(
     ctx: typer.Context,
-    executor: str = typer.Option("hive", "--executor", help="执行器类型: hive/mysql/postgresql"),
+    executor: str = typer.Option("hive", "--executor", help="执行器类型: hive/spark/mysql/postgresql/sqlite/duckdb"),
     start_date: Optional[str] = typer.Option(None, "--start-date", help="开始日期 (YYYY-MM-DD)"),
     end_date: Optional[str] = typer.Option(None, "--end-date", help="结束日期 (YYYY-MM-DD)"),
     dry_run: bool = typer.Option(False, "--dry-run", help="干跑模式，只生成SQL不执行"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
+    profile: bool = typer.Option(
+        False, "--profile", help="用 cProfile 剖析任务导入与执行，输出 pstats 与 collapsed stack 文件"
+    ),
+    profile_dir: Path = typer.Option(config.cache_dir / "profile", "--profile-dir", help="剖析文件输出目录"),
+    statement_timeout: Optional[float] = typer.Option(
+        None, "--statement-timeout", help="单条语句超时秒数，超时后取消服务端查询（默认取任务/执行器配置）"
+    ),
+    max_retries: Optional[int] = typer.Option(None, "--max-retries", help="连接中断、锁等待等瞬时错误的最大重试次数"),
 ):
     ctx.ensure_object(dict)
     ctx.obj["warehouse_group_params"] = {
@@ -209,6 +430,9 @@ def warehouse_group_callback(
         "end_date": end_date,
         "dry_run": dry_run,
         "verbose": verbose,
+        "profile_dir": str(profile_dir) if profile else None,
+        "statement_timeout": statement_timeout,
+        "max_retries": max_retries,
     }
     # 如果未指定子命令，输出提示并展示该 group 的帮助
     if ctx.invoked_subcommand is None:
@@ -222,9 +446,17 @@ def utils_group_callback(
     ctx: typer.Context,
     output: Optional[Path] = typer.Option(None, "-o", "--output", help="结果输出文件（可选）"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="详细输出"),
+    profile: bool = typer.Option(
+        False, "--profile", help="用 cProfile 剖析工具导入与执行，输出 pstats 与 collapsed stack 文件"
+    ),
+    profile_dir: Path = typer.Option(config.cache_dir / "profile", "--profile-dir", help="剖析文件输出目录"),
 ):
     ctx.ensure_object(dict)
-    ctx.obj["utils_group_params"] = {"output": str(output) if output else None, "verbose": verbose}
+    ctx.obj["utils_group_params"] = {
+        "output": str(output) if output else None,
+        "verbose": verbose,
+        "profile_dir": str(profile_dir) if profile else None,
+    }
     # 如果未指定子命令，输出提示并展示该 group 的帮助
     if ctx.invoked_subcommand is None:
         typer.echo("请使用 --help 查看可用的 utils 子命令和选项：\n")
@@ -15,6 +15,7 @@ def print_depends(executor, params):
     try:
         depends_analyzer = TaskDepends()
         deps = depends_analyzer.analyze(task_name)
+        downstream = sorted(depends_analyzer.downstream(task_name, recursive=False))
 
         if deps:
             print(f"任务 {task_name} 的依赖关系:")
@@ -22,10 +23,17 @@ def print_depends(executor, params):
             for dep in deps:
                 print(f"  ➜ {dep}")
             print("-" * 50)
-            return {"status": "success", "dependencies": deps}
         else:
             print(f"任务 {task_name} 无依赖")
-            return {"status": "success", "dependencies": []}
+
+        if downstream:
+            print(f"依赖任务 {task_name} 的下游任务:")
+            print("-" * 50)
+            for child in downstream:
+                print(f"  ⬅ {child}")
+            print("-" * 50)
+
+        return {"status": "success", "dependencies": deps, "downstream": downstream}
 
     except Exception as e:
         print(f"❌ 分析依赖失败: {e}")
@@ -1,31 +1,106 @@
 """导出数据到 CSV 文件"""
 
+import csv
+import gzip
+import io
+import os
+import time
+
+_QUOTING = {
+    "minimal": csv.QUOTE_MINIMAL,
+    "all": csv.QUOTE_ALL,
+    "nonnumeric": csv.QUOTE_NONNUMERIC,
+    "none": csv.QUOTE_NONE,
+}
+
+
+def _open_output(output_path, compression, encoding):
+    """按压缩方式打开文本输出流"""
+    if compression == "gzip":
+        return gzip.open(output_path, "wt", newline="", encoding=encoding)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd 压缩需要 zstandard，请安装 zstd 可选依赖: pip install -e '.[zstd]'") from e
+
+        raw = open(output_path, "wb")
+        writer = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer, encoding=encoding, newline="")
+    return open(output_path, "w", newline="", encoding=encoding)
+
+
+def _infer_compression(output_path, compression):
+    if compression:
+        return None if compression == "none" else compression
+    if output_path.endswith(".gz"):
+        return "gzip"
+    if output_path.endswith(".zst"):
+        return "zstd"
+    return None
+
 
 def export_to_csv(executor, params):
-    """将数据库查询结果导出到 CSV 文件
+    """将数据库查询结果流式导出到 CSV 文件
 
     参数:
         executor: 数据库执行器
         params: 参数字典，包含 sql, output_path 等
+            delimiter: 分隔符，默认 ","
+            quoting: 引号策略 minimal/all/nonnumeric/none，默认 minimal
+            compression: 压缩方式 gzip/zstd/none，默认按扩展名 .gz/.zst 推断
+            batch_size: 每批拉取的行数，默认 10000
+            encoding: 文件编码，默认 utf-8
     """
     sql = params.get("sql", "SELECT 1")
     output_path = params.get("output_path", "output.csv")
+    delimiter = params.get("delimiter", ",")
+    quoting = params.get("quoting", "minimal")
+    compression = _infer_compression(output_path, params.get("compression"))
+    batch_size = int(params.get("batch_size", 10000))
+    encoding = params.get("encoding", "utf-8")
 
     try:
-        # 执行查询
-        result = executor.execute_query(sql)
-
-        # 导出到 CSV
-        import csv
-
-        if result:
-            with open(output_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                if isinstance(result, list) and len(result) > 0:
-                    # 写入数据
-                    writer.writerows(result)
-                    print(f"✅ 数据已导出到: {output_path}")
-        return {"status": "success", "output": output_path}
+        if quoting not in _QUOTING:
+            raise ValueError(f"不支持的 quoting: {quoting}，可选: {', '.join(_QUOTING)}")
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"不支持的压缩方式: {compression}")
+
+        start = time.monotonic()
+        rows = 0
+        with _open_output(output_path, compression, encoding) as f:
+
+            def make_writer(fieldnames):
+                writer = csv.DictWriter(
+                    f,
+                    fieldnames=fieldnames,
+                    delimiter=delimiter,
+                    quoting=_QUOTING[quoting],
+                    escapechar="\\" if quoting == "none" else None,
+                )
+                writer.writeheader()
+                return writer
+
+            writer = None
+            # 按批拉取并写出，内存占用只与 batch_size 相关
+            for batch in executor.iter_query(sql, batch_size=batch_size):
+                if writer is None:
+                    writer = make_writer(list(batch[0].keys()))
+                writer.writerows(batch)
+                rows += len(batch)
+                if params.get("verbose"):
+                    print(f"   已导出 {rows} 行")
+            # 结果为空时按游标的列描述写出表头，下游按表头解析的文件仍然有效
+            if writer is None:
+                columns = executor.query_columns(sql)
+                if columns:
+                    make_writer(columns)
+
+        elapsed = max(time.monotonic() - start, 1e-6)
+        size_mb = os.path.getsize(output_path) / 1024 / 1024
+        print(f"✅ 数据已导出到: {output_path}（{rows} 行，{size_mb:.2f} MB）")
+        print(f"   耗时 {elapsed:.2f}s，{rows / elapsed:.0f} 行/s，{size_mb / elapsed:.2f} MB/s")
+        return {"status": "success", "output": output_path, "rows": rows, "seconds": round(elapsed, 3)}
     except Exception as e:
         print(f"❌ 导出失败: {e}")
         return {"status": "failed", "error": str(e)}
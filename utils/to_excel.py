@@ -1,34 +1,64 @@
 """导出数据到 Excel 文件"""
 
+import time
+
+# Excel 单个工作表的最大行数（含表头）
+_MAX_SHEET_ROWS = 1048576
+
 
 def export_to_excel(executor, params):
-    """将数据库查询结果导出到 Excel 文件
+    """将数据库查询结果流式导出到 Excel 文件
+
+    使用 openpyxl 的 write_only 模式逐行写出，行数超过单表上限时自动新建工作表（每个表都带表头）。
 
     参数:
         executor: 数据库执行器
         params: 参数字典，包含 sql, output_path 等
+            sheet_name: 工作表名前缀，默认 "Sheet"
+            batch_size: 每批拉取的行数，默认 10000
+            max_sheet_rows: 单个工作表的最大行数（含表头），默认为 Excel 上限 1048576
     """
     sql = params.get("sql", "SELECT 1")
     output_path = params.get("output_path", "output.xlsx")
+    sheet_name = params.get("sheet_name", "Sheet")
+    batch_size = int(params.get("batch_size", 10000))
+    max_rows = int(params.get("max_sheet_rows", _MAX_SHEET_ROWS))
 
     try:
-        # 执行查询
-        result = executor.execute_query(sql)
-
         # 导出到 Excel
         import openpyxl
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
+        start = time.monotonic()
+        wb = openpyxl.Workbook(write_only=True)
+        ws = None
+        header = None
+        sheet_rows = 0
+        sheets = 0
+        rows = 0
+
+        for batch in executor.iter_query(sql, batch_size=batch_size):
+            if header is None:
+                header = list(batch[0].keys())
+            for row in batch:
+                if ws is None or sheet_rows >= max_rows:
+                    sheets += 1
+                    ws = wb.create_sheet(title=sheet_name if sheets == 1 else f"{sheet_name}_{sheets}")
+                    ws.append(header)
+                    sheet_rows = 1
+                ws.append([row.get(column) for column in header])
+                sheet_rows += 1
+            rows += len(batch)
+            if params.get("verbose"):
+                print(f"   已导出 {rows} 行")
 
-        if result:
-            if isinstance(result, list) and len(result) > 0:
-                for row in result:
-                    ws.append(row)
-                wb.save(output_path)
-                print(f"✅ 数据已导出到: {output_path}")
+        if ws is None:
+            wb.create_sheet(title=sheet_name)
+        wb.save(output_path)
 
-        return {"status": "success", "output": output_path}
+        elapsed = max(time.monotonic() - start, 1e-6)
+        print(f"✅ 数据已导出到: {output_path}（{rows} 行，{max(sheets, 1)} 个工作表）")
+        print(f"   耗时 {elapsed:.2f}s，{rows / elapsed:.0f} 行/s")
+        return {"status": "success", "output": output_path, "rows": rows, "sheets": max(sheets, 1)}
     except Exception as e:
         print(f"❌ 导出失败: {e}")
         return {"status": "failed", "error": str(e)}
@@ -0,0 +1,198 @@
+"""导出数据到 Parquet / Arrow IPC (Feather) 文件"""
+
+import os
+import time
+
+_FORMATS = ("parquet", "arrow", "feather")
+
+
+class _BatchWriter:
+    """缓冲记录批次，凑满 row_group_size 行后写出一个行组"""
+
+    def __init__(self, pa, path, schema, fmt, compression, row_group_size):
+        self.pa = pa
+        self.path = path
+        self.schema = schema
+        self.is_parquet = fmt == "parquet"
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.buffer = []
+        self.buffered_rows = 0
+        self.rows = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.writer = self._open()
+
+    def _open(self):
+        if self.is_parquet:
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        # Feather v2 即 Arrow IPC 文件格式，仅支持 lz4/zstd 压缩
+        compression = self.compression if self.compression in ("lz4", "zstd") else None
+        return self.pa.ipc.new_file(self.path, self.schema, options=self.pa.ipc.IpcWriteOptions(compression=compression))
+
+    def write(self, table):
+        self.buffer.append(table)
+        self.buffered_rows += table.num_rows
+        if self.buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self._write_table(self.pa.concat_tables(self.buffer))
+        self.buffer = []
+        self.buffered_rows = 0
+
+    def _write_table(self, table):
+        if self.is_parquet:
+            self.writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self.writer.write_table(table, max_chunksize=self.row_group_size)
+        self.rows += table.num_rows
+
+    def widen(self, schema):
+        """表结构放宽后（int64 → double、此前全为空值的列出现了实际类型等），把已写出的行组转换为新结构重写"""
+        self.buffer = [_conform(self.pa, table, schema) for table in self.buffer]
+        self.writer.close()
+        old_path = f"{self.path}.widen"
+        os.replace(self.path, old_path)
+        self.schema = schema
+        self.writer = self._open()
+        self.rows = 0
+        try:
+            if self.is_parquet:
+                import pyarrow.parquet as pq
+
+                old = pq.ParquetFile(old_path)
+                for i in range(old.num_row_groups):
+                    self._write_table(_conform(self.pa, old.read_row_group(i), schema))
+            else:
+                with self.pa.memory_map(old_path) as source:
+                    old = self.pa.ipc.open_file(source)
+                    for i in range(old.num_record_batches):
+                        self._write_table(_conform(self.pa, self.pa.Table.from_batches([old.get_batch(i)]), schema))
+        finally:
+            os.remove(old_path)
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def _merge_schema(pa, schema, batch_schema):
+    """合并已有表结构与新批次的表结构：类型按需放宽（如 int64 → double），无法统一的列退化为字符串"""
+    if schema is None:
+        return batch_schema
+    fields = {f.name: f for f in schema}
+    for field in batch_schema:
+        current = fields.get(field.name)
+        if current is None:
+            fields[field.name] = field
+        elif current.type != field.type:
+            try:
+                merged = pa.unify_schemas([pa.schema([current]), pa.schema([field])], promote_options="permissive")
+                fields[field.name] = merged.field(0)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                fields[field.name] = pa.field(field.name, pa.string())
+    return pa.schema(list(fields.values()))
+
+
+def _file_schema(pa, schema, exclude=()):
+    """写入文件的表结构：去掉分区列，目前全为空值的列按字符串处理"""
+    fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in schema if f.name not in exclude]
+    return pa.schema(fields)
+
+
+def _conform(pa, table, schema):
+    """按列名把 table 转换为 schema 的类型，缺少的列补空值"""
+    if table.schema.equals(schema):
+        return table
+    columns = [
+        table.column(f.name).cast(f.type) if f.name in table.column_names else pa.nulls(table.num_rows, f.type) for f in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def export_to_parquet(executor, params):
+    """将数据库查询结果按记录批次流式导出到列式文件
+
+    参数:
+        executor: 数据库执行器
+        params: 参数字典，包含 sql, output_path 等
+            format: 文件格式 parquet/arrow/feather，默认 parquet
+            compression: 压缩算法，parquet 默认 zstd（可选 snappy/gzip/zstd/none），arrow/feather 可选 lz4/zstd
+            row_group_size: 行组大小，默认 100000
+            partition_by: 分区列（逗号分隔），指定后 output_path 作为目录，按 col=value 子目录写出
+            batch_size: 每批拉取的行数，默认 10000
+    """
+    sql = params.get("sql", "SELECT 1")
+    fmt = params.get("format", "parquet")
+    output_path = params.get("output_path", f"output.{fmt}")
+    compression = params.get("compression", "zstd")
+    compression = None if compression == "none" else compression
+    row_group_size = int(params.get("row_group_size", 100000))
+    batch_size = int(params.get("batch_size", 10000))
+    partition_by = [c.strip() for c in params.get("partition_by", "").split(",") if c.strip()]
+
+    try:
+        if fmt not in _FORMATS:
+            raise ValueError(f"不支持的格式: {fmt}，可选: {', '.join(_FORMATS)}")
+
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("导出 Parquet/Arrow 需要 pyarrow，请安装 parquet 可选依赖: pip install -e '.[parquet]'") from e
+
+        start = time.monotonic()
+        schema = None
+        file_schema = None
+        writers = {}
+        rows = 0
+
+        try:
+            for batch in executor.iter_query(sql, batch_size=batch_size):
+                table = pa.Table.from_pylist(batch)
+                if schema is None:
+                    missing = [c for c in partition_by if c not in table.column_names]
+                    if missing:
+                        raise ValueError(f"分区列不存在: {', '.join(missing)}")
+                # 每批数据单独推断类型并与已有结构合并，结构放宽时已写出的文件按新结构重写
+                schema = _merge_schema(pa, schema, table.schema)
+                # 分区列的值体现在目录名中，文件内不再重复存储
+                new_file_schema = _file_schema(pa, schema, exclude=partition_by)
+                if file_schema is not None and not new_file_schema.equals(file_schema):
+                    for writer in writers.values():
+                        writer.widen(new_file_schema)
+                file_schema = new_file_schema
+
+                if not partition_by:
+                    if None not in writers:
+                        writers[None] = _BatchWriter(pa, output_path, file_schema, fmt, compression, row_group_size)
+                    writers[None].write(_conform(pa, table, file_schema))
+                else:
+                    groups = {}
+                    for i, row in enumerate(batch):
+                        groups.setdefault(tuple(row[c] for c in partition_by), []).append(i)
+                    for key, indices in groups.items():
+                        if key not in writers:
+                            sub_dir = os.path.join(*(f"{c}={v}" for c, v in zip(partition_by, key)))
+                            path = os.path.join(output_path, sub_dir, f"part-0.{fmt}")
+                            writers[key] = _BatchWriter(pa, path, file_schema, fmt, compression, row_group_size)
+                        writers[key].write(_conform(pa, table.take(indices), file_schema))
+                rows += len(batch)
+                if params.get("verbose"):
+                    print(f"   已导出 {rows} 行")
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        elapsed = max(time.monotonic() - start, 1e-6)
+        files = len(writers)
+        print(f"✅ 数据已导出到: {output_path}（{rows} 行，{files} 个文件）")
+        print(f"   耗时 {elapsed:.2f}s，{rows / elapsed:.0f} 行/s")
+        return {"status": "success", "output": output_path, "rows": rows, "files": files}
+    except Exception as e:
+        print(f"❌ 导出失败: {e}")
+        return {"status": "failed", "error": str(e)}
@@ -1,6 +1,13 @@
 import logging
+from datetime import datetime
+from typing import List
 
-from core.sql_builder import SQLBuilder
+import typer
+
+from core.sql_builder import SQLBuilder, split_statements
+from core.sql_lineage import extract_lineage
+from core.watermark import WatermarkStore
+from executor.base_executor import sql_literal
 
 
 class Status:
@@ -8,11 +15,38 @@ class Status:
     RUNNING = "running"
     SUCCESS = "success"
     FAILED = "failed"
+    SKIPPED = "skipped"
 
 
 class BaseTask:
     """任务基类"""
 
+    # end_date 是否为闭区间（BETWEEN start AND end），分区回刷据此切分日期
+    date_range_inclusive = False
+    # 分区回刷时同时执行的最大分区数，None 表示取 --parallel；分区之间会互相覆盖数据的任务设为 1
+    backfill_parallel = None
+
+    # 增量水位列（如 create_time）；设置后未指定 start_date 时按水位线增量处理，
+    # 模板中可使用 ${watermark}（上次提交的水位，不含）与 ${watermark_end}（本次处理到的水位，含）
+    watermark_column = None
+    # 计算新水位的来源表，默认取 SQL 模板中的第一个来源表
+    watermark_table = None
+    # 首次运行（尚无水位记录）时的起始水位
+    watermark_initial = "1970-01-01 00:00:00"
+
+    # create / pre_sql / 主SQL / post_sql 是否在一个事务中执行（执行器不支持事务时忽略）
+    use_transaction = False
+
+    # 单条语句（一次执行器调用）的超时秒数与失败重试次数，None 表示使用执行器配置
+    statement_timeout = None
+    max_retries = None
+    # 默认只重试读；写语句（execute_sql / 事务中的 execute_script）重放后结果不变（如 INSERT OVERWRITE、
+    # 按主键 MERGE）时设为 True，连接中断后也重试写入
+    retry_writes = None
+
+    # 为 True 时任务在进程池中执行（CPU 密集的 Python 计算），子进程重新创建执行器；SQL 为主的任务保持线程执行
+    run_in_process = False
+
     def __init__(self):
         self.name = self.__class__.__name__
         self.description = "基础任务"
@@ -32,17 +66,80 @@ class BaseTask:
         """参数验证"""
         return True
 
+    @property
+    def task_key(self) -> str:
+        """任务的唯一标识（任务加载器导入的模块名，如 ods.ods_yb_master_info）"""
+        return self.__class__.__module__
+
     def execute(self, executor, params):
         """执行任务"""
-        # 构建SQL
-        sql_template = self.get_sql_template()
-        sql = SQLBuilder.build_sql(sql_template, params)
-
-        # 执行SQL
-        if sql.strip().lower().startswith("select"):
-            return executor.execute_query(sql)
+        params = dict(params)
+        new_watermark = None
+        if self.watermark_column and not params.get("start_date"):
+            new_watermark = self._prepare_watermark(executor, params)
+            if new_watermark is None and not params.get("dry_run"):
+                self.logger.info("%s 没有新数据（水位 %s）", self.task_key, params["watermark"])
+                return {"status": "skipped", "reason": "no new rows", "watermark": params["watermark"]}
+
+        # 按 create -> pre_sql -> 主SQL -> post_sql 的顺序渲染为一批语句
+        pre = self.render_statements(self.create(), params) + self.render_statements(self.pre_sql(), params)
+        main = self.render_statements(self.get_sql_template(), params)
+        post = self.render_statements(self.post_sql(), params)
+
+        if params.get("dry_run"):
+            for statement in pre + main + post:
+                typer.echo(f"{statement};\n")
+            return {"status": "success", "dry_run": True, "statements": len(pre + main + post)}
+
+        if len(main) == 1 and main[0].lower().startswith("select"):
+            # 主SQL是查询时需要取回结果，前后的语句各自作为一批执行
+            if pre:
+                executor.execute_script(pre, self.use_transaction)
+            result = executor.execute_query(main[0])
+            if post:
+                executor.execute_script(post, self.use_transaction)
         else:
-            return executor.execute_sql(sql)
+            # 整批在同一会话中一次提交给执行器，省去逐条往返与会话开销
+            result = executor.execute_script(pre + main + post, self.use_transaction)
+
+        # 执行成功后才推进水位线
+        if new_watermark is not None:
+            WatermarkStore().commit(self.task_key, self.watermark_column, new_watermark)
+        return result
+
+    @staticmethod
+    def render_statements(template, params) -> List[str]:
+        """渲染模板并拆分为语句列表（模板为空时返回空列表）"""
+        if not template:
+            return []
+        return split_statements(SQLBuilder.build_sql(template, params))
+
+    def _prepare_watermark(self, executor, params):
+        """注入 watermark/watermark_end 参数，返回本次要提交的新水位（没有新数据时返回 None）"""
+        store = WatermarkStore()
+        last = store.get(self.task_key, self.watermark_column) or self.watermark_initial
+        params["watermark"] = last
+
+        table = self.watermark_table
+        if table is None:
+            _, sources = extract_lineage(self.get_sql_template())
+            if not sources:
+                raise ValueError(f"{self.task_key} 无法确定水位来源表，请设置 watermark_table")
+            table = min(sources)
+        if params.get("dry_run"):
+            # 干跑不查询来源表，${watermark_end} 在输出的 SQL 中保留为占位符
+            return None
+
+        column = self.watermark_column
+        sql = f"SELECT MAX({column}) AS hwm FROM {table} WHERE {column} > {sql_literal(last)}"
+        # 水位查询必须读到最新数据，不走查询缓存
+        rows = executor.without_cache().execute_query(sql)
+        hwm = rows[0].get("hwm") if rows else None
+        if hwm is None:
+            return None
+
+        params["watermark_end"] = hwm.isoformat(sep=" ") if isinstance(hwm, datetime) else str(hwm)
+        return hwm
 
     # def insert(self):
     #     """插入数据"""
@@ -51,14 +148,16 @@ class BaseTask:
         """记录日志"""
 
     def pre_sql(self):
-        """before_execute"""
-        pass
+        """before_execute：主SQL之前执行的语句模板（如 SET 参数、清理分区），多条语句用分号分隔"""
+        return ""
 
     def post_sql(self):
-        """after_execute"""
-        pass
+        """after_execute：主SQL之后执行的语句模板（如 ANALYZE、刷新统计信息），多条语句用分号分隔"""
+        return ""
 
     def depends(self):
-        """依赖关系"""
-        # TODO
-        pass
+        """依赖关系
+
+        返回上游任务名列表；返回 None 表示未声明，调度时按 ods -> dw -> dim 分层顺序处理
+        """
+        return None
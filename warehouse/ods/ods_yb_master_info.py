@@ -1,35 +1,12 @@
 from typing import Dict, Any, Optional
-from core.sql_builder import SQLBuilder
-
-class BaseTask:
-    """任务基类"""
-    
-    def __init__(self):
-        self.name = self.__class__.__name__
-        self.description = "基础任务"
-    
-    def get_sql_template(self) -> str:
-        """获取SQL模板"""
-        raise NotImplementedError("子类必须实现此方法")
-    
-    def validate_params(self, params: Dict[str, Any]) -> bool:
-        """参数验证"""
-        return True
-    
-    def execute(self, executor, params: Dict[str, Any]) -> Any:
-        """执行任务"""
-        # 构建SQL
-        sql_template = self.get_sql_template()
-        sql = SQLBuilder.build_sql(sql_template, params)
-        
-        # 执行SQL
-        if sql.strip().lower().startswith('select'):
-            return executor.execute_query(sql)
-        else:
-            return executor.execute_sql(sql)
+from warehouse.base_task import BaseTask
 
 class Task(BaseTask):
     """ODS层任务1示例"""
+
+    # 未指定 start_date 时按 create_time 水位线增量抽取
+    watermark_column = "create_time"
+    watermark_table = "source.user_data"
     
     def __init__(self):
         super().__init__()
@@ -49,15 +26,21 @@ class Task(BaseTask):
             /* ENDIF */
             create_time
         FROM source.user_data 
+        /* IF watermark */
+        WHERE create_time > '${watermark}'
+          AND create_time <= '${watermark_end}'
+        /* ELSE */
         WHERE create_time >= '${start_date}' 
           AND create_time < '${end_date}'
+        /* ENDIF */
           /* IF user_type */
           AND user_type = '${user_type}'
           /* ENDIF */
         """
     
     def validate_params(self, params: Dict[str, Any]) -> bool:
-        required = ['start_date', 'end_date']
+        # 增量模式下日期区间由水位线决定
+        required = ['start_date', 'end_date'] if params.get('start_date') else []
         for field in required:
             if field not in params:
                 raise ValueError(f"缺少必要参数: {field}")